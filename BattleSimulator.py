@@ -0,0 +1,255 @@
+"""Монте-Карло симулятор сражений по правилам боя игры.
+
+Сражение - два отряда на однородном ландшафте. Каждый раунд все живые
+юниты в случайном порядке атакуют случайного живого противника через
+GameField.attack_unit, поэтому урон, броня (Unit.take_damage) и
+модификаторы ландшафта - те же, что в игре. Бой заканчивается, когда
+один из отрядов уничтожен, или ничьей после max_rounds раундов.
+
+Испытания делятся на блоки фиксированного размера; у каждого блока свой
+генератор случайных чисел, зерно которого зависит только от общего
+seed и номера блока. Блоки выполняются в ProcessPoolExecutor, а их
+статистика складывается, поэтому результат при одном seed не зависит от
+числа процессов.
+
+Запуск:
+    python BattleSimulator.py knight:5 spearman:8 --terrain forest --trials 100000
+"""
+import os
+import random
+from typing import Dict, List, Optional, Sequence, Tuple
+from GameField import GameField
+from Landscape import TerrainType, TERRAIN_CODES, TERRAIN_RULES
+from Units import UnitFactory
+
+SIDE_A = 0
+SIDE_B = 1
+DRAW = 2
+
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_MAX_ROUNDS = 100
+
+
+class Battle:
+    """Описание сражения: состав отрядов, ландшафт и лимит раундов.
+
+    Отряды задаются именами типов UnitFactory, например
+    ['knight'] * 5; описание передается в процессы-исполнители.
+    """
+
+    def __init__(self, side_a: Sequence[str], side_b: Sequence[str],
+                 terrain: TerrainType = TerrainType.PLAIN,
+                 max_rounds: int = DEFAULT_MAX_ROUNDS):
+        if not side_a or not side_b:
+            raise ValueError("В каждом отряде должен быть хотя бы один юнит")
+        if max_rounds <= 0:
+            raise ValueError("Лимит раундов должен быть положительным")
+        self.side_a = tuple(unit_type.lower() for unit_type in side_a)
+        self.side_b = tuple(unit_type.lower() for unit_type in side_b)
+        self.terrain = terrain
+        self.max_rounds = max_rounds
+
+        code = TERRAIN_CODES[terrain]
+        for unit_type in self.side_a + self.side_b:
+            if unit_type not in UnitFactory.UNIT_TYPES:
+                raise ValueError(f"Неизвестный тип юнита: {unit_type}")
+            if not TERRAIN_RULES.row_for_class(UnitFactory.UNIT_TYPES[unit_type])[code].passable:
+                raise ValueError(f"Юнит {unit_type} не может находиться на ландшафте {terrain.value}")
+
+    def __repr__(self):
+        return f"Battle({list(self.side_a)!r}, {list(self.side_b)!r}, {self.terrain.name})"
+
+
+class BattleStats:
+    """Сводная статистика серии сражений; блоки складываются через merge"""
+
+    def __init__(self):
+        self.trials = 0
+        self.outcomes = [0, 0, 0]  # победы A, победы B, ничьи
+        self.losses = [0, 0]  # погибшие юниты отрядов A и B
+        self.losses_by_type: Tuple[Dict[str, int], Dict[str, int]] = ({}, {})
+        self.rounds_total = 0
+        self.rounds_histogram: Dict[int, int] = {}
+
+    def record(self, outcome: int, rounds: int, dead: Tuple[List[str], List[str]]):
+        self.trials += 1
+        self.outcomes[outcome] += 1
+        self.rounds_total += rounds
+        self.rounds_histogram[rounds] = self.rounds_histogram.get(rounds, 0) + 1
+        for side in (SIDE_A, SIDE_B):
+            self.losses[side] += len(dead[side])
+            by_type = self.losses_by_type[side]
+            for unit_type in dead[side]:
+                by_type[unit_type] = by_type.get(unit_type, 0) + 1
+
+    def merge(self, other: 'BattleStats') -> 'BattleStats':
+        self.trials += other.trials
+        for index in range(3):
+            self.outcomes[index] += other.outcomes[index]
+        for side in (SIDE_A, SIDE_B):
+            self.losses[side] += other.losses[side]
+            by_type = self.losses_by_type[side]
+            for unit_type, count in other.losses_by_type[side].items():
+                by_type[unit_type] = by_type.get(unit_type, 0) + count
+        self.rounds_total += other.rounds_total
+        for rounds, count in other.rounds_histogram.items():
+            self.rounds_histogram[rounds] = self.rounds_histogram.get(rounds, 0) + count
+        return self
+
+    def rate(self, outcome: int) -> float:
+        return self.outcomes[outcome] / self.trials if self.trials else 0.0
+
+    def expected_losses(self, side: int) -> float:
+        return self.losses[side] / self.trials if self.trials else 0.0
+
+    @property
+    def mean_rounds(self) -> float:
+        return self.rounds_total / self.trials if self.trials else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            "trials": self.trials,
+            "win_rate_a": self.rate(SIDE_A),
+            "win_rate_b": self.rate(SIDE_B),
+            "draw_rate": self.rate(DRAW),
+            "expected_losses_a": self.expected_losses(SIDE_A),
+            "expected_losses_b": self.expected_losses(SIDE_B),
+            "expected_losses_by_type_a": {unit_type: count / self.trials
+                                          for unit_type, count in sorted(self.losses_by_type[SIDE_A].items())},
+            "expected_losses_by_type_b": {unit_type: count / self.trials
+                                          for unit_type, count in sorted(self.losses_by_type[SIDE_B].items())},
+            "mean_rounds": self.mean_rounds,
+            "rounds_histogram": dict(sorted(self.rounds_histogram.items())),
+        }
+
+
+def run_trial(battle: Battle, rng: random.Random) -> Tuple[int, int, Tuple[List[str], List[str]]]:
+    """Провести одно сражение; возвращает (исход, число раундов, погибшие по отрядам)"""
+    width = max(len(battle.side_a), len(battle.side_b))
+    field = GameField(width, 2, len(battle.side_a) + len(battle.side_b),
+                      terrain=bytearray([TERRAIN_CODES[battle.terrain]]) * (width * 2))
+    return _fight(battle, field, rng)
+
+
+def _fight(battle: Battle, field: GameField, rng: random.Random):
+    sides: Tuple[list, list] = ([], [])
+    unit_types = {}
+    for side, row in ((SIDE_A, battle.side_a), (SIDE_B, battle.side_b)):
+        for x, unit_type in enumerate(row):
+            unit = UnitFactory.create_unit(unit_type)
+            field.add_unit(unit, x, side)
+            sides[side].append(unit)
+            unit_types[id(unit)] = unit_type
+    side_of = {id(unit): side for side in (SIDE_A, SIDE_B) for unit in sides[side]}
+    dead: Tuple[List[str], List[str]] = ([], [])
+
+    attack = field.attack_unit
+    rounds = 0
+    while sides[SIDE_A] and sides[SIDE_B] and rounds < battle.max_rounds:
+        rounds += 1
+        order = sides[SIDE_A] + sides[SIDE_B]
+        rng.shuffle(order)
+        for attacker in order:
+            if not attacker.is_alive():
+                continue
+            enemies = sides[1 - side_of[id(attacker)]]
+            if not enemies:
+                break
+            target = enemies[rng.randrange(len(enemies))]
+            attack(attacker, target.x, target.y)
+            if not target.is_alive():
+                enemies.remove(target)
+                dead[side_of[id(target)]].append(unit_types[id(target)])
+
+    if not sides[SIDE_B] and sides[SIDE_A]:
+        outcome = SIDE_A
+    elif not sides[SIDE_A] and sides[SIDE_B]:
+        outcome = SIDE_B
+    else:
+        outcome = DRAW
+    return outcome, rounds, dead
+
+
+def chunk_seed(seed: int, chunk_index: int) -> int:
+    """Зерно генератора блока: зависит только от общего seed и номера блока"""
+    return (seed << 32) ^ chunk_index
+
+
+def run_chunk(battle: Battle, seed: int, chunk_index: int, trials: int) -> BattleStats:
+    """Провести блок испытаний со своим генератором случайных чисел"""
+    rng = random.Random(chunk_seed(seed, chunk_index))
+    stats = BattleStats()
+    for _ in range(trials):
+        stats.record(*run_trial(battle, rng))
+    return stats
+
+
+def _run_chunk(args) -> BattleStats:
+    return run_chunk(*args)
+
+
+def simulate(battle: Battle, trials: int, seed: int = 0, workers: Optional[int] = None,
+             chunk_size: int = DEFAULT_CHUNK_SIZE) -> BattleStats:
+    """Провести trials сражений, распределив блоки по workers процессам.
+
+    workers=None - по числу ядер, workers=1 - в текущем процессе без пула.
+    """
+    if trials <= 0:
+        raise ValueError("Количество испытаний должно быть положительным")
+    if chunk_size <= 0:
+        raise ValueError("Размер блока должен быть положительным")
+    chunks = [(battle, seed, index, min(chunk_size, trials - start))
+              for index, start in enumerate(range(0, trials, chunk_size))]
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+
+    stats = BattleStats()
+    if workers == 1:
+        for chunk in chunks:
+            stats.merge(_run_chunk(chunk))
+        return stats
+    # пул процессов (и argparse в main) импортируются только там, где нужны:
+    # рабочие процессы пула сами импортируют этот модуль при старте
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk_stats in executor.map(_run_chunk, chunks):
+            stats.merge(chunk_stats)
+    return stats
+
+
+def _parse_side(specs: Sequence[str]) -> List[str]:
+    """['knight:5', 'healer'] -> ['knight'] * 5 + ['healer']"""
+    side = []
+    for spec in specs:
+        unit_type, _, count = spec.partition(":")
+        side.extend([unit_type] * (int(count) if count else 1))
+    return side
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Монте-Карло симулятор сражений")
+    parser.add_argument("side_a", help="отряд A, например knight:5 или knight:3,healer")
+    parser.add_argument("side_b", help="отряд B, например spearman:8")
+    parser.add_argument("--terrain", default="plain", choices=[t.name.lower() for t in TerrainType])
+    parser.add_argument("--trials", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="число процессов (по умолчанию - число ядер)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--max-rounds", type=int, default=DEFAULT_MAX_ROUNDS)
+    args = parser.parse_args(argv)
+
+    try:
+        battle = Battle(_parse_side(args.side_a.split(",")), _parse_side(args.side_b.split(",")),
+                        TerrainType[args.terrain.upper()], args.max_rounds)
+    except ValueError as e:
+        parser.error(str(e))
+
+    stats = simulate(battle, args.trials, seed=args.seed, workers=args.workers, chunk_size=args.chunk_size)
+    print(f"⚔️ {battle}, испытаний: {stats.trials}")
+    print(f"🏆 Победа A: {stats.rate(SIDE_A):.1%}, победа B: {stats.rate(SIDE_B):.1%}, ничья: {stats.rate(DRAW):.1%}")
+    print(f"💀 Средние потери: A {stats.expected_losses(SIDE_A):.2f}, B {stats.expected_losses(SIDE_B):.2f}")
+    print(f"⏱️ Среднее число раундов: {stats.mean_rounds:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Поля стоимости перемещения по классам передвижения.
+
+Поле стоимости - плоский bytearray по клеткам карты (индекс y * width + x),
+в котором для одного класса передвижения уже сведены ландшафт и занятость:
+
+    BLOCKED (0)         клетка непроходима для класса или занята юнитом/базой
+    1..COST_MASK        стоимость входа на клетку по ландшафту
+    стоимость | STOP    в клетке нейтральный объект: зайти можно, пройти насквозь нельзя
+
+Поиск пути, выбор клетки появления и проверка хода читают один байт
+вместо вызова правил ландшафта и просмотра словаря занятых клеток.
+
+Классы передвижения - пехота, кавалерия, осадные орудия и лекари
+(movement_class). Массив строится при первом запросе для класса по
+строке TERRAIN_RULES, а классы с одинаковыми стоимостями по всем
+ландшафтам делят один массив. Дальше поля обновляются по одной клетке:
+GameField сообщает об изменении клетки (ход, появление и гибель юнита,
+базы и объекты, смена ландшафта) из своих низкоуровневых методов.
+
+Для карты из лениво генерируемых чанков (ChunkedTerrain) плоские массивы
+не строятся - это сгенерировало бы всю карту; вместо них стоимость
+клетки считается при обращении (CellCosts) с тем же кодированием.
+"""
+from typing import Dict, Set, Tuple, Type, Union
+from Units import Unit, Ballista, Cavalry, Healer
+from Landscape import TERRAIN_RULES
+from NeutralObject import NeutralObject
+
+BLOCKED = 0
+# Флаг "клетку можно занять, но путь через нее не продолжается"
+STOP = 0x80
+COST_MASK = 0x7F
+
+# Класс передвижения по ближайшему предку класса юнита; остальные - пехота
+MOVEMENT_CLASSES: Tuple[Tuple[type, str], ...] = (
+    (Ballista, "siege"),
+    (Cavalry, "cavalry"),
+    (Healer, "healer"),
+)
+DEFAULT_MOVEMENT_CLASS = "infantry"
+
+
+def movement_class(unit: Union[Unit, Type[Unit]]) -> str:
+    """Класс передвижения юнита или класса юнита"""
+    unit_class = unit if isinstance(unit, type) else type(unit)
+    for base, name in MOVEMENT_CLASSES:
+        if issubclass(unit_class, base):
+            return name
+    return DEFAULT_MOVEMENT_CLASS
+
+
+def terrain_costs(unit: Unit) -> bytes:
+    """Стоимость входа по коду ландшафта для юнита, BLOCKED - непроходимо"""
+    costs = bytearray()
+    for rule in TERRAIN_RULES.row(unit):
+        if not rule.passable:
+            costs.append(BLOCKED)
+        elif 1 <= rule.move_cost <= COST_MASK:
+            costs.append(rule.move_cost)
+        else:
+            raise ValueError(f"Стоимость перемещения {rule.move_cost} вне диапазона 1..{COST_MASK}")
+    return bytes(costs)
+
+
+def translate_terrain(terrain, entry_costs: bytes) -> bytearray:
+    """Стоимость по ландшафту для всех клеток карты за один проход bytes.translate"""
+    if not isinstance(terrain, (bytes, bytearray)):
+        terrain = terrain[:]
+    return bytearray(terrain).translate(entry_costs.ljust(256, bytes([BLOCKED])))
+
+
+def cell_cost(entry_costs: bytes, code: int, occupant) -> int:
+    """Значение поля стоимости для клетки с кодом ландшафта code и объектом occupant"""
+    cost = entry_costs[code]
+    if occupant is None or cost == BLOCKED:
+        return cost
+    return cost | STOP if isinstance(occupant, NeutralObject) else BLOCKED
+
+
+class CellCosts:
+    """Поле стоимости, которое считается при обращении (для чанковой карты)"""
+
+    __slots__ = ("field", "entry_costs")
+
+    def __init__(self, game_field, entry_costs: bytes):
+        self.field = game_field
+        self.entry_costs = entry_costs
+
+    def __len__(self) -> int:
+        return self.field.width * self.field.height
+
+    def __getitem__(self, index: int) -> int:
+        field = self.field
+        y, x = divmod(index, field.width)
+        return cell_cost(self.entry_costs, field.terrain[index], field.occupants.get((x, y)))
+
+
+class CostField:
+    """Поле стоимости одного набора правил ландшафта"""
+
+    __slots__ = ("entry_costs", "costs", "movement_classes")
+
+    def __init__(self, entry_costs: bytes, costs: Union[bytearray, CellCosts]):
+        self.entry_costs = entry_costs
+        self.costs = costs
+        # Классы передвижения, которые читают это поле
+        self.movement_classes: Set[str] = set()
+
+    def cost(self, index: int) -> int:
+        """Стоимость входа на клетку или 0, если войти нельзя"""
+        return self.costs[index] & COST_MASK
+
+
+class CostFields:
+    """Поля стоимости всех классов передвижения одного игрового поля"""
+
+    def __init__(self, game_field):
+        self.game_field = game_field
+        self._fields: Dict[bytes, CostField] = {}
+        self._by_type: Dict[type, CostField] = {}
+
+    def for_unit(self, unit: Unit) -> CostField:
+        """Поле стоимости для юнита (строится при первом запросе)"""
+        try:
+            return self._by_type[type(unit)]
+        except KeyError:
+            pass
+        entry_costs = terrain_costs(unit)
+        cost_field = self._fields.get(entry_costs)
+        if cost_field is None:
+            cost_field = self._fields[entry_costs] = CostField(entry_costs, self._build(entry_costs))
+        cost_field.movement_classes.add(movement_class(unit))
+        self._by_type[type(unit)] = cost_field
+        return cost_field
+
+    def costs_for(self, unit: Unit) -> Union[bytearray, CellCosts]:
+        """Массив поля стоимости для юнита, индекс - y * width + x"""
+        return self.for_unit(unit).costs
+
+    def fields(self) -> Dict[str, CostField]:
+        """Построенные поля по классам передвижения"""
+        return {name: cost_field for cost_field in self._fields.values()
+                for name in sorted(cost_field.movement_classes)}
+
+    def cell_changed(self, x: int, y: int):
+        """Пересчитать клетку во всех построенных полях"""
+        if not self._fields:
+            return
+        field = self.game_field
+        index = y * field.width + x
+        code = field.terrain[index]
+        occupant = field.occupants.get((x, y))
+        for cost_field in self._fields.values():
+            costs = cost_field.costs
+            if isinstance(costs, bytearray):
+                costs[index] = cell_cost(cost_field.entry_costs, code, occupant)
+
+    def rebuild(self):
+        """Построить все поля заново (после записи в field.terrain в обход GameField)"""
+        for cost_field in self._fields.values():
+            cost_field.costs = self._build(cost_field.entry_costs)
+
+    def clear(self):
+        self._fields.clear()
+        self._by_type.clear()
+
+    def _build(self, entry_costs: bytes) -> Union[bytearray, CellCosts]:
+        field = self.game_field
+        terrain = field.terrain
+        if not isinstance(terrain, (bytes, bytearray)):
+            return CellCosts(field, entry_costs)
+        costs = translate_terrain(terrain, entry_costs)
+        width = field.width
+        for (x, y), occupant in field.occupants.items():
+            index = y * width + x
+            costs[index] = cell_cost(entry_costs, terrain[index], occupant)
+        return costs
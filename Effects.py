@@ -0,0 +1,108 @@
+"""Временные эффекты юнитов (усиления от нейтральных объектов).
+
+Нейтральный объект сам добавляет юниту бонус к характеристике, а
+EffectScheduler помнит, когда бонус нужно снять: эффекты разложены по
+корзинам хода окончания, а сами ходы лежат в куче. Конец хода снимает
+только эффекты, срок которых наступил, - O(k + log t) для k истекающих
+эффектов и t различных ходов окончания, поэтому тихий ход не стоит
+ничего даже при сотнях тысяч активных усилений. Эффекты складываются:
+каждый снимает ровно свой бонус.
+
+Отмененный эффект (отмена действия через FieldHistory) остается в корзине
+помеченным и пропускается, когда до него дойдет очередь. Добавление,
+снятие и истечение эффектов проходят через низкоуровневые методы
+GameField, поэтому попадают в историю, журнал и сохранения.
+"""
+import heapq
+from typing import Dict, Iterator, List, Optional
+from Units import Unit
+
+# Названия характеристик для вывода
+STAT_NAMES = {
+    "health": "здоровье",
+    "max_health": "макс. здоровье",
+    "armor": "броня",
+    "attack": "атака",
+    "move_range": "дальность хода",
+}
+
+
+class TimedEffect:
+    """Бонус amount к характеристике stat юнита до хода expires_turn"""
+    __slots__ = ("id", "unit", "stat", "amount", "expires_turn", "active", "queued")
+
+    def __init__(self, effect_id: int, unit: Unit, stat: str, amount: int, expires_turn: int):
+        self.id = effect_id
+        self.unit = unit
+        self.stat = stat
+        self.amount = amount
+        self.expires_turn = expires_turn
+        self.active = False
+        self.queued = False  # лежит в куче (возможно, уже отмененным)
+
+    def __str__(self):
+        return f"{STAT_NAMES.get(self.stat, self.stat)} {self.amount:+d} до хода {self.expires_turn}"
+
+    def __repr__(self):
+        return (f"TimedEffect({self.unit.name}, {self.stat} {self.amount:+d}, "
+                f"до хода {self.expires_turn})")
+
+
+class EffectScheduler:
+    """Очередь активных эффектов по ходу окончания"""
+
+    def __init__(self):
+        self.turn = 0
+        self._turns: List[int] = []  # куча ходов, у которых есть корзина
+        self._buckets: Dict[int, List[TimedEffect]] = {}  # ход -> эффекты в порядке добавления
+        self._effects: Dict[int, TimedEffect] = {}  # id -> активный эффект
+        self.next_id = 1
+
+    def __len__(self) -> int:
+        return len(self._effects)
+
+    def __iter__(self) -> Iterator[TimedEffect]:
+        return iter(list(self._effects.values()))
+
+    def create(self, unit: Unit, stat: str, amount: int, duration: int) -> TimedEffect:
+        """Новый эффект, истекающий через duration ходов от текущего"""
+        effect = TimedEffect(self.next_id, unit, stat, amount, self.turn + duration)
+        self.next_id += 1
+        return effect
+
+    def push(self, effect: TimedEffect):
+        """Сделать эффект активным (в том числе вернуть отмененный)"""
+        effect.active = True
+        self._effects[effect.id] = effect
+        self.next_id = max(self.next_id, effect.id + 1)
+        if not effect.queued:
+            effect.queued = True
+            bucket = self._buckets.get(effect.expires_turn)
+            if bucket is None:
+                bucket = self._buckets[effect.expires_turn] = []
+                heapq.heappush(self._turns, effect.expires_turn)
+            bucket.append(effect)
+
+    def cancel(self, effect: TimedEffect):
+        """Снять эффект с учета; из корзины он уйдет, когда наступит его ход"""
+        effect.active = False
+        self._effects.pop(effect.id, None)
+
+    def get(self, effect_id: int) -> Optional[TimedEffect]:
+        return self._effects.get(effect_id)
+
+    def effects_of(self, unit: Unit) -> List[TimedEffect]:
+        return [effect for effect in self._effects.values() if effect.unit is unit]
+
+    def due(self, turn: int) -> List[TimedEffect]:
+        """Перейти к ходу turn и вынуть активные эффекты, срок которых
+        наступил (в порядке окончания и добавления)"""
+        self.turn = turn
+        turns = self._turns
+        expired = []
+        while turns and turns[0] <= turn:
+            for effect in self._buckets.pop(heapq.heappop(turns)):
+                effect.queued = False
+                if effect.active:
+                    expired.append(effect)
+        return expired
@@ -0,0 +1,330 @@
+"""Шина игровых событий.
+
+Игровые объекты (GameField, Base, нейтральные объекты) не печатают
+сообщения об успешных действиях сами, а публикуют типизированные события
+на общей шине bus: юнит перемещен, нанесен урон, юнит погиб, собраны
+ресурсы и т.д. Консольный интерфейс подписывает ConsoleReporter, который
+превращает события в привычные строки с эмодзи.
+
+Публикация всегда проверяет bus.active:
+
+    if bus.active:
+        bus.emit(UnitMoved(unit, old_x, old_y, terrain, modifier))
+
+Пока подписчиков нет (симуляции, безголовый движок, бенчмарки), событие
+не создается и строки не форматируются - остается одна проверка флага.
+
+События содержат ссылки на объекты игры и обрабатываются синхронно, в
+момент публикации; подписчик, который копит события, должен сам
+запомнить нужные значения.
+
+Отклоненное действие (занятая клетка, нехватка ресурсов...) - событие
+ActionFailed с кодом причины и текстом для игрока. GameField.reject
+публикует его и запоминает в last_failure даже без подписчиков: из него
+GameEngine собирает CommandResult.error и error_code.
+"""
+from typing import Callable, Dict, List, Optional, Tuple, Type
+
+
+class Event:
+    """Базовый класс событий"""
+    __slots__ = ()
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+# === Юниты ===
+
+class UnitPlaced(Event):
+    """Юнит поставлен на поле"""
+    __slots__ = ("unit", "terrain")
+
+    def __init__(self, unit, terrain):
+        self.unit = unit
+        self.terrain = terrain
+
+
+class UnitMoved(Event):
+    """Юнит перемещен из (old_x, old_y) в свою текущую клетку"""
+    __slots__ = ("unit", "old_x", "old_y", "terrain", "attack_modifier")
+
+    def __init__(self, unit, old_x: int, old_y: int, terrain, attack_modifier: float):
+        self.unit = unit
+        self.old_x = old_x
+        self.old_y = old_y
+        self.terrain = terrain
+        self.attack_modifier = attack_modifier
+
+
+class DamageDealt(Event):
+    """Юнит атаковал другого юнита"""
+    __slots__ = ("attacker", "target", "damage", "attack_modifier", "terrain")
+
+    def __init__(self, attacker, target, damage: int, attack_modifier: float, terrain):
+        self.attacker = attacker
+        self.target = target
+        self.damage = damage
+        self.attack_modifier = attack_modifier
+        self.terrain = terrain
+
+
+class UnitDied(Event):
+    """Юнит погиб в бою"""
+    __slots__ = ("unit",)
+
+    def __init__(self, unit):
+        self.unit = unit
+
+
+class UnitRemoved(Event):
+    """Юнит убран с поля"""
+    __slots__ = ("unit",)
+
+    def __init__(self, unit):
+        self.unit = unit
+
+
+class AttacksResolved(Event):
+    """Проведен пакет атак GameField.resolve_attacks"""
+    __slots__ = ("applied", "total", "damage", "killed")
+
+    def __init__(self, applied: int, total: int, damage: int, killed: int):
+        self.applied = applied
+        self.total = total
+        self.damage = damage
+        self.killed = killed
+
+
+class GroupMoved(Event):
+    """Группа юнитов сделала ход к цели GameField.move_group"""
+    __slots__ = ("moved", "total", "target_x", "target_y")
+
+    def __init__(self, moved: int, total: int, target_x: int, target_y: int):
+        self.moved = moved
+        self.total = total
+        self.target_x = target_x
+        self.target_y = target_y
+
+
+class AbilityUsed(Event):
+    """Юнит применил специальную способность; result - ее результат"""
+    __slots__ = ("unit", "result")
+
+    def __init__(self, unit, result):
+        self.unit = unit
+        self.result = result
+
+
+class ActionFailed(Event):
+    """Действие отклонено: reason - код причины для программ,
+    message - текст для игрока"""
+    __slots__ = ("reason", "message")
+
+    def __init__(self, reason: str, message: str):
+        self.reason = reason
+        self.message = message
+
+
+class EffectsExpired(Event):
+    """В конце хода закончились временные эффекты"""
+    __slots__ = ("effects",)
+
+    def __init__(self, effects):
+        self.effects = effects
+
+
+# === Поле и объекты ===
+
+class BasePlaced(Event):
+    """База поставлена на поле"""
+    __slots__ = ("base",)
+
+    def __init__(self, base):
+        self.base = base
+
+
+class ObjectPlaced(Event):
+    """Нейтральный объект поставлен на поле"""
+    __slots__ = ("obj",)
+
+    def __init__(self, obj):
+        self.obj = obj
+
+
+class ObjectUsed(Event):
+    """Юнит воспользовался нейтральным объектом; amount - вылеченное
+    здоровье или полученный урон, если объект их дает"""
+    __slots__ = ("obj", "unit", "amount")
+
+    def __init__(self, obj, unit, amount: int = 0):
+        self.obj = obj
+        self.unit = unit
+        self.amount = amount
+
+
+class TerrainChanged(Event):
+    """Ландшафт клетки изменен"""
+    __slots__ = ("x", "y", "terrain_type")
+
+    def __init__(self, x: int, y: int, terrain_type):
+        self.x = x
+        self.y = y
+        self.terrain_type = terrain_type
+
+
+# === Базы ===
+
+class UnitCreated(Event):
+    """База создала юнита за cost ресурсов"""
+    __slots__ = ("base", "unit", "cost")
+
+    def __init__(self, base, unit, cost: int):
+        self.base = base
+        self.unit = unit
+        self.cost = cost
+
+
+class ResourcesCollected(Event):
+    """База собрала ресурсы"""
+    __slots__ = ("base", "amount")
+
+    def __init__(self, base, amount: int):
+        self.base = base
+        self.amount = amount
+
+
+class BaseDestroyed(Event):
+    """База уничтожена"""
+    __slots__ = ("base",)
+
+    def __init__(self, base):
+        self.base = base
+
+
+class UnitLost(Event):
+    """Погибший юнит вычеркнут из списка базы"""
+    __slots__ = ("base", "unit")
+
+    def __init__(self, base, unit):
+        self.base = base
+        self.unit = unit
+
+
+Handler = Callable[[Event], None]
+
+
+class EventBus:
+    """Подписчики по типам событий"""
+
+    def __init__(self):
+        self._handlers: Dict[Type[Event], List[Handler]] = {}
+        self._catch_all: List[Handler] = []
+        # Есть ли хоть один подписчик; публикующий код проверяет флаг до
+        # создания события
+        self.active = False
+
+    def subscribe(self, handler: Handler, *event_types: Type[Event]):
+        """Подписать обработчик на события указанных типов (без типов - на все)"""
+        if event_types:
+            for event_type in event_types:
+                self._handlers.setdefault(event_type, []).append(handler)
+        else:
+            self._catch_all.append(handler)
+        self.active = True
+
+    def unsubscribe(self, handler: Handler):
+        for event_type, handlers in list(self._handlers.items()):
+            if handler in handlers:
+                handlers.remove(handler)
+                if not handlers:
+                    del self._handlers[event_type]
+        if handler in self._catch_all:
+            self._catch_all.remove(handler)
+        self.active = bool(self._handlers or self._catch_all)
+
+    def emit(self, event: Event):
+        for handler in self._handlers.get(type(event), ()):
+            handler(event)
+        for handler in self._catch_all:
+            handler(event)
+
+
+# Общая шина игры
+bus = EventBus()
+
+
+class ConsoleReporter:
+    """Подписчик, печатающий события в консоль"""
+
+    def __init__(self, event_bus: Optional[EventBus] = None):
+        self.bus = event_bus or bus
+        self._formatters: Dict[Type[Event], Callable[[Event], Tuple[str, ...]]] = {
+            UnitPlaced: self._unit_placed,
+            UnitMoved: self._unit_moved,
+            DamageDealt: self._damage_dealt,
+            UnitDied: lambda e: (f"💀 {e.unit.name} уничтожен!",),
+            UnitRemoved: lambda e: (f"🗑️ Юнит {e.unit.name} удален с поля",),
+            AttacksResolved: lambda e: (f"⚔️ Пакет атак: {e.applied} из {e.total}, нанесено урона: "
+                                        f"{e.damage}, уничтожено: {e.killed}",),
+            GroupMoved: lambda e: (f"🚩 Группа идет к ({e.target_x}, {e.target_y}): "
+                                   f"перемещено {e.moved} из {e.total}",),
+            AbilityUsed: lambda e: (e.unit.describe_ability(e.result),),
+            ActionFailed: lambda e: (f"❌ {e.message}",),
+            EffectsExpired: lambda e: (f"⏳ Закончилось временных эффектов: {len(e.effects)}",),
+            BasePlaced: lambda e: (f"✅ База '{e.base.name}' размещена на клетке ({e.base.x}, {e.base.y})",),
+            ObjectPlaced: lambda e: (f"✅ {e.obj.name} размещен на клетке ({e.obj.x}, {e.obj.y})",),
+            ObjectUsed: lambda e: (e.obj.use_message.format(unit=e.unit, obj=e.obj, amount=e.amount),),
+            TerrainChanged: lambda e: (f"🌋 Ландшафт клетки ({e.x}, {e.y}) изменен на {e.terrain_type.value}",),
+            UnitCreated: lambda e: (f"✅ {e.base.name} создает {e.unit.name} за {e.cost} ресурсов",
+                                    f"💰 Остаток ресурсов: {e.base.resources}"),
+            ResourcesCollected: lambda e: (f"💰 {e.base.name} собирает {e.amount} ресурсов. "
+                                           f"Всего: {e.base.resources}",),
+            BaseDestroyed: lambda e: (f"💀 База {e.base.name} уничтожена!",),
+            UnitLost: lambda e: (f"💀 Юнит {e.unit.name} погиб и удален из списка базы",),
+        }
+
+    def attach(self) -> "ConsoleReporter":
+        self.bus.subscribe(self.report)
+        return self
+
+    @classmethod
+    def ensure(cls, event_bus: Optional[EventBus] = None) -> "ConsoleReporter":
+        """Подписанный на шину консольный вывод; если он уже есть, второй
+        не подписывается и сообщения не печатаются дважды"""
+        event_bus = event_bus or bus
+        for handler in event_bus._catch_all:
+            reporter = getattr(handler, "__self__", None)
+            if isinstance(reporter, cls):
+                return reporter
+        return cls(event_bus).attach()
+
+    def detach(self):
+        self.bus.unsubscribe(self.report)
+
+    def report(self, event: Event):
+        formatter = self._formatters.get(type(event))
+        if formatter is not None:
+            for line in formatter(event):
+                print(line)
+
+    @staticmethod
+    def _unit_placed(event: UnitPlaced):
+        unit = event.unit
+        return (f"✅ {unit.name} размещен на клетке ({unit.x}, {unit.y}) на {event.terrain}",)
+
+    @staticmethod
+    def _unit_moved(event: UnitMoved):
+        unit = event.unit
+        lines = []
+        if event.attack_modifier != 1.0:
+            lines.append(f"🌄 {unit.name} на {event.terrain}: модификатор атаки {event.attack_modifier}")
+        lines.append(f"🎯 {unit.name} перемещен с ({event.old_x}, {event.old_y}) на ({unit.x}, {unit.y}) "
+                     f"через {event.terrain}")
+        return lines
+
+    @staticmethod
+    def _damage_dealt(event: DamageDealt):
+        return (f"⚔️ {event.attacker.name} атакует {event.target.name} с позиции {event.terrain}!",
+                f"💥 Нанесено урона: {event.damage} (модификатор: {event.attack_modifier})")
@@ -0,0 +1,289 @@
+"""Поля потока для движения групп юнитов к общей цели.
+
+Поле потока строится один раз для пары (цель, класс передвижения):
+алгоритм Дейкстры от клетки цели по стоимостям ландшафта дает для каждой
+клетки карты стоимость пути до цели (distance) и направление первого шага
+(steps). Любое число юнитов этого класса читает следующий шаг за O(1):
+
+    flow = field.flow_field(base.x, base.y, unit)
+    flow.next_step(unit.x, unit.y)      # (x, y) следующей клетки или None
+
+Стоимость входа на клетку берется из строки правил класса (как в
+CostFields), базы и нейтральные объекты непроходимы. Клетка дороже
+move_range юнита непроходима и для поля: за один ход на нее не зайти,
+поэтому поля кэшируются по стоимостям входа с учетом этого ограничения
+(Рыцарь и Всадник делят одно поле, пехота с move_range 1 ходит только
+по равнине). Юниты полю потока не
+мешают: их положение меняется каждый ход, а столкновения разбирает
+GameField.move_group. Клетка цели может быть занята (например, базой) -
+тогда юниты останавливаются рядом с ней.
+
+Поля кэшируются (FLOW_CACHE_SIZE последних) и при смене ландшафта или
+появлении/исчезновении базы или объекта пересчитываются частично:
+удешевление клетки распространяется от нее, удорожание сбрасывает только
+клетки, чей путь к цели проходил через нее, и достраивает их от границы.
+Ход юнита поле не меняет.
+
+Поле потока - массивы по всем клеткам карты (FLOW_CELL_BYTES байт на
+клетку), поэтому для карт больше FLOW_FIELD_MAX_CELLS клеток, в том числе для
+любой чанковой карты (ChunkedTerrain), оно не строится: FlowField
+бросает ValueError, а GameField.move_group отклоняет ход с кодом
+map_too_large. Иначе одно поле сгенерировало бы все чанки мира.
+"""
+import heapq
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from Units import Unit
+from CostFields import BLOCKED, translate_terrain
+
+Cell = Tuple[int, int]
+
+# Стоимость пути из клетки, откуда цель недостижима
+UNREACHABLE = 0xFFFFFFFF
+# Сколько полей потока хранится в кэше поля
+FLOW_CACHE_SIZE = 16
+# Байт на клетку карты в одном поле потока: distance (4), steps и costs
+FLOW_CELL_BYTES = 6
+# Наибольшее число клеток карты, для которой строятся поля потока
+FLOW_FIELD_MAX_CELLS = 4_000_000
+# Код направления шага -> смещение; 0 - шага нет (цель или тупик)
+STEP_OFFSETS: Tuple[Cell, ...] = ((0, 0), (1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+def static_cost(entry_costs: bytes, code: int, occupant) -> int:
+    """Стоимость входа на клетку для поля потока: юниты не мешают, базы и объекты - да"""
+    if occupant is None or isinstance(occupant, Unit):
+        return entry_costs[code]
+    return BLOCKED
+
+
+def check_flow_map(game_field):
+    """ValueError, если поле потока для карты пришлось бы строить по всему миру"""
+    cells = game_field.width * game_field.height
+    if cells > FLOW_FIELD_MAX_CELLS or not isinstance(game_field.terrain, (bytes, bytearray)):
+        raise ValueError(f"Карта {game_field.width}x{game_field.height} слишком велика для полей потока "
+                         f"(не больше {FLOW_FIELD_MAX_CELLS} клеток в памяти)")
+
+
+class FlowField:
+    """Стоимости пути до цели и направления шага для одного класса передвижения"""
+
+    __slots__ = ("target", "width", "height", "entry_costs", "costs", "distance", "steps", "offsets")
+
+    def __init__(self, game_field, target: Cell, entry_costs: bytes):
+        check_flow_map(game_field)
+        self.target = target
+        self.width = width = game_field.width
+        self.height = game_field.height
+        self.entry_costs = entry_costs
+        # код направления -> смещение индекса клетки
+        self.offsets = (0, 1, -1, width, -width)
+        self.costs = translate_terrain(game_field.terrain, entry_costs)
+        for (x, y), occupant in game_field.occupants.items():
+            if not isinstance(occupant, Unit):
+                self.costs[y * width + x] = BLOCKED
+        self.rebuild()
+
+    # === Чтение ===
+
+    def next_step(self, x: int, y: int) -> Optional[Cell]:
+        """Следующая клетка пути к цели из (x, y) или None"""
+        code = self.steps[y * self.width + x]
+        if not code:
+            return None
+        dx, dy = STEP_OFFSETS[code]
+        return (x + dx, y + dy)
+
+    def distance_at(self, x: int, y: int) -> Optional[int]:
+        """Стоимость пути от (x, y) до цели или None, если цель недостижима"""
+        distance = self.distance[y * self.width + x]
+        return None if distance == UNREACHABLE else distance
+
+    def path_from(self, x: int, y: int) -> List[Cell]:
+        """Клетки пути от (x, y) до цели по направлениям поля"""
+        path = [(x, y)]
+        step = self.next_step(x, y)
+        while step is not None:
+            path.append(step)
+            step = self.next_step(*step)
+        return path
+
+    # === Построение и пересчет ===
+
+    def rebuild(self):
+        """Посчитать поле целиком"""
+        size = self.width * self.height
+        self.distance = array("I", [UNREACHABLE]) * size
+        self.steps = bytearray(size)
+        target = self.target[1] * self.width + self.target[0]
+        self.distance[target] = 0
+        self._integrate([(0, target)])
+
+    def update_cell(self, index: int, cost: int) -> int:
+        """Учесть новую стоимость входа на клетку; возвращает число
+        клеток, стоимость пути которых пересчитывалась"""
+        old = self.costs[index]
+        if old == cost:
+            return 0
+        self.costs[index] = cost
+        if index == self.target[1] * self.width + self.target[0]:
+            # стоимость входа на цель входит в каждый путь
+            self.rebuild()
+            return self.width * self.height
+        if cost == BLOCKED or (old != BLOCKED and cost > old):
+            return self._raise_cell(index, cost)
+        return self._lower_cell(index, old)
+
+    def _lower_cell(self, index: int, old: int) -> int:
+        """Клетка подешевела или стала проходимой: улучшения расходятся от нее"""
+        distance = self.distance
+        if old == BLOCKED:
+            seed = self._best_neighbour(index)
+            if seed is None:
+                return 1
+            distance[index], self.steps[index] = seed
+        if distance[index] == UNREACHABLE:
+            return 1
+        return self._integrate([(distance[index], index)]) + 1
+
+    def _raise_cell(self, index: int, cost: int) -> int:
+        """Клетка подорожала или закрылась: сбросить клетки, чей путь к цели
+        шел через нее, и достроить их от соседей с неизменными путями"""
+        distance = self.distance
+        steps = self.steps
+        offsets = self.offsets
+        affected = [index]
+        for cell in affected:
+            for neighbour, _ in self._neighbours(cell):
+                code = steps[neighbour]
+                if code and neighbour + offsets[code] == cell:
+                    affected.append(neighbour)
+        if cost != BLOCKED:
+            # путь из самой клетки от ее стоимости входа не зависит
+            affected = affected[1:]
+        for cell in affected:
+            distance[cell] = UNREACHABLE
+            steps[cell] = 0
+        seeds = []
+        for cell in affected:
+            seed = self._best_neighbour(cell)
+            if seed is not None:
+                distance[cell], steps[cell] = seed
+                seeds.append((seed[0], cell))
+        heapq.heapify(seeds)
+        self._integrate(seeds)
+        return len(affected)
+
+    def _best_neighbour(self, index: int) -> Optional[Tuple[int, int]]:
+        """Лучшая стоимость пути через соседа и код направления к нему"""
+        if self.costs[index] == BLOCKED:
+            return None
+        distance = self.distance
+        costs = self.costs
+        best = None
+        for neighbour, code in self._neighbours(index):
+            through = distance[neighbour]
+            if through == UNREACHABLE:
+                continue
+            # шаг в занятую цель стоит 1, чтобы к ней можно было подойти
+            through += costs[neighbour] or 1
+            if best is None or through < best[0]:
+                best = (through, code)
+        return best
+
+    def _neighbours(self, index: int) -> List[Tuple[int, int]]:
+        """Соседние клетки и коды шага к ним"""
+        width = self.width
+        y, x = divmod(index, width)
+        neighbours = []
+        if x + 1 < width:
+            neighbours.append((index + 1, 1))
+        if x > 0:
+            neighbours.append((index - 1, 2))
+        if y + 1 < self.height:
+            neighbours.append((index + width, 3))
+        if y > 0:
+            neighbours.append((index - width, 4))
+        return neighbours
+
+    def _integrate(self, heap: List[Tuple[int, int]]) -> int:
+        """Алгоритм Дейкстры от клеток heap (уже с записанной стоимостью);
+        возвращает число клеток, стоимость которых уменьшилась"""
+        width, height = self.width, self.height
+        last_column = width - 1
+        costs = self.costs
+        distance = self.distance
+        steps = self.steps
+        size = width * height
+        updated = 0
+        while heap:
+            through, cell = heapq.heappop(heap)
+            if through > distance[cell]:
+                continue
+            # из непроходимых клеток стоимость пути есть только у занятой цели
+            through += costs[cell] or 1
+            x = cell % width
+            # соседняя клетка и код шага из нее в текущую; -1 - соседа нет
+            for neighbour, code in ((cell - 1 if x > 0 else -1, 1),
+                                    (cell + 1 if x < last_column else -1, 2),
+                                    (cell - width, 3), (cell + width, 4)):
+                if not 0 <= neighbour < size or not costs[neighbour]:
+                    continue
+                if through < distance[neighbour]:
+                    distance[neighbour] = through
+                    steps[neighbour] = code
+                    heapq.heappush(heap, (through, neighbour))
+                    updated += 1
+        return updated
+
+
+class FlowFields:
+    """Кэш полей потока одного игрового поля по (цель, класс передвижения)"""
+
+    def __init__(self, game_field, size: int = FLOW_CACHE_SIZE):
+        self.game_field = game_field
+        self.size = size
+        self._fields: "OrderedDict[Tuple[Cell, bytes], FlowField]" = OrderedDict()
+        # (стоимости входа класса, move_range) -> стоимости входа для поля потока
+        self._entry_costs: Dict[Tuple[bytes, int], bytes] = {}
+        self.built = 0
+        self.recomputed = 0
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def get(self, target_x: int, target_y: int, unit: Unit) -> FlowField:
+        """Поле потока к клетке для класса передвижения юнита"""
+        entry_costs = self.game_field.cost_fields.for_unit(unit).entry_costs
+        reachable = self._entry_costs.get((entry_costs, unit.move_range))
+        if reachable is None:
+            reachable = self._entry_costs[(entry_costs, unit.move_range)] = bytes(
+                cost if cost <= unit.move_range else BLOCKED for cost in entry_costs)
+        entry_costs = reachable
+        key = ((target_x, target_y), entry_costs)
+        flow = self._fields.get(key)
+        if flow is not None:
+            self._fields.move_to_end(key)
+            return flow
+        flow = self._fields[key] = FlowField(self.game_field, (target_x, target_y), entry_costs)
+        self.built += 1
+        if len(self._fields) > self.size:
+            self._fields.popitem(last=False)
+        return flow
+
+    def cell_changed(self, x: int, y: int):
+        """Пересчитать поля, для которых изменилась стоимость входа на клетку"""
+        if not self._fields:
+            return
+        field = self.game_field
+        index = y * field.width + x
+        code = field.terrain[index]
+        occupant = field.occupants.get((x, y))
+        for flow in self._fields.values():
+            cost = static_cost(flow.entry_costs, code, occupant)
+            if cost != flow.costs[index]:
+                self.recomputed += flow.update_cell(index, cost)
+
+    def clear(self):
+        self._fields.clear()
@@ -1,204 +1,346 @@
-import os
-import random
-from GameField import GameField
-from Units import UnitFactory
-from Base import Base
-from NeutralObject import HealingFountain, ArmorSmith, Trap, TreasureChest
-from UnitManager import UnitManager
-from BaseManager import BaseManager
-from GameConfig import GameConfig
-
-class Game:
-    """Главный класс игры с консольным интерфейсом"""
-    
-    def __init__(self):
-        self.game_field = None
-        self.unit_manager = None
-        self.base_manager = None
-        self.turn_count = 0
-        self.is_running = False
-        self.config = GameConfig()
-    
-    def initialize_game(self):
-        print("\n🎮 ИНИЦИАЛИЗАЦИЯ НОВОЙ ИГРЫ")
-        
-        try:
-            width = int(input("Ширина поля (рекомендуется 8-15): ") or "10")
-            height = int(input("Высота поля (рекомендуется 8-15): ") or "10")
-            max_units = int(input("Максимальное количество юнитов: ") or "20")
-            
-            self.game_field = GameField(width, height, max_units)
-            self.unit_manager = UnitManager(self.game_field)
-            self.base_manager = BaseManager(self.game_field)
-            
-            base_name = input("Название вашей базы: ") or "Главная база"
-            base = Base(base_name)
-            
-            base_x, base_y = width // 4, height // 4
-            self.game_field.add_base(base, base_x, base_y)
-            
-            print("\n🏭 СОЗДАНИЕ НАЧАЛЬНЫХ ЮНИТОВ...")
-            base.create_unit('swordsman', self.game_field)
-            base.create_unit('crossbowman', self.game_field)
-            base.create_unit('healer', self.game_field)
-            
-            self._place_initial_objects()
-            
-            print("✅ Игра успешно инициализирована!")
-            return True
-            
-        except ValueError as e:
-            print(f"❌ Ошибка инициализации: {e}")
-            return False
-    
-    def _place_initial_objects(self):
-        objects = [
-            HealingFountain(),
-            ArmorSmith(),
-            Trap(),
-            TreasureChest()
-        ]
-        
-        placed = 0
-        attempts = 0
-        max_attempts = 20
-        
-        while placed < len(objects) and attempts < max_attempts:
-            x = random.randint(0, self.game_field.width - 1)
-            y = random.randint(0, self.game_field.height - 1)
-            
-            if self.game_field.is_cell_empty(x, y) and not any(
-                base.get_position() == (x, y) for base in self.game_field.bases
-            ):
-                self.game_field.add_neutral_object(objects[placed], x, y)
-                placed += 1
-            
-            attempts += 1
-    
-    def display_game_status(self):
-        print(f"\n📊 СТАТУС ИГРЫ - Ход {self.turn_count}")
-        print(f"🎯 Юнитов на поле: {len(self.game_field.units)}/{self.game_field.max_units}")
-        print(f"🏰 Баз: {len(self.game_field.bases)}")
-        print(f"🎁 Нейтральных объектов: {len(self.game_field.neutral_objects)}")
-        
-        for base in self.game_field.bases:
-            status = "жива" if base.is_alive() else "уничтожена"
-            print(f"  {base.name}: {base.health} HP ({status})")
-    
-    def next_turn(self):
-        self.turn_count += 1
-        print(f"\n🔄 ХОД {self.turn_count}")
-        
-        for base in self.game_field.bases:
-            base.update_units()
-            
-            if base.is_alive():
-                base.collect_resources(50)
-        
-        alive_bases = [base for base in self.game_field.bases if base.is_alive()]
-        if not alive_bases:
-            print("💀 ВСЕ БАЗЫ УНИЧТОЖЕНЫ! Игра окончена.")
-            self.is_running = False
-            return
-        
-        print("✅ Ход завершен. Ресурсы баз пополнены.")
-    
-    def save_game(self):
-        print("💾 Функция сохранения будет реализована в задаче 4")
-    
-    def load_game(self):
-        print("📂 Функция загрузки будет реализована в задаче 4")
-    
-    def show_main_menu(self):
-        while True:
-            print(f"\n{'='*50}")
-            print("🎮 ГЛАВНОЕ МЕНЮ ИГРЫ")
-            print(f"{'='*50}")
-            print("1. 🗺️  Показать поле")
-            print("2. 🎯 Управление юнитами")
-            print("3. 🏰 Управление базой")
-            print("4. 📊 Статус игры")
-            print("5. ➡️  Следующий ход")
-            print("6. 💾 Сохранить игру")
-            print("7. 📂 Загрузить игру")
-            print("8. 🆕 Новая игра")
-            print("9. 🚪 Выход")
-            print("10. ⚙️  Управление конфигурацией")
-            
-            try:
-                choice = input("\nВыберите действие: ")
-                
-                if choice == '1':
-                    self.game_field.display()
-                elif choice == '2':
-                    self.unit_manager.show_unit_menu()
-                elif choice == '3':
-                    self.base_manager.show_base_menu()
-                elif choice == '4':
-                    self.display_game_status()
-                elif choice == '5':
-                    self.next_turn()
-                elif choice == '6':
-                    self.save_game()
-                elif choice == '7':
-                    self.load_game()
-                elif choice == '8':
-                    if self.initialize_game():
-                        self.turn_count = 0
-                        self.is_running = True
-                elif choice == '10':
-                    self.show_config_menu() 
-                elif choice == '9':
-                    print("👋 До свидания!")
-                    self.is_running = False
-                    break
-                else:
-                    print("❌ Неверный выбор")
-            except Exception as e:
-                print(f"❌ Ошибка: {e}")
-    
-    def start(self):
-        print("🎮 ДОБРО ПОЖАЛОВАТЬ В ИГРУ!")
-        print("="*50)
-        
-        if self.initialize_game():
-            self.is_running = True
-            self.turn_count = 0
-            self.show_main_menu()
-        else:
-            print("❌ Не удалось инициализировать игру")
-
-
-    def show_config_menu(self):
-        """Меню управления конфигурацией"""
-        while True:
-            print(f"\n{'='*50}")
-            print("⚙️  УПРАВЛЕНИЕ КОНФИГУРАЦИЕЙ")
-            print(f"{'='*50}")
-            print("1. 📊 Показать текущую конфигурацию")
-            print("2. ✏️  Изменить конфигурацию")
-            print("3. 💾 Сохранить конфигурацию в файл")
-            print("4. 📂 Загрузить конфигурацию из файла")
-            print("5. ↩️  Назад в главное меню")
-            
-            try:
-                choice = input("\nВыберите действие: ")
-                
-                if choice == '1':
-                    self.config.display_config()
-                elif choice == '2':
-                    self.config.update_config_interactive()
-                elif choice == '3':
-                    filename = input("Имя файла [game_config.json]: ") or "game_config.json"
-                    self.config.save_to_file(filename)
-                elif choice == '4':
-                    filename = input("Имя файла [game_config.json]: ") or "game_config.json"
-                    self.config.load_from_file(filename)
-                elif choice == '5':
-                    break
-                else:
-                    print("❌ Неверный выбор")
-            except Exception as e:
-                print(f"❌ Ошибка: {e}")
-
+import os
+from typing import Dict, Optional
+from GameEngine import GameEngine
+from UnitManager import UnitManager
+from BaseManager import BaseManager
+from GameConfig import GameConfig, ConfigWatcher
+from TerrainGenerator import TerrainGenerator
+from Events import ConsoleReporter
+
+# Сохранения, журнал, окно карты и замеры нужны не в каждом запуске:
+# их модули импортируются в методах, которые ими пользуются
+
+
+class Game:
+    """Главный класс игры с консольным интерфейсом"""
+    
+    def __init__(self, config: GameConfig = None, watch_config: bool = False,
+                 config_file: str = "game_config.json", overrides: Optional[Dict[str, str]] = None):
+        self.engine = None
+        self.unit_manager = None
+        self.base_manager = None
+        self.is_running = False
+        # Конфигурация читается при первом обращении к config
+        self._config = None
+        self._config_source = (config_file, overrides)
+        # Изменения файла конфигурации применяются без перезапуска
+        self.watch_config = watch_config
+        self.config_watcher = None
+        if config is not None:
+            self._use_config(config)
+        self.journal = None
+        # Сообщения игровых событий выводятся в консоль
+        self.console = ConsoleReporter.ensure()
+        # Замеры операций, создаются при открытии меню "Производительность"
+        self._profiler = None
+    
+    @property
+    def config(self) -> GameConfig:
+        if self._config is None:
+            config_file, overrides = self._config_source
+            self._use_config(GameConfig(config_file, overrides=overrides))
+        return self._config
+    
+    def _use_config(self, config: GameConfig):
+        self._config = config
+        # наблюдатель запоминает состояние файла на момент чтения конфигурации
+        if self.watch_config:
+            self.config_watcher = ConfigWatcher(config)
+    
+    @property
+    def profiler(self):
+        if self._profiler is None:
+            from Profiling import Profiler
+            self._profiler = Profiler()
+        return self._profiler
+    
+    @property
+    def game_field(self):
+        return self.engine.game_field if self.engine else None
+    
+    @property
+    def turn_count(self) -> int:
+        return self.engine.turn_count if self.engine else 0
+    
+    def initialize_game(self):
+        print("\n🎮 ИНИЦИАЛИЗАЦИЯ НОВОЙ ИГРЫ")
+        
+        try:
+            width = int(input("Ширина поля (рекомендуется 8-15): ") or "10")
+            height = int(input("Высота поля (рекомендуется 8-15): ") or "10")
+            max_units = int(input("Максимальное количество юнитов: ") or "20")
+            
+            base_name = input("Название вашей базы: ") or "Главная база"
+            
+            print("\n🏭 СОЗДАНИЕ ПОЛЯ И НАЧАЛЬНЫХ ЮНИТОВ...")
+            self.engine = GameEngine.new_game(width, height, max_units,
+                                              base_name=base_name, echo=True,
+                                              terrain_generator=TerrainGenerator.from_config(self.config))
+            self.unit_manager = UnitManager(self.engine)
+            self.base_manager = BaseManager(self.engine)
+            self._start_autosave()
+            
+            print("✅ Игра успешно инициализирована!")
+            return True
+            
+        except ValueError as e:
+            print(f"❌ Ошибка инициализации: {e}")
+            return False
+    
+    def _start_autosave(self):
+        """Подключить журнал автосохранения к текущей игре, если он включен"""
+        if self.journal is not None:
+            self.journal.detach()
+            self.journal = None
+        if self.config.auto_save:
+            from Journal import TurnJournal
+            try:
+                self.journal = TurnJournal(self.engine)
+                self.journal.attach()
+            except OSError as e:
+                self.journal = None
+                print(f"❌ Автосохранение недоступно: {e}")
+    
+    def display_game_status(self):
+        print(f"\n📊 СТАТУС ИГРЫ - Ход {self.turn_count}")
+        print(f"🎯 Юнитов на поле: {self.game_field.unit_count}/{self.game_field.max_units}")
+        print(f"🏰 Баз: {len(self.game_field.bases)}")
+        print(f"🎁 Нейтральных объектов: {len(self.game_field.neutral_objects)}")
+        
+        for base in self.game_field.bases:
+            status = "жива" if base.is_alive() else "уничтожена"
+            print(f"  {base.name}: {base.health} HP ({status})")
+    
+    def next_turn(self):
+        print(f"\n🔄 ХОД {self.turn_count + 1}")
+        
+        result = self.engine.next_turn()
+        if not result.ok or result.data["game_over"]:
+            print("💀 ВСЕ БАЗЫ УНИЧТОЖЕНЫ! Игра окончена.")
+            self.is_running = False
+            return
+        
+        if result.data["expired_effects"]:
+            print(f"⏳ Закончилось временных эффектов: {result.data['expired_effects']}")
+        print("✅ Ход завершен. Ресурсы баз пополнены.")
+    
+    def save_game(self):
+        if not self.engine:
+            print("❌ Нет активной игры для сохранения")
+            return
+        from SaveFormat import save_game, SaveFormatError
+        filename = input("Имя файла [savegame.sav]: ") or "savegame.sav"
+        try:
+            save_game(self.engine, filename)
+            print(f"💾 Игра сохранена в файл: {filename}")
+        except (OSError, SaveFormatError) as e:
+            print(f"❌ Ошибка сохранения игры: {e}")
+    
+    def load_game(self):
+        from SaveFormat import load_game, SaveFormatError
+        from Journal import TurnJournal
+        filename = input("Имя файла [savegame.sav, autosave - автосохранение]: ") or "savegame.sav"
+        try:
+            if filename == "autosave":
+                self.engine = TurnJournal.restore("autosave", echo=True)
+            else:
+                self.engine = load_game(filename, echo=True)
+        except (OSError, SaveFormatError) as e:
+            print(f"❌ Ошибка загрузки игры: {e}")
+            return
+        self.unit_manager = UnitManager(self.engine)
+        self.base_manager = BaseManager(self.engine)
+        self.is_running = self.engine.is_running
+        self._start_autosave()
+        print(f"📂 Игра загружена из файла: {filename} (ход {self.turn_count})")
+    
+    def _poll_config(self):
+        """Применить изменения файла конфигурации, если за ним следим"""
+        if self.config_watcher is None:
+            return
+        changed = self.config_watcher.poll()
+        if "auto_save" in changed and self.engine:
+            self._start_autosave()
+    
+    def show_main_menu(self):
+        while True:
+            self._poll_config()
+            print(f"\n{'='*50}")
+            print("🎮 ГЛАВНОЕ МЕНЮ ИГРЫ")
+            print(f"{'='*50}")
+            print("1. 🗺️  Показать поле")
+            print("2. 🎯 Управление юнитами")
+            print("3. 🏰 Управление базой")
+            print("4. 📊 Статус игры")
+            print("5. ➡️  Следующий ход")
+            print("6. 💾 Сохранить игру")
+            print("7. 📂 Загрузить игру")
+            print("8. 🆕 Новая игра")
+            print("9. 🚪 Выход")
+            print("10. ⚙️  Управление конфигурацией")
+            print("11. 🔭 Обзор карты (окно и миникарта)")
+            print("12. ⏱️  Производительность")
+            
+            try:
+                choice = input("\nВыберите действие: ")
+                
+                if choice == '1':
+                    self.game_field.display()
+                elif choice == '2':
+                    self.unit_manager.show_unit_menu()
+                elif choice == '3':
+                    self.base_manager.show_base_menu()
+                elif choice == '4':
+                    self.display_game_status()
+                elif choice == '5':
+                    self.next_turn()
+                elif choice == '6':
+                    self.save_game()
+                elif choice == '7':
+                    self.load_game()
+                elif choice == '8':
+                    if self.initialize_game():
+                        self.is_running = True
+                elif choice == '10':
+                    self.show_config_menu() 
+                elif choice == '11':
+                    self.show_map_view()
+                elif choice == '12':
+                    self.show_performance_menu()
+                elif choice == '9':
+                    print("👋 До свидания!")
+                    self.is_running = False
+                    break
+                else:
+                    print("❌ Неверный выбор")
+            except Exception as e:
+                print(f"❌ Ошибка: {e}")
+    
+    def show_map_view(self):
+        """Окно просмотра вокруг юнита или базы с прокруткой и миникартой"""
+        from Renderer import FieldRenderer, Viewport
+        field = self.game_field
+        renderer = field.renderer or FieldRenderer(field)
+        viewport = Viewport.for_terminal(field)
+        if field.bases:
+            viewport.center_on(*field.bases[0].get_position())
+        show_minimap = False
+        
+        while True:
+            if show_minimap:
+                renderer.render_minimap(viewport=viewport)
+            else:
+                renderer.render_viewport(viewport)
+            print("w/a/s/d - прокрутка, u<ID> - к юниту, b<номер> - к базе, m - миникарта, q - назад")
+            command = input("Команда: ").strip().lower()
+            
+            step_x = max(1, viewport.cols // 2)
+            step_y = max(1, viewport.rows // 2)
+            moves = {'w': (0, -step_y), 's': (0, step_y), 'a': (-step_x, 0), 'd': (step_x, 0)}
+            if command == 'q':
+                break
+            elif command in moves:
+                viewport.pan(*moves[command])
+            elif command == 'm':
+                show_minimap = not show_minimap
+            elif command[:1] in ('u', 'b') and command[1:].isdigit():
+                number = int(command[1:])
+                if command[0] == 'u':
+                    target = field.get_unit_by_id(number)
+                else:
+                    target = field.bases[number - 1] if 0 < number <= len(field.bases) else None
+                if target is None:
+                    print("❌ Не найдено")
+                else:
+                    viewport.center_on(*target.get_position())
+                    show_minimap = False
+            else:
+                print("❌ Неверная команда")
+    
+    def show_performance_menu(self):
+        """Меню замеров производительности"""
+        profiler = self.profiler
+        while True:
+            profiler.display()
+            print(f"\n1. {'⏸️  Выключить' if profiler.enabled else '▶️  Включить'} замеры")
+            print(f"2. 🧠 Учет памяти: {'выключить' if profiler.track_memory else 'включить'}")
+            print("3. 🧹 Сбросить счетчики")
+            print("4. 💾 Экспорт в JSON")
+            print("5. 💾 Экспорт в формате pstats")
+            print("6. ↩️  Назад в главное меню")
+            
+            choice = input("\nВыберите действие: ")
+            if choice == '1':
+                if profiler.enabled:
+                    profiler.disable()
+                else:
+                    profiler.enable()
+            elif choice == '2':
+                # учет памяти применяется при следующем включении замеров
+                was_enabled = profiler.enabled
+                profiler.disable()
+                profiler.track_memory = not profiler.track_memory
+                if was_enabled:
+                    profiler.enable()
+            elif choice == '3':
+                profiler.reset()
+            elif choice in ('4', '5'):
+                default = "profile.json" if choice == '4' else "profile.prof"
+                filename = input(f"Имя файла [{default}]: ") or default
+                try:
+                    if choice == '4':
+                        profiler.export_json(filename)
+                    else:
+                        profiler.export_pstats(filename)
+                    print(f"💾 Отчет сохранен в файл: {filename}")
+                except OSError as e:
+                    print(f"❌ Ошибка сохранения отчета: {e}")
+            elif choice == '6':
+                break
+            else:
+                print("❌ Неверный выбор")
+    
+    def start(self):
+        print("🎮 ДОБРО ПОЖАЛОВАТЬ В ИГРУ!")
+        print("="*50)
+        
+        if self.initialize_game():
+            self.is_running = True
+            self.show_main_menu()
+        else:
+            print("❌ Не удалось инициализировать игру")
+
+
+    def show_config_menu(self):
+        """Меню управления конфигурацией"""
+        while True:
+            print(f"\n{'='*50}")
+            print("⚙️  УПРАВЛЕНИЕ КОНФИГУРАЦИЕЙ")
+            print(f"{'='*50}")
+            print("1. 📊 Показать текущую конфигурацию")
+            print("2. ✏️  Изменить конфигурацию")
+            print("3. 💾 Сохранить конфигурацию в файл")
+            print("4. 📂 Загрузить конфигурацию из файла")
+            print("5. ↩️  Назад в главное меню")
+            
+            try:
+                choice = input("\nВыберите действие: ")
+                
+                if choice == '1':
+                    self.config.display_config()
+                elif choice == '2':
+                    self.config.update_config_interactive()
+                elif choice == '3':
+                    filename = input("Имя файла [game_config.json]: ") or "game_config.json"
+                    self.config.save_to_file(filename)
+                elif choice == '4':
+                    filename = input("Имя файла [game_config.json]: ") or "game_config.json"
+                    self.config.load_from_file(filename)
+                elif choice == '5':
+                    break
+                else:
+                    print("❌ Неверный выбор")
+            except Exception as e:
+                print(f"❌ Ошибка: {e}")
+
     
\ No newline at end of file
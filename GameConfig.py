@@ -1,250 +1,563 @@
-# GameConfig.py
-import json
-import os
-from typing import Dict, Any
-
-class GameConfig:
-    """Класс конфигурации игры с использованием @property и сохранением в JSON"""
-    
-    def __init__(self, config_file="game_config.json"):
-        self._config_file = config_file
-        self._game_title = "Стратегическая Игра"
-        self._max_players = 2
-        self._starting_resources = 1000
-        self._map_size = (10, 10)
-        self._difficulty = "normal"
-        self._game_version = "1.0"
-        self._auto_save = True
-        self._music_volume = 80
-        self._sound_volume = 90
-        
-        # Загружаем конфигурацию при создании объекта
-        self.load_from_file()
-    
-    # === Свойства с использованием @property ===
-    
-    @property
-    def game_title(self) -> str:
-        """Название игры"""
-        return self._game_title
-    
-    @game_title.setter
-    def game_title(self, value: str):
-        if not value or not isinstance(value, str):
-            raise ValueError("Название игры должно быть непустой строкой")
-        self._game_title = value
-    
-    @property
-    def max_players(self) -> int:
-        """Максимальное количество игроков"""
-        return self._max_players
-    
-    @max_players.setter
-    def max_players(self, value: int):
-        if not isinstance(value, int) or value < 1 or value > 4:
-            raise ValueError("Количество игроков должно быть от 1 до 4")
-        self._max_players = value
-    
-    @property
-    def starting_resources(self) -> int:
-        """Стартовые ресурсы"""
-        return self._starting_resources
-    
-    @starting_resources.setter
-    def starting_resources(self, value: int):
-        if not isinstance(value, int) or value < 100:
-            raise ValueError("Стартовые ресурсы должны быть не менее 100")
-        self._starting_resources = value
-    
-    @property
-    def map_size(self) -> tuple:
-        """Размер карты (ширина, высота)"""
-        return self._map_size
-    
-    @map_size.setter
-    def map_size(self, value: tuple):
-        if not isinstance(value, tuple) or len(value) != 2:
-            raise ValueError("Размер карты должен быть кортежем из двух чисел")
-        width, height = value
-        if not (5 <= width <= 20 and 5 <= height <= 20):
-            raise ValueError("Размер карты должен быть от 5x5 до 20x20")
-        self._map_size = value
-    
-    @property
-    def difficulty(self) -> str:
-        """Сложность игры"""
-        return self._difficulty
-    
-    @difficulty.setter
-    def difficulty(self, value: str):
-        valid_difficulties = ["easy", "normal", "hard", "expert"]
-        if value not in valid_difficulties:
-            raise ValueError(f"Сложность должна быть одной из: {valid_difficulties}")
-        self._difficulty = value
-    
-    @property
-    def game_version(self) -> str:
-        """Версия игры"""
-        return self._game_version
-    
-    @game_version.setter
-    def game_version(self, value: str):
-        if not isinstance(value, str):
-            raise ValueError("Версия игры должна быть строкой")
-        self._game_version = value
-    
-    @property
-    def auto_save(self) -> bool:
-        """Автосохранение"""
-        return self._auto_save
-    
-    @auto_save.setter
-    def auto_save(self, value: bool):
-        if not isinstance(value, bool):
-            raise ValueError("Автосохранение должно быть булевым значением")
-        self._auto_save = value
-    
-
-    
-    # === Методы для работы с файлами ===
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Преобразование объекта в словарь для JSON"""
-        return {
-            "game_title": self._game_title,
-            "max_players": self._max_players,
-            "starting_resources": self._starting_resources,
-            "map_size": {
-                "width": self._map_size[0],
-                "height": self._map_size[1]
-            },
-            "difficulty": self._difficulty,
-            "game_version": self._game_version,
-            "auto_save": self._auto_save,
-            
-        }
-    
-    def save_to_file(self, filename: str = None) -> bool:
-        """Сохранение конфигурации в JSON файл"""
-        try:
-            if filename is None:
-                filename = self._config_file
-            
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(self.to_dict(), f, ensure_ascii=False, indent=4)
-            
-            print(f"✅ Конфигурация сохранена в файл: {filename}")
-            return True
-        except Exception as e:
-            print(f"❌ Ошибка сохранения конфигурации: {e}")
-            return False
-    
-    def load_from_file(self, filename: str = None) -> bool:
-        """Загрузка конфигурации из JSON файла"""
-        try:
-            if filename is None:
-                filename = self._config_file
-            
-            if not os.path.exists(filename):
-                print(f"📝 Файл конфигурации не найден, используются значения по умолчанию")
-                return False
-            
-            with open(filename, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Загружаем данные с проверкой типов
-            self._game_title = data.get("game_title", self._game_title)
-            self._max_players = data.get("max_players", self._max_players)
-            self._starting_resources = data.get("starting_resources", self._starting_resources)
-            
-            map_data = data.get("map_size", {})
-            self._map_size = (
-                map_data.get("width", self._map_size[0]),
-                map_data.get("height", self._map_size[1])
-            )
-            
-            self._difficulty = data.get("difficulty", self._difficulty)
-            self._game_version = data.get("game_version", self._game_version)
-            self._auto_save = data.get("auto_save", self._auto_save)
-        
-            
-            print(f"✅ Конфигурация загружена из файла: {filename}")
-            return True
-        except Exception as e:
-            print(f"❌ Ошибка загрузки конфигурации: {e}")
-            return False
-    
-    def display_config(self):
-        """Отображение текущей конфигурации"""
-        print(f"\n⚙️  ТЕКУЩАЯ КОНФИГУРАЦИЯ ИГРЫ:")
-        print(f"   🎮 Название: {self.game_title}")
-        print(f"   👥 Макс. игроков: {self.max_players}")
-        print(f"   💰 Стартовые ресурсы: {self.starting_resources}")
-        print(f"   🗺️  Размер карты: {self.map_size[0]}x{self.map_size[1]}")
-        print(f"   🎯 Сложность: {self.difficulty}")
-        print(f"   🔄 Версия: {self.game_version}")
-        print(f"   💾 Автосохранение: {'Вкл' if self.auto_save else 'Выкл'}")
-       
-    
-    def update_config_interactive(self):
-        """Интерактивное обновление конфигурации"""
-        print(f"\n⚙️  ИЗМЕНЕНИЕ КОНФИГУРАЦИИ ИГРЫ")
-        
-        try:
-            # Название игры
-            new_title = input(f"Название игры [{self.game_title}]: ") or self.game_title
-            self.game_title = new_title
-            
-            # Количество игроков
-            new_players = input(f"Макс. игроков (1-4) [{self.max_players}]: ") or str(self.max_players)
-            self.max_players = int(new_players)
-            
-            # Стартовые ресурсы
-            new_resources = input(f"Стартовые ресурсы (≥100) [{self.starting_resources}]: ") or str(self.starting_resources)
-            self.starting_resources = int(new_resources)
-            
-            # Размер карты
-            new_width = input(f"Ширина карты (5-20) [{self.map_size[0]}]: ") or str(self.map_size[0])
-            new_height = input(f"Высота карты (5-20) [{self.map_size[1]}]: ") or str(self.map_size[1])
-            self.map_size = (int(new_width), int(new_height))
-            
-            # Сложность
-            print("Доступные сложности: easy, normal, hard, expert")
-            new_difficulty = input(f"Сложность [{self.difficulty}]: ") or self.difficulty
-            self.difficulty = new_difficulty
-            
-            # Автосохранение
-            auto_save_input = input(f"Автосохранение (y/n) [{'y' if self.auto_save else 'n'}]: ") 
-            self.auto_save = auto_save_input.lower() == 'y' if auto_save_input else self.auto_save
-            
-        
-            print("✅ Конфигурация обновлена!")
-            
-        except ValueError as e:
-            print(f"❌ Ошибка ввода: {e}")
-        except Exception as e:
-            print(f"❌ Ошибка: {e}")
-
-
-# Пример использования
-if __name__ == "__main__":
-    # Создаем объект конфигурации
-    config = GameConfig()
-    
-    # Показываем текущую конфигурацию
-    config.display_config()
-    
-    # Сохраняем в файл
-    config.save_to_file()
-    
-    # Обновляем конфигурацию
-    config.update_config_interactive()
-    
-    # Сохраняем обновленную конфигурацию
-    config.save_to_file()
-    
-    # Создаем новый объект и загружаем из файла
-    print("\n" + "="*50)
-    print("Тестирование загрузки конфигурации...")
-    new_config = GameConfig()
+# GameConfig.py
+"""Конфигурация игры.
+
+Значения собираются из слоев, каждый следующий перекрывает предыдущий:
+
+    defaults    значения по умолчанию из GameConfig.__init__
+    file        JSON-файл конфигурации (game_config.json)
+    env         переменные окружения GAME_<ПАРАМЕТР>, например
+                GAME_DIFFICULTY=hard, GAME_MAP_SIZE=12x12
+    cli         переопределения из командной строки: --set difficulty=hard
+
+Каждый слой один раз проверяется валидатором, собранным из сеттеров
+свойств GameConfig. Разобранные и проверенные файлы кэшируются на весь
+процесс по пути и времени изменения, поэтому повторное создание
+GameConfig не читает файл заново. ConfigWatcher замечает изменение файла
+и применяет его к работающей игре.
+"""
+import json
+import os
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from TerrainGenerator import DEFAULT_WEIGHTS, STYLES, TERRAIN_NAMES
+
+# Префикс переменных окружения с параметрами конфигурации
+ENV_PREFIX = "GAME_"
+
+TRUE_WORDS = ("1", "true", "yes", "on", "y", "да")
+FALSE_WORDS = ("0", "false", "no", "off", "n", "нет")
+
+
+class GameConfig:
+    """Класс конфигурации игры с использованием @property и сохранением в JSON"""
+    
+    def __init__(self, config_file="game_config.json", overrides: Optional[Dict[str, str]] = None,
+                 environ: Optional[Dict[str, str]] = None):
+        self._config_file = config_file
+        self._game_title = "Стратегическая Игра"
+        self._max_players = 2
+        self._starting_resources = 1000
+        self._map_size = (10, 10)
+        self._difficulty = "normal"
+        self._game_version = "1.0"
+        self._auto_save = True
+        self._music_volume = 80
+        self._sound_volume = 90
+        self._terrain_style = "uniform"
+        self._terrain_weights = dict(DEFAULT_WEIGHTS)
+        
+        validator = ConfigValidator.for_class(type(self))
+        self._layers: Dict[str, Dict[str, Any]] = {
+            "defaults": validator.snapshot(self),
+            "file": {},
+            # чужие переменные GAME_* в окружении пропускаются
+            "env": validator.validate_text(environment_layer(os.environ if environ is None else environ),
+                                           strict=False),
+            "cli": validator.validate_text(overrides or {}),
+        }
+        
+        # Загружаем конфигурацию при создании объекта
+        self.load_from_file()
+        self._apply(list(self._layers["env"]) + list(self._layers["cli"]))
+    
+    # === Свойства с использованием @property ===
+    
+    @property
+    def game_title(self) -> str:
+        """Название игры"""
+        return self._game_title
+    
+    @game_title.setter
+    def game_title(self, value: str):
+        if not value or not isinstance(value, str):
+            raise ValueError("Название игры должно быть непустой строкой")
+        self._game_title = value
+    
+    @property
+    def max_players(self) -> int:
+        """Максимальное количество игроков"""
+        return self._max_players
+    
+    @max_players.setter
+    def max_players(self, value: int):
+        if not isinstance(value, int) or value < 1 or value > 4:
+            raise ValueError("Количество игроков должно быть от 1 до 4")
+        self._max_players = value
+    
+    @property
+    def starting_resources(self) -> int:
+        """Стартовые ресурсы"""
+        return self._starting_resources
+    
+    @starting_resources.setter
+    def starting_resources(self, value: int):
+        if not isinstance(value, int) or value < 100:
+            raise ValueError("Стартовые ресурсы должны быть не менее 100")
+        self._starting_resources = value
+    
+    @property
+    def map_size(self) -> tuple:
+        """Размер карты (ширина, высота)"""
+        return self._map_size
+    
+    @map_size.setter
+    def map_size(self, value: tuple):
+        if not isinstance(value, tuple) or len(value) != 2:
+            raise ValueError("Размер карты должен быть кортежем из двух чисел")
+        width, height = value
+        if not (5 <= width <= 20 and 5 <= height <= 20):
+            raise ValueError("Размер карты должен быть от 5x5 до 20x20")
+        self._map_size = value
+    
+    @property
+    def difficulty(self) -> str:
+        """Сложность игры"""
+        return self._difficulty
+    
+    @difficulty.setter
+    def difficulty(self, value: str):
+        valid_difficulties = ["easy", "normal", "hard", "expert"]
+        if value not in valid_difficulties:
+            raise ValueError(f"Сложность должна быть одной из: {valid_difficulties}")
+        self._difficulty = value
+    
+    @property
+    def game_version(self) -> str:
+        """Версия игры"""
+        return self._game_version
+    
+    @game_version.setter
+    def game_version(self, value: str):
+        if not isinstance(value, str):
+            raise ValueError("Версия игры должна быть строкой")
+        self._game_version = value
+    
+    @property
+    def auto_save(self) -> bool:
+        """Автосохранение"""
+        return self._auto_save
+    
+    @auto_save.setter
+    def auto_save(self, value: bool):
+        if not isinstance(value, bool):
+            raise ValueError("Автосохранение должно быть булевым значением")
+        self._auto_save = value
+    
+    @property
+    def terrain_style(self) -> str:
+        """Стиль генерации ландшафта: uniform или noise"""
+        return self._terrain_style
+    
+    @terrain_style.setter
+    def terrain_style(self, value: str):
+        if value not in STYLES:
+            raise ValueError(f"Стиль ландшафта должен быть одним из: {list(STYLES)}")
+        self._terrain_style = value
+    
+    @property
+    def terrain_weights(self) -> Dict[str, float]:
+        """Веса типов ландшафта: plain, forest, mountain, swamp"""
+        return dict(self._terrain_weights)
+    
+    @terrain_weights.setter
+    def terrain_weights(self, value: Dict[str, float]):
+        if not isinstance(value, dict) or set(value) != set(TERRAIN_NAMES):
+            raise ValueError(f"Веса ландшафта должны быть заданы для: {list(TERRAIN_NAMES)}")
+        if any(not isinstance(weight, (int, float)) or weight < 0 for weight in value.values()):
+            raise ValueError("Веса ландшафта должны быть неотрицательными числами")
+        if sum(value.values()) <= 0:
+            raise ValueError("Хотя бы один вес ландшафта должен быть больше нуля")
+        self._terrain_weights = dict(value)
+    
+    @property
+    def music_volume(self) -> int:
+        """Громкость музыки, 0-100"""
+        return self._music_volume
+    
+    @music_volume.setter
+    def music_volume(self, value: int):
+        if not isinstance(value, int) or isinstance(value, bool) or not 0 <= value <= 100:
+            raise ValueError("Громкость музыки должна быть от 0 до 100")
+        self._music_volume = value
+    
+    @property
+    def sound_volume(self) -> int:
+        """Громкость звуков, 0-100"""
+        return self._sound_volume
+    
+    @sound_volume.setter
+    def sound_volume(self, value: int):
+        if not isinstance(value, int) or isinstance(value, bool) or not 0 <= value <= 100:
+            raise ValueError("Громкость звуков должна быть от 0 до 100")
+        self._sound_volume = value
+    
+    # === Слои конфигурации ===
+    
+    def source_of(self, name: str) -> str:
+        """Слой, из которого взято текущее значение параметра"""
+        for layer in ("cli", "env", "file"):
+            if name in self._layers[layer]:
+                return layer
+        return "defaults"
+    
+    def _apply(self, names: Iterable[str]):
+        """Записать в параметры значения верхних слоев, в которых они заданы"""
+        for name in names:
+            layer = self._layers[self.source_of(name)]
+            value = layer[name]
+            setattr(self, "_" + name, dict(value) if isinstance(value, dict) else value)
+    
+    def reload(self) -> List[str]:
+        """Перечитать файл конфигурации и применить изменившиеся в нем параметры.
+        
+        Параметры, которых изменение файла не коснулось, сохраняют текущие
+        значения (в том числе измененные в меню). Возвращает имена
+        параметров, значения которых изменились.
+        """
+        old_layer = self._layers["file"]
+        new_layer = read_config_file(self._config_file) or {}
+        self._layers["file"] = new_layer
+        touched = [name for name in set(old_layer) | set(new_layer) if old_layer.get(name) != new_layer.get(name)]
+        validator = ConfigValidator.for_class(type(self))
+        before = validator.snapshot(self)
+        self._apply(touched)
+        after = validator.snapshot(self)
+        return sorted(name for name in touched if before[name] != after[name])
+    
+    # === Методы для работы с файлами ===
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Преобразование объекта в словарь для JSON"""
+        return {
+            "game_title": self._game_title,
+            "max_players": self._max_players,
+            "starting_resources": self._starting_resources,
+            "map_size": {
+                "width": self._map_size[0],
+                "height": self._map_size[1]
+            },
+            "difficulty": self._difficulty,
+            "game_version": self._game_version,
+            "auto_save": self._auto_save,
+            "terrain_style": self._terrain_style,
+            "terrain_weights": dict(self._terrain_weights),
+            "music_volume": self._music_volume,
+            "sound_volume": self._sound_volume,
+        }
+    
+    def save_to_file(self, filename: str = None) -> bool:
+        """Сохранение конфигурации в JSON файл"""
+        try:
+            if filename is None:
+                filename = self._config_file
+            
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(), f, ensure_ascii=False, indent=4)
+            
+            print(f"✅ Конфигурация сохранена в файл: {filename}")
+            return True
+        except Exception as e:
+            print(f"❌ Ошибка сохранения конфигурации: {e}")
+            return False
+    
+    def load_from_file(self, filename: str = None) -> bool:
+        """Загрузка конфигурации из JSON файла"""
+        try:
+            if filename is None:
+                filename = self._config_file
+            
+            # Проверенный слой из кэша, если файл не менялся
+            layer = read_config_file(filename)
+            if layer is None:
+                print(f"📝 Файл конфигурации не найден, используются значения по умолчанию")
+                return False
+            
+            # Параметры, заданные в окружении или командной строке, остаются за ними
+            self._layers["file"] = layer
+            self._apply(layer)
+            
+            print(f"✅ Конфигурация загружена из файла: {filename}")
+            return True
+        except Exception as e:
+            print(f"❌ Ошибка загрузки конфигурации: {e}")
+            return False
+    
+    def display_config(self):
+        """Отображение текущей конфигурации"""
+        print(f"\n⚙️  ТЕКУЩАЯ КОНФИГУРАЦИЯ ИГРЫ:")
+        print(f"   🎮 Название: {self.game_title}")
+        print(f"   👥 Макс. игроков: {self.max_players}")
+        print(f"   💰 Стартовые ресурсы: {self.starting_resources}")
+        print(f"   🗺️  Размер карты: {self.map_size[0]}x{self.map_size[1]}")
+        print(f"   🎯 Сложность: {self.difficulty}")
+        print(f"   🔄 Версия: {self.game_version}")
+        print(f"   💾 Автосохранение: {'Вкл' if self.auto_save else 'Выкл'}")
+        weights = ", ".join(f"{name} {weight}" for name, weight in self.terrain_weights.items())
+        print(f"   🌲 Ландшафт: {self.terrain_style} ({weights})")
+        print(f"   🔊 Громкость: музыка {self.music_volume}, звуки {self.sound_volume}")
+        overridden = [name for name in ConfigValidator.for_class(type(self)).fields
+                      if self.source_of(name) in ("env", "cli")]
+        if overridden:
+            print(f"   📌 Заданы окружением или командной строкой: {', '.join(overridden)}")
+
+    
+    def update_config_interactive(self):
+        """Интерактивное обновление конфигурации"""
+        print(f"\n⚙️  ИЗМЕНЕНИЕ КОНФИГУРАЦИИ ИГРЫ")
+        
+        try:
+            # Название игры
+            new_title = input(f"Название игры [{self.game_title}]: ") or self.game_title
+            self.game_title = new_title
+            
+            # Количество игроков
+            new_players = input(f"Макс. игроков (1-4) [{self.max_players}]: ") or str(self.max_players)
+            self.max_players = int(new_players)
+            
+            # Стартовые ресурсы
+            new_resources = input(f"Стартовые ресурсы (≥100) [{self.starting_resources}]: ") or str(self.starting_resources)
+            self.starting_resources = int(new_resources)
+            
+            # Размер карты
+            new_width = input(f"Ширина карты (5-20) [{self.map_size[0]}]: ") or str(self.map_size[0])
+            new_height = input(f"Высота карты (5-20) [{self.map_size[1]}]: ") or str(self.map_size[1])
+            self.map_size = (int(new_width), int(new_height))
+            
+            # Сложность
+            print("Доступные сложности: easy, normal, hard, expert")
+            new_difficulty = input(f"Сложность [{self.difficulty}]: ") or self.difficulty
+            self.difficulty = new_difficulty
+            
+            # Автосохранение
+            auto_save_input = input(f"Автосохранение (y/n) [{'y' if self.auto_save else 'n'}]: ") 
+            self.auto_save = auto_save_input.lower() == 'y' if auto_save_input else self.auto_save
+            
+            # Ландшафт
+            print("Стили ландшафта: uniform (случайные клетки), noise (леса и горные хребты)")
+            new_style = input(f"Стиль ландшафта [{self.terrain_style}]: ") or self.terrain_style
+            self.terrain_style = new_style
+            current = ",".join(str(self.terrain_weights[name]) for name in TERRAIN_NAMES)
+            new_weights = input(f"Веса {','.join(TERRAIN_NAMES)} [{current}]: ") or current
+            self.terrain_weights = dict(zip(TERRAIN_NAMES, map(float, new_weights.split(","))))
+            
+            # Звук
+            new_music = input(f"Громкость музыки (0-100) [{self.music_volume}]: ") or str(self.music_volume)
+            self.music_volume = int(new_music)
+            new_sound = input(f"Громкость звуков (0-100) [{self.sound_volume}]: ") or str(self.sound_volume)
+            self.sound_volume = int(new_sound)
+            
+            print("✅ Конфигурация обновлена!")
+            
+        except ValueError as e:
+            print(f"❌ Ошибка ввода: {e}")
+        except Exception as e:
+            print(f"❌ Ошибка: {e}")
+
+
+
+# === Проверка и разбор значений ===
+
+def _parse_bool(text: str) -> bool:
+    word = text.strip().lower()
+    if word in TRUE_WORDS:
+        return True
+    if word in FALSE_WORDS:
+        return False
+    raise ValueError(f"Ожидалось да/нет, получено: {text}")
+
+
+def _parse_size(text: str) -> tuple:
+    parts = text.lower().replace("x", ",").split(",")
+    if len(parts) != 2:
+        raise ValueError(f"Размер задается как ШИРИНАxВЫСОТА, получено: {text}")
+    return tuple(int(part) for part in parts)
+
+
+def _parse_weights(text: str) -> Dict[str, float]:
+    weights = {}
+    for item in text.split(","):
+        name, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"Веса задаются как имя=вес через запятую, получено: {text}")
+        weights[name.strip()] = float(value)
+    return weights
+
+
+# Разбор строки из окружения или командной строки по типу свойства
+TEXT_PARSERS = {
+    str: str,
+    int: int,
+    bool: _parse_bool,
+    tuple: _parse_size,
+    dict: _parse_weights,
+}
+
+
+class ConfigValidator:
+    """Проверка слоев конфигурации сеттерами свойств класса.
+    
+    Список параметров, их сеттеры и разборщики строк собираются один раз
+    на класс; проверка слоя - вызов сеттеров на пустом экземпляре без
+    файлового ввода-вывода.
+    """
+    _compiled: Dict[type, 'ConfigValidator'] = {}
+    
+    def __init__(self, config_class: type):
+        self.config_class = config_class
+        # имя -> (свойство, разбор строки)
+        self.fields: Dict[str, Tuple[property, Any]] = {}
+        for klass in reversed(config_class.__mro__):
+            for name, attr in vars(klass).items():
+                if isinstance(attr, property) and attr.fset is not None:
+                    kind = attr.fget.__annotations__.get("return", str)
+                    kind = getattr(kind, "__origin__", kind)
+                    self.fields[name] = (attr, TEXT_PARSERS.get(kind, str))
+    
+    @classmethod
+    def for_class(cls, config_class: type) -> 'ConfigValidator':
+        validator = cls._compiled.get(config_class)
+        if validator is None:
+            validator = cls._compiled[config_class] = cls(config_class)
+        return validator
+    
+    def snapshot(self, config) -> Dict[str, Any]:
+        return {name: prop.fget(config) for name, (prop, _) in self.fields.items()}
+    
+    def validate(self, layer: Dict[str, Any], strict: bool = True) -> Dict[str, Any]:
+        """Проверить значения слоя; вернуть их в том виде, в каком их хранит конфигурация.
+        
+        strict=False пропускает неизвестные параметры (файлы других версий игры).
+        """
+        scratch = object.__new__(self.config_class)
+        result = {}
+        for name, value in layer.items():
+            field = self.fields.get(name)
+            if field is None:
+                if strict:
+                    raise ValueError(f"Неизвестный параметр конфигурации: {name}")
+                continue
+            prop = field[0]
+            prop.fset(scratch, value)
+            result[name] = prop.fget(scratch)
+        return result
+    
+    def validate_text(self, layer: Dict[str, str], strict: bool = True) -> Dict[str, Any]:
+        """Разобрать строковые значения (окружение, командная строка) и проверить их"""
+        parsed = {}
+        for name, text in layer.items():
+            field = self.fields.get(name)
+            if field is None:
+                if not strict:
+                    continue
+                raise ValueError(f"Неизвестный параметр конфигурации: {name}")
+            try:
+                parsed[name] = field[1](text)
+            except ValueError:
+                raise ValueError(f"Неверное значение параметра {name}: {text}")
+        return self.validate(parsed)
+
+
+def environment_layer(environ: Dict[str, str]) -> Dict[str, str]:
+    """Параметры из переменных окружения GAME_<ПАРАМЕТР>"""
+    return {key[len(ENV_PREFIX):].lower(): value for key, value in environ.items()
+            if key.startswith(ENV_PREFIX) and len(key) > len(ENV_PREFIX)}
+
+
+def parse_overrides(items: Iterable[str]) -> Dict[str, str]:
+    """Переопределения командной строки вида параметр=значение"""
+    overrides = {}
+    for item in items:
+        name, sep, value = item.partition("=")
+        if not sep or not name.strip():
+            raise ValueError(f"Переопределение задается как параметр=значение, получено: {item}")
+        overrides[name.strip()] = value
+    return overrides
+
+
+# путь -> (время изменения, размер, проверенный слой)
+_FILE_CACHE: Dict[str, Tuple[int, int, Dict[str, Any]]] = {}
+
+
+def read_config_file(filename: str, config_class: type = GameConfig) -> Optional[Dict[str, Any]]:
+    """Проверенный слой из JSON-файла или None, если файла нет.
+    
+    Результат кэшируется на весь процесс по пути, времени изменения и
+    размеру файла. Возвращаемый словарь общий для всех читателей и не
+    должен изменяться.
+    """
+    path = os.path.abspath(filename)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    cached = _FILE_CACHE.get(path)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError("Файл конфигурации должен содержать JSON-объект")
+    if "map_size" in data:
+        map_data = data["map_size"]
+        if not isinstance(map_data, dict):
+            raise ValueError("map_size должен содержать width и height")
+        data = dict(data, map_size=(map_data.get("width"), map_data.get("height")))
+    layer = ConfigValidator.for_class(config_class).validate(data, strict=False)
+    _FILE_CACHE[path] = (stat.st_mtime_ns, stat.st_size, layer)
+    return layer
+
+
+class ConfigWatcher:
+    """Следит за файлом конфигурации и применяет его изменения без перезапуска.
+    
+    poll() - один вызов os.stat; игра вызывает его в главном цикле меню.
+    """
+    
+    def __init__(self, config: GameConfig):
+        self.config = config
+        self._stamp = self._file_stamp()
+    
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.config._config_file)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def poll(self) -> List[str]:
+        """Перечитать файл, если он изменился; вернуть имена измененных параметров"""
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return []
+        self._stamp = stamp
+        try:
+            changed = self.config.reload()
+        except (OSError, ValueError) as e:
+            print(f"❌ Ошибка перезагрузки конфигурации: {e}")
+            return []
+        if changed:
+            print(f"🔄 Конфигурация обновлена из файла: {', '.join(changed)}")
+        return changed
+
+
+# Пример использования
+if __name__ == "__main__":
+    # Создаем объект конфигурации
+    config = GameConfig()
+    
+    # Показываем текущую конфигурацию
+    config.display_config()
+    
+    # Сохраняем в файл
+    config.save_to_file()
+    
+    # Обновляем конфигурацию
+    config.update_config_interactive()
+    
+    # Сохраняем обновленную конфигурацию
+    config.save_to_file()
+    
+    # Создаем новый объект и загружаем из файла
+    print("\n" + "="*50)
+    print("Тестирование загрузки конфигурации...")
+    new_config = GameConfig()
     new_config.display_config()
\ No newline at end of file
@@ -0,0 +1,337 @@
+import random
+from typing import Any, Dict, Iterable, List, Optional
+from GameField import GameField
+from TerrainGenerator import TerrainGenerator
+from Base import Base
+from NeutralObject import HealingFountain, ArmorSmith, Trap, TreasureChest
+from Events import bus, ConsoleReporter, AbilityUsed
+
+
+def _is_int(value) -> bool:
+    """Целое число; True и False координатами не считаются"""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class CommandResult:
+    """Результат выполнения команды движка.
+
+    error - текст ошибки для игрока, error_code - код причины для программ
+    (ActionFailed.reason игровых объектов или код проверки самого движка,
+    например "unit_not_found").
+    """
+
+    def __init__(self, action: str, ok: bool, data: Optional[Dict[str, Any]] = None,
+                 error: Optional[str] = None, error_code: Optional[str] = None):
+        self.action = action
+        self.ok = ok
+        self.data = data or {}
+        self.error = error
+        self.error_code = error_code
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"action": self.action, "ok": self.ok, "data": self.data, "error": self.error,
+                "error_code": self.error_code}
+
+    def __bool__(self):
+        return self.ok
+
+    def __repr__(self):
+        return (f"CommandResult({self.action!r}, ok={self.ok}, data={self.data!r}, error={self.error!r}, "
+                f"error_code={self.error_code!r})")
+
+
+class GameEngine:
+    """Безголовый движок игры.
+
+    Команды передаются в виде словарей {"action": ..., параметры}, результат
+    каждой команды - CommandResult. Игровые объекты ничего не печатают:
+    о событиях и отказах они сообщают на шину Events.bus, а причину отказа
+    движок берет из GameField.last_failure. Без подписчиков шины сообщения
+    даже не форматируются, поэтому движок подходит для симуляций,
+    нагрузочных тестов и обучения ИИ. Консольные меню (Game, UnitManager,
+    BaseManager) работают поверх него с echo=True - тогда на шину
+    подписывается ConsoleReporter.
+    """
+
+    ACTIONS = ("create_unit", "move", "move_group", "attack", "interact", "ability",
+               "collect_resources", "next_turn")
+
+    # Сигнатуры обработчиков команд; inspect (вместе с ast) загружается
+    # при первой команде, а не при импорте движка
+    _signatures: Dict[tuple, Any] = {}
+
+    def __init__(self, game_field: GameField, echo: bool = False):
+        self.game_field = game_field
+        self.turn_count = 0
+        self.is_running = True
+        self.echo = echo
+        if echo:
+            ConsoleReporter.ensure()
+
+    @classmethod
+    def new_game(cls, width: int = 10, height: int = 10, max_units: int = 20,
+                 base_name: str = "Главная база",
+                 initial_units: Iterable[str] = ('swordsman', 'crossbowman', 'healer'),
+                 place_objects: bool = True, echo: bool = False,
+                 terrain_generator: Optional[TerrainGenerator] = None,
+                 rng: Optional[random.Random] = None) -> 'GameEngine':
+        """Создать поле с базой, начальными юнитами и нейтральными объектами.
+
+        rng - генератор случайных чисел партии (ландшафт и расстановка
+        объектов); None - общий модуль random.
+        """
+        engine = cls(GameField(width, height, max_units, generator=terrain_generator, rng=rng), echo=echo)
+        base = Base(base_name)
+        engine.game_field.add_base(base, width // 4, height // 4)
+        for unit_type in initial_units:
+            base.create_unit(unit_type, engine.game_field)
+        if place_objects:
+            engine._place_initial_objects(rng)
+        return engine
+
+    def _place_initial_objects(self, rng: Optional[random.Random] = None):
+        rng = rng or random
+        objects = [
+            HealingFountain(),
+            ArmorSmith(),
+            Trap(),
+            TreasureChest()
+        ]
+
+        placed = 0
+        attempts = 0
+        max_attempts = 20
+
+        while placed < len(objects) and attempts < max_attempts:
+            x = rng.randint(0, self.game_field.width - 1)
+            y = rng.randint(0, self.game_field.height - 1)
+
+            if self.game_field.is_cell_empty(x, y) and not any(
+                base.get_position() == (x, y) for base in self.game_field.bases
+            ):
+                self.game_field.add_neutral_object(objects[placed], x, y)
+                placed += 1
+
+            attempts += 1
+
+    # === Выполнение команд ===
+
+    def execute(self, command: Dict[str, Any]) -> CommandResult:
+        """Выполнить одну команду вида {"action": "move", "unit_id": 1, "x": 2, "y": 3}.
+
+        Имена и типы параметров проверяются по сигнатуре обработчика: строка
+        или дробное число вместо координаты дают invalid_params, а не
+        исключение внутри GameField.
+        """
+        action = command.get("action")
+        if action not in self.ACTIONS:
+            return CommandResult(str(action), False, error=f"Неизвестная команда: {action}",
+                                 error_code="unknown_action")
+        handler = getattr(self, action)
+        params = {key: value for key, value in command.items() if key != "action"}
+        key = (type(self), action)
+        signature = self._signatures.get(key)
+        if signature is None:
+            import inspect
+            signature = self._signatures[key] = inspect.signature(getattr(type(self), action))
+        try:
+            signature.bind(self, **params)
+        except TypeError as e:
+            return CommandResult(action, False, error=f"Неверные параметры команды: {e}",
+                                 error_code="invalid_params")
+        invalid = self._invalid_param(signature, params)
+        if invalid is not None:
+            return CommandResult(action, False,
+                                 error=f"Неверные параметры команды: {invalid} = {params[invalid]!r}",
+                                 error_code="invalid_params")
+        return handler(**params)
+
+    @staticmethod
+    def _invalid_param(signature, params: Dict[str, Any]) -> Optional[str]:
+        """Имя первого параметра, значение которого не подходит под аннотацию
+        обработчика (int, str или List[int]); None - все подходят"""
+        for name, value in params.items():
+            expected = signature.parameters[name].annotation
+            if expected is int:
+                valid = _is_int(value)
+            elif expected is str:
+                valid = isinstance(value, str)
+            elif expected == List[int]:
+                valid = isinstance(value, list) and all(map(_is_int, value))
+            else:
+                continue
+            if not valid:
+                return name
+        return None
+
+    def run(self, commands: Iterable[Dict[str, Any]]) -> List[CommandResult]:
+        """Выполнить последовательность команд"""
+        return [self.execute(command) for command in commands]
+
+    def create_unit(self, base, unit_type: str) -> CommandResult:
+        """Создать юнит на базе (база задается индексом или названием)"""
+        base_obj = self._find_base(base)
+        if base_obj is None:
+            return CommandResult("create_unit", False, error=f"База не найдена: {base}",
+                                 error_code="base_not_found")
+
+        self.game_field.last_failure = None
+        if not base_obj.create_unit(unit_type, self.game_field):
+            return self._failed("create_unit")
+        unit = base_obj.owned_units[-1]
+        return CommandResult("create_unit", True, {
+            "unit_id": unit.id,
+            "unit_type": unit_type,
+            "x": unit.x,
+            "y": unit.y,
+            "resources": base_obj.resources,
+        })
+
+    def move(self, unit_id: int, x: int, y: int) -> CommandResult:
+        unit = self.game_field.get_unit_by_id(unit_id)
+        if unit is None:
+            return self._unit_not_found("move", unit_id)
+
+        self.game_field.last_failure = None
+        if not self.game_field.move_unit(unit, x, y):
+            return self._failed("move")
+        return CommandResult("move", True, {"unit_id": unit_id, "x": unit.x, "y": unit.y})
+
+    def move_group(self, unit_ids: List[int], x: int, y: int) -> CommandResult:
+        """Сделать ход группой юнитов к клетке (x, y) по полям потока"""
+        units = [self.game_field.get_unit_by_id(unit_id) for unit_id in unit_ids]
+        missing = [unit_id for unit_id, unit in zip(unit_ids, units) if unit is None]
+        if missing:
+            return CommandResult("move_group", False, error=f"Юниты не найдены: {missing}",
+                                 error_code="unit_not_found")
+
+        self.game_field.last_failure = None
+        positions = self.game_field.move_group(units, (x, y))
+        if self.game_field.last_failure is not None:
+            return self._failed("move_group")
+        return CommandResult("move_group", True, {
+            "moved": [{"unit_id": unit.id, "x": unit.x, "y": unit.y}
+                      for unit, position in zip(units, positions) if position is not None],
+            "stayed": [unit.id for unit, position in zip(units, positions) if position is None],
+        })
+
+    def attack(self, unit_id: int, x: int, y: int) -> CommandResult:
+        attacker = self.game_field.get_unit_by_id(unit_id)
+        if attacker is None:
+            return self._unit_not_found("attack", unit_id)
+        if not attacker.is_alive():
+            return CommandResult("attack", False, error="Юнит мертв и не может атаковать",
+                                 error_code="unit_dead")
+
+        target = self.game_field.get_unit_at(x, y)
+        health_before = target.health if target else 0
+        self.game_field.last_failure = None
+        if not self.game_field.attack_unit(attacker, x, y):
+            return self._failed("attack")
+        return CommandResult("attack", True, {
+            "unit_id": unit_id,
+            "target_id": target.id,
+            "damage": health_before - target.health,
+            "target_health": target.health,
+            "killed": not target.is_alive(),
+        })
+
+    def interact(self, unit_id: int, x: int, y: int) -> CommandResult:
+        unit = self.game_field.get_unit_by_id(unit_id)
+        if unit is None:
+            return self._unit_not_found("interact", unit_id)
+
+        target = self.game_field.get_entity_at(x, y)
+        self.game_field.last_failure = None
+        if not self.game_field.interact_with_object(unit, x, y):
+            if self.game_field.last_failure is not None:
+                return self._failed("interact")
+            return CommandResult("interact", False, error=f"В клетке ({x}, {y}) нет нейтрального объекта",
+                                 error_code="no_object")
+        return CommandResult("interact", True, {
+            "unit_id": unit_id,
+            "object": target.name,
+            "health": unit.health,
+            "armor": unit.armor,
+            "attack": unit.attack,
+        })
+
+    def ability(self, unit_id: int) -> CommandResult:
+        """Использовать специальную способность юнита"""
+        unit = self.game_field.get_unit_by_id(unit_id)
+        if unit is None:
+            return self._unit_not_found("ability", unit_id)
+        if not unit.is_alive():
+            return CommandResult("ability", False, error="Юнит мертв и не может использовать способности",
+                                 error_code="unit_dead")
+
+        result = unit.special_ability()
+        if bus.active:
+            bus.emit(AbilityUsed(unit, result))
+        return CommandResult("ability", True, {"unit_id": unit_id, "result": result})
+
+    def collect_resources(self, base, amount: int) -> CommandResult:
+        base_obj = self._find_base(base)
+        if base_obj is None:
+            return CommandResult("collect_resources", False, error=f"База не найдена: {base}",
+                                 error_code="base_not_found")
+        if not isinstance(amount, int) or amount <= 0:
+            return CommandResult("collect_resources", False, error="Количество должно быть положительным",
+                                 error_code="invalid_amount")
+
+        base_obj.collect_resources(amount)
+        return CommandResult("collect_resources", True, {"base": base_obj.name, "resources": base_obj.resources})
+
+    def next_turn(self) -> CommandResult:
+        """Завершить ход: снять истекшие временные эффекты, обновить списки
+        юнитов баз и пополнить ресурсы"""
+        if not self.is_running:
+            return CommandResult("next_turn", False, error="Игра окончена", error_code="game_over")
+
+        self.turn_count += 1
+        # снятие эффектов и пополнение баз отменяются одним шагом
+        with self.game_field.action():
+            expired = self.game_field.expire_effects(self.turn_count)
+            for base in self.game_field.bases:
+                base.update_units()
+
+                if base.is_alive():
+                    base.collect_resources(50)
+
+        if not any(base.is_alive() for base in self.game_field.bases):
+            self.is_running = False
+
+        if self.game_field.journal is not None:
+            self.game_field.journal.end_turn()
+
+        return CommandResult("next_turn", True, {
+            "turn": self.turn_count,
+            "expired_effects": len(expired),
+            "resources": {base.name: base.resources for base in self.game_field.bases},
+            "game_over": not self.is_running,
+        })
+
+    # === Вспомогательные методы ===
+
+    def _find_base(self, base) -> Optional[Base]:
+        bases = self.game_field.bases
+        if isinstance(base, Base):
+            return base if base in bases else None
+        if isinstance(base, int):
+            return bases[base] if 0 <= base < len(bases) else None
+        for candidate in bases:
+            if candidate.name == base:
+                return candidate
+        return None
+
+    def _failed(self, action: str) -> CommandResult:
+        """Результат отклоненной команды по причине из GameField.last_failure
+        (перед вызовом поля обработчик сбрасывает ее в None)"""
+        failure = self.game_field.last_failure
+        if failure is None:
+            return CommandResult(action, False, error="Действие не выполнено", error_code="failed")
+        return CommandResult(action, False, error=failure.message, error_code=failure.reason)
+
+    @staticmethod
+    def _unit_not_found(action: str, unit_id) -> CommandResult:
+        return CommandResult(action, False, error=f"Юнит не найден: {unit_id}", error_code="unit_not_found")
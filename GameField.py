@@ -1,283 +1,833 @@
-import random
-from typing import List, Optional
-from Units import Unit, Infantry, Archer, Cavalry, Healer, Ballista
-from Landscape import Landscape, Plain, Forest, Mountain, Swamp
-from NeutralObject import NeutralObject
-from Base import Base
-
-class GameField:
-    """Расширенный класс игрового поля с ландшафтом и нейтральными объектами"""
-    
-    def __init__(self, width: int, height: int, max_units: int = 50):
-        if width <= 0 or height <= 0:
-            raise ValueError("Размеры поля должны быть положительными числами")
-        if max_units <= 0:
-            raise ValueError("Максимальное количество юнитов должно быть положительным")
-            
-        self.width = width
-        self.height = height
-        self.max_units = max_units
-        self.grid = [[None for _ in range(width)] for _ in range(height)]
-        self.terrain = self._generate_terrain()
-        self.neutral_objects = []
-        self.units = []
-        self.bases = []
-        self.unit_id_counter = 1
-
-    def _generate_terrain(self) -> List[List[Landscape]]:
-        terrain_grid = []
-        for y in range(self.height):
-            row = []
-            for x in range(self.height):
-                rand = random.random()
-                if rand < 0.6:
-                    row.append(Plain())
-                elif rand < 0.8:
-                    row.append(Forest())
-                elif rand < 0.95:
-                    row.append(Mountain())
-                else:
-                    row.append(Swamp())
-            terrain_grid.append(row)
-        return terrain_grid
-
-    def add_base(self, base: Base, x: int, y: int) -> bool:
-        if not self._is_valid_position(x, y):
-            print(f"❌ Неверные координаты для базы: ({x}, {y})")
-            return False
-            
-        if not self.is_cell_empty(x, y):
-            print(f"❌ Клетка ({x}, {y}) уже занята")
-            return False
-            
-        base.set_position(x, y)
-        self.bases.append(base)
-        self.grid[y][x] = base
-        print(f"✅ База '{base.name}' размещена на клетке ({x}, {y})")
-        return True
-
-    def add_neutral_object(self, obj: NeutralObject, x: int, y: int) -> bool:
-        if not self._is_valid_position(x, y):
-            print(f"❌ Неверные координаты для объекта: ({x}, {y})")
-            return False
-            
-        if not self.is_cell_empty(x, y):
-            print(f"❌ Клетка ({x}, {y}) уже занята")
-            return False
-            
-        obj.set_position(x, y)
-        self.neutral_objects.append(obj)
-        self.grid[y][x] = obj
-        print(f"✅ {obj.name} размещен на клетке ({x}, {y})")
-        return True
-
-    def interact_with_object(self, unit: Unit, x: int, y: int) -> bool:
-        if not self._is_valid_position(x, y):
-            return False
-            
-        target = self.grid[y][x]
-        if isinstance(target, NeutralObject):
-            result = target % unit
-            if result:
-                self.neutral_objects.remove(target)
-                self.grid[y][x] = None
-            return result
-        return False
-
-    def move_unit(self, unit: Unit, new_x: int, new_y: int) -> bool:
-        if unit not in self.units:
-            print(f"❌ Юнит {unit.name} не найден на поле")
-            return False
-            
-        if not self._is_valid_position(new_x, new_y):
-            print(f"❌ Неверные координаты: ({new_x}, {new_y})")
-            return False
-            
-        if not self.is_cell_empty(new_x, new_y):
-            target = self.grid[new_x][new_y]
-            if isinstance(target, NeutralObject):
-                return self.interact_with_object(unit, new_x, new_y)
-            else:
-                print(f"❌ Клетка ({new_x}, {new_y}) уже занята")
-                return False
-        
-        terrain = self.terrain[new_y][new_x]
-        if not terrain.can_pass(unit):
-            print(f"❌ {unit.name} не может пройти через {terrain}")
-            return False
-            
-        old_x, old_y = unit.get_position()
-        
-        distance = abs(new_x - old_x) + abs(new_y - old_y)
-        move_cost = terrain.move_cost
-        if distance > unit.move_range / move_cost:
-            print(f"❌ {unit.name} не может переместиться так далеко через {terrain}")
-            return False
-        
-        self.grid[old_y][old_x] = None
-        self.grid[new_y][new_x] = unit
-        unit.set_position(new_x, new_y)
-        
-        attack_bonus = terrain.get_attack_bonus(unit)
-        if attack_bonus != 1.0:
-            print(f"🌄 {unit.name} на {terrain}: модификатор атаки {attack_bonus}")
-        
-        print(f"🎯 {unit.name} перемещен с ({old_x}, {old_y}) на ({new_x}, {new_y}) через {terrain}")
-        return True
-
-    def attack_unit(self, attacker: Unit, target_x: int, target_y: int) -> bool:
-        target = self.get_unit_at(target_x, target_y)
-        if not target:
-            print(f"❌ В клетке ({target_x}, {target_y}) нет юнита")
-            return False
-            
-        attacker_terrain = self.terrain[attacker.y][attacker.x]
-        attack_modifier = attacker_terrain.get_attack_bonus(attacker)
-        
-        damage = int(attacker.attack * attack_modifier)
-        actual_damage = target.take_damage(damage)
-        
-        print(f"⚔️ {attacker.name} атакует {target.name} с позиции {attacker_terrain}!")
-        print(f"💥 Нанесено урона: {actual_damage} (модификатор: {attack_modifier})")
-        
-        if not target.is_alive():
-            print(f"💀 {target.name} уничтожен!")
-            self.remove_unit(target)
-            
-        return True
-
-    def display(self):
-        print(f"\n🎮 ИГРОВОЕ ПОЛЕ {self.width}x{self.height}")
-        print(f"   Юнитов: {len(self.units)}/{self.max_units}, Баз: {len(self.bases)}, Объектов: {len(self.neutral_objects)}")
-        print("   " + " ".join(f"{i:2}" for i in range(self.width)))
-        
-        terrain_symbols = {
-            Plain: " ",
-            Forest: "♣",
-            Mountain: "▲", 
-            Swamp: "~"
-        }
-        
-        for y in range(self.height):
-            row_str = f"{y:2} "
-            for x in range(self.width):
-                cell = self.grid[y][x]
-                if cell:
-                    if isinstance(cell, Unit):
-                        if isinstance(cell, Infantry):
-                            symbol = "I"
-                        elif isinstance(cell, Archer):
-                            if isinstance(cell, Ballista):
-                                symbol = "B"
-                            else:
-                                symbol = "A" 
-                        elif isinstance(cell, Cavalry):
-                            symbol = "C"
-                        elif isinstance(cell, Healer):
-                            symbol = "H"
-                        else:
-                            symbol = "U"
-                        row_str += f"[{symbol}]"
-                    elif isinstance(cell, Base):
-                        row_str += "[🏰]"
-                    elif isinstance(cell, NeutralObject):
-                        row_str += f"[{cell.symbol}]"
-                else:
-                    terrain_symbol = terrain_symbols.get(type(self.terrain[y][x]), " ")
-                    row_str += f" {terrain_symbol} "
-            print(row_str)
-
-        print("\n📋 ЛЕГЕНДА:")
-        print("I-пехота A-лучники C-кавалерия H-лекарь 🏰-база ⚱-фонтан K-кузнец T-ловушка S-сундук")
-        print("♣-лес ▲-горы ~-болото  -равнина")
-
-    def get_terrain_at(self, x: int, y: int) -> Optional[Landscape]:
-        if not self._is_valid_position(x, y):
-            return None
-        return self.terrain[y][x]
-
-    def _is_valid_position(self, x: int, y: int) -> bool:
-        return 0 <= x < self.width and 0 <= y < self.height
-
-    def is_cell_empty(self, x: int, y: int) -> bool:
-        cell = self.get_unit_at(x, y)
-        return cell is None or isinstance(cell, NeutralObject)
-
-    def get_unit_at(self, x: int, y: int) -> Optional[Unit]:
-        if not self._is_valid_position(x, y):
-            return None
-        cell = self.grid[y][x]
-        return cell if isinstance(cell, Unit) else None
-
-    def add_unit(self, unit: Unit, x: int, y: int) -> bool:
-        if not self._is_valid_position(x, y):
-            print(f"❌ Неверные координаты: ({x}, {y})")
-            return False
-            
-        terrain = self.terrain[y][x]
-        if not terrain.can_pass(unit):
-            print(f"❌ {unit.name} не может быть размещен на {terrain}")
-            return False
-            
-        if len(self.units) >= self.max_units:
-            print(f"❌ Достигнуто максимальное количество юнитов: {self.max_units}")
-            return False
-            
-        if not self.is_cell_empty(x, y):
-            print(f"❌ Клетка ({x}, {y}) уже занята")
-            return False
-            
-        if not unit.is_alive():
-            print(f"❌ Юнит {unit.name} мертв и не может быть размещен")
-            return False
-
-        unit.set_position(x, y)
-        unit.id = self.unit_id_counter
-        self.unit_id_counter += 1
-        
-        self.grid[y][x] = unit
-        self.units.append(unit)
-        
-        print(f"✅ {unit.name} размещен на клетке ({x}, {y}) на {terrain}")
-        return True
-
-    def remove_unit(self, unit: Unit) -> bool:
-        if unit not in self.units:
-            print(f"❌ Юнит {unit.name} не найден на поле")
-            return False
-            
-        x, y = unit.get_position()
-        if self._is_valid_position(x, y) and self.grid[y][x] == unit:
-            self.grid[y][x] = None
-            
-        self.units.remove(unit)
-        
-        for base in self.bases:
-            if unit in base.owned_units:
-                base.owned_units.remove(unit)
-                
-        print(f"🗑️ Юнит {unit.name} удален с поля")
-        return True
-    
-    def get_unit_info(self):
-        """Показать информацию о всех юнитах на поле"""
-        if not self.units:
-            print("❌ На поле нет юнитов")
-        return
-    
-        print(f"\n📋 СПИСОК ЮНИТОВ НА ПОЛЕ:")
-        for i, unit in enumerate(self.units, 1):
-            try:
-            # Безопасное получение позиции
-                if hasattr(unit, 'get_position'):
-                    pos = unit.get_position()
-                    x, y = pos if pos else ("?", "?")
-                else:
-                    x, y = getattr(unit, 'x', "?"), getattr(unit, 'y', "?")
-            
-                status = "жив" if unit.is_alive() else "мертв"
-            
-                print(f"{i}. {unit.name} - ({x}, {y}) - {status}")
-                print(f"   ❤️ {unit.health}/{unit.max_health} HP | ⚔️ {unit.attack} ATK | 🛡️ {unit.armor} ARM")
-            except Exception as e:
+import contextlib
+import random
+from operator import attrgetter, is_, itemgetter
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from Units import Unit
+from Landscape import Landscape, TerrainRule, TerrainType, TERRAINS, TERRAIN_CODES, TERRAIN_RULES
+from NeutralObject import NeutralObject
+from Base import Base
+from Reachability import ReachabilityEngine, ReachMap
+from CostFields import CostFields, BLOCKED, STOP
+from Targeting import SpatialGrid, LineOfSight
+from History import FieldHistory, undoable
+from Effects import EffectScheduler, TimedEffect
+from Events import (bus, UnitPlaced, UnitMoved, DamageDealt, UnitDied, UnitRemoved, AttacksResolved,
+                    EffectsExpired, BasePlaced, ObjectPlaced, TerrainChanged, GroupMoved, ActionFailed)
+from TerrainGenerator import TerrainGenerator
+from Lazy import numpy
+
+# Рендерер, чанковый ландшафт и хранилище юнитов загружаются при первом
+# использовании: безголовому движку и симуляциям они обычно не нужны
+if TYPE_CHECKING:
+    from FlowFields import FlowField, FlowFields
+    from TerrainStore import ChunkedTerrain
+    from UnitStore import UnitStore
+
+# С какого размера пакета атак урон считается массивами NumPy
+NUMPY_MIN_BATCH = 256
+
+# Начиная с этого числа клеток ландшафт генерируется лениво по чанкам
+CHUNKED_TERRAIN_MIN_CELLS = 16_000_000
+
+class GameField:
+    """Расширенный класс игрового поля с ландшафтом и нейтральными объектами"""
+    
+    def __init__(self, width: int, height: int, max_units: int = 50,
+                 terrain: Optional[Union[bytearray, 'ChunkedTerrain']] = None,
+                 generator: Optional[TerrainGenerator] = None,
+                 unit_store: Optional['UnitStore'] = None,
+                 rng: Optional[random.Random] = None):
+        if width <= 0 or height <= 0:
+            raise ValueError("Размеры поля должны быть положительными числами")
+        if max_units <= 0:
+            raise ValueError("Максимальное количество юнитов должно быть положительным")
+        if terrain is not None and len(terrain) != width * height:
+            raise ValueError("Размер карты ландшафта не совпадает с размерами поля")
+            
+        self.width = width
+        self.height = height
+        self.max_units = max_units
+        # Индексы поля: позиция -> объект в клетке (юнит, база или
+        # нейтральный объект), id -> юнит и id юнита -> база-владелец
+        self.occupants: Dict[Tuple[int, int], object] = {}
+        if terrain is None:
+            # зерно карты - из rng партии (None - общий модуль random)
+            seed = (rng or random).getrandbits(32)
+            if width * height >= CHUNKED_TERRAIN_MIN_CELLS:
+                from TerrainStore import ChunkedTerrain
+                terrain = ChunkedTerrain(width, height, seed=seed, generator=generator)
+            else:
+                terrain = self._generate_terrain(generator, seed)
+        self.terrain = terrain
+        self.neutral_objects = []
+        self._units_by_id: Dict[int, Unit] = {}
+        self._unit_owners: Dict[int, Base] = {}
+        self.bases = []
+        self.unit_id_counter = 1
+        # Временные бонусы юнитов по ходу окончания
+        self.effects = EffectScheduler()
+        # Столбцовое хранилище характеристик юнитов на поле (необязательно)
+        self.unit_store = unit_store
+        # Поля стоимости перемещения по классам передвижения (ландшафт и занятость)
+        self.cost_fields = CostFields(self)
+        self.reachability = ReachabilityEngine(self)
+        # Кэш полей потока для движения групп (FlowFields), создается при первом запросе
+        self.flow_fields: Optional['FlowFields'] = None
+        # Индекс юнитов по корзинам для запросов по радиусу и кэш видимости
+        self.unit_grid = SpatialGrid()
+        self.sight = LineOfSight(self)
+        # Журнал изменений для инкрементального автосохранения (TurnJournal)
+        self.journal = None
+        # История изменений для отмены и повтора (FieldHistory)
+        self.history = None
+        # Рендерер с кэшем символов клеток (FieldRenderer), создается в display()
+        self.renderer = None
+        # Причина последнего отклоненного действия (ActionFailed)
+        self.last_failure: Optional[ActionFailed] = None
+
+    def reject(self, reason: str, message: str) -> bool:
+        """Отклонить действие: запомнить причину в last_failure и сообщить
+        о ней на шину. Возвращает False, чтобы вызывающий мог сразу вернуть
+        результат: return self.reject("cell_occupied", ...)"""
+        self.last_failure = failure = ActionFailed(reason, message)
+        if bus.active:
+            bus.emit(failure)
+        return False
+
+    @property
+    def units(self) -> List[Unit]:
+        """Юниты на поле в порядке размещения"""
+        return list(self._units_by_id.values())
+
+    @property
+    def unit_count(self) -> int:
+        return len(self._units_by_id)
+
+    def has_unit(self, unit: Unit) -> bool:
+        return self._units_by_id.get(unit.id) is unit
+
+    def get_unit_by_id(self, unit_id: int) -> Optional[Unit]:
+        return self._units_by_id.get(unit_id)
+
+    def get_unit_owner(self, unit: Unit) -> Optional[Base]:
+        """База, создавшая юнита, или None"""
+        return self._unit_owners.get(unit.id)
+
+    def get_entity_at(self, x: int, y: int):
+        """Объект в клетке: юнит, база, нейтральный объект или None"""
+        return self.occupants.get((x, y))
+
+    def alive_units(self) -> List[Unit]:
+        """Живые юниты на поле (с UnitStore - проходом по столбцу здоровья)"""
+        if self.unit_store is not None:
+            return self.unit_store.alive_units()
+        return [unit for unit in self._units_by_id.values() if unit.is_alive()]
+
+    def health_by_base(self) -> Dict[Base, int]:
+        """Суммарное здоровье живых юнитов каждой базы"""
+        totals = {base: 0 for base in self.bases}
+        if self.unit_store is not None:
+            for owner, health in self.unit_store.health_by_owner().items():
+                if owner in totals:
+                    totals[owner] += health
+            return totals
+        owners = self._unit_owners
+        for unit in self._units_by_id.values():
+            owner = owners.get(unit.id)
+            if owner in totals and unit.health > 0:
+                totals[owner] += unit.health
+        return totals
+
+    def _generate_terrain(self, generator: Optional[TerrainGenerator] = None,
+                          seed: Optional[int] = None) -> bytearray:
+        """Сгенерировать карту ландшафта: один байт (код ландшафта) на клетку,
+        строки подряд, индекс клетки - y * width + x"""
+        generator = generator or TerrainGenerator()
+        if seed is None:
+            seed = random.getrandbits(32)
+        return generator.generate(self.width, self.height, seed)
+
+    def _terrain_at(self, x: int, y: int) -> Landscape:
+        """Общий экземпляр ландшафта клетки (без проверки координат)"""
+        return TERRAINS[self.terrain[y * self.width + x]]
+
+    def rules_for(self, unit: Unit):
+        """Строка таблицы правил для юнита, индекс - код ландшафта"""
+        return TERRAIN_RULES.row(unit)
+
+    def _rule_at(self, unit: Unit, x: int, y: int) -> TerrainRule:
+        """Правило ландшафта клетки для юнита (без проверки координат)"""
+        return TERRAIN_RULES.row(unit)[self.terrain[y * self.width + x]]
+
+    @undoable
+    def set_terrain(self, x: int, y: int, terrain_type: TerrainType) -> bool:
+        """Изменить ландшафт клетки"""
+        if not self._is_valid_position(x, y):
+            return self.reject("invalid_position", f"Неверные координаты: ({x}, {y})")
+        self._set_terrain_code(x, y, TERRAIN_CODES[terrain_type])
+        if bus.active:
+            bus.emit(TerrainChanged(x, y, terrain_type))
+        return True
+
+    def targets_in_range(self, unit: Unit, line_of_sight: bool = False) -> List[Unit]:
+        """Вражеские юниты в радиусе атаки юнита, ближайшие первыми.
+
+        Радиус - attack_range у лучников и 1 у остальных, расстояние -
+        манхэттенское, как в Archer.can_attack. Враги - юниты другой базы;
+        юнит без базы считает врагами всех. line_of_sight=True исключает
+        цели, луч к которым проходит через ландшафт, закрывающий обзор (горы).
+        """
+        x, y = unit.x, unit.y
+        radius = getattr(unit, "attack_range", 1)
+        owners = self._unit_owners
+        owner = owners.get(unit.id)
+        visible = self.sight.visible(x, y, radius) if line_of_sight else None
+        targets = []
+        for other in self.unit_grid.query(x, y, radius):
+            if other is unit or (owner is not None and owners.get(other.id) is owner):
+                continue
+            if visible is not None and (other.x, other.y) not in visible:
+                continue
+            targets.append(other)
+        targets.sort(key=lambda target: (abs(target.x - x) + abs(target.y - y), target.id))
+        return targets
+
+    def can_place(self, unit: Unit, x: int, y: int) -> bool:
+        """Можно ли поставить юнита на клетку: координаты, занятость и ландшафт"""
+        return (self._is_valid_position(x, y)
+                and self.cost_fields.costs_for(unit)[y * self.width + x] != BLOCKED)
+
+    def _cell_changed(self, x: int, y: int):
+        """Сообщить кэшам, что содержимое клетки изменилось"""
+        self.cost_fields.cell_changed(x, y)
+        self.reachability.invalidate_cell(x, y)
+        if self.flow_fields is not None:
+            self.flow_fields.cell_changed(x, y)
+        if self.renderer is not None:
+            self.renderer.cell_changed(x, y)
+
+    def reachable_cells(self, unit: Unit) -> ReachMap:
+        """Клетки, куда юнит может переместиться за ход, с путями и стоимостью"""
+        return self.reachability.reach(unit)
+
+    def flow_field(self, target_x: int, target_y: int, unit: Unit) -> 'FlowField':
+        """Поле потока к клетке для класса передвижения юнита (из кэша)"""
+        if self.flow_fields is None:
+            from FlowFields import FlowFields
+            self.flow_fields = FlowFields(self)
+        return self.flow_fields.get(target_x, target_y, unit)
+
+    def action(self):
+        """Блок, изменения поля и баз внутри которого отменяются одним шагом"""
+        if self.history is None:
+            return contextlib.nullcontext()
+        return self.history.step()
+
+    @contextlib.contextmanager
+    def trial(self):
+        """Пробные изменения поля: при выходе из блока все изменения
+        откатываются за время, пропорциональное их числу.
+
+            with field.trial():
+                field.attack_unit(attacker, x, y)
+                score = evaluate(field)
+        """
+        history = self.history
+        temporary = history is None
+        if temporary:
+            history = FieldHistory(self).attach()
+        try:
+            with history.trial():
+                yield self
+        finally:
+            if temporary:
+                history.detach()
+
+    @undoable
+    def add_base(self, base: Base, x: int, y: int) -> bool:
+        if not self._is_valid_position(x, y):
+            return self.reject("invalid_position", f"Неверные координаты для базы: ({x}, {y})")
+            
+        if not self.is_cell_empty(x, y):
+            return self.reject("cell_occupied", f"Клетка ({x}, {y}) уже занята")
+            
+        self._place_entity(base, x, y)
+        if bus.active:
+            bus.emit(BasePlaced(base))
+        return True
+
+    @undoable
+    def add_neutral_object(self, obj: NeutralObject, x: int, y: int) -> bool:
+        if not self._is_valid_position(x, y):
+            return self.reject("invalid_position", f"Неверные координаты для объекта: ({x}, {y})")
+            
+        if not self.is_cell_empty(x, y):
+            return self.reject("cell_occupied", f"Клетка ({x}, {y}) уже занята")
+            
+        self._place_entity(obj, x, y)
+        if bus.active:
+            bus.emit(ObjectPlaced(obj))
+        return True
+
+    @undoable
+    def interact_with_object(self, unit: Unit, x: int, y: int) -> bool:
+        if not self._is_valid_position(x, y):
+            return False
+            
+        target = self.occupants.get((x, y))
+        if isinstance(target, NeutralObject):
+            self._unit_changing(unit)
+            result = target % unit
+            if result:
+                self._unit_changed(unit)
+                effect = target.timed_effect()
+                if effect is not None:
+                    self._add_effect(self.effects.create(unit, *effect))
+                self._take_entity(target)
+            return result
+        return False
+
+    @undoable
+    def move_unit(self, unit: Unit, new_x: int, new_y: int) -> bool:
+        if not self.has_unit(unit):
+            return self.reject("unit_not_on_field", f"Юнит {unit.name} не найден на поле")
+            
+        if not self._is_valid_position(new_x, new_y):
+            return self.reject("invalid_position", f"Неверные координаты: ({new_x}, {new_y})")
+        
+        terrain = self._terrain_at(new_x, new_y)
+        if self.cost_fields.costs_for(unit)[new_y * self.width + new_x] == BLOCKED:
+            if not self.is_cell_empty(new_x, new_y):
+                return self.reject("cell_occupied", f"Клетка ({new_x}, {new_y}) уже занята")
+            return self.reject("impassable", f"{unit.name} не может пройти через {terrain}")
+        
+        # Проверка дальности по реальной стоимости пути, как и в меню перемещения
+        if (new_x, new_y) not in self.reachability.reach(unit):
+            return self.reject("out_of_reach", f"{unit.name} не может переместиться так далеко через {terrain}")
+        
+        if isinstance(self.occupants.get((new_x, new_y)), NeutralObject):
+            return self.interact_with_object(unit, new_x, new_y)
+            
+        old_x, old_y = unit.get_position()
+        self._relocate_unit(unit, new_x, new_y)
+        if bus.active:
+            modifier = self._rule_at(unit, new_x, new_y).attack_modifier
+            bus.emit(UnitMoved(unit, old_x, old_y, terrain, modifier))
+        return True
+
+    @undoable
+    def attack_unit(self, attacker: Unit, target_x: int, target_y: int) -> bool:
+        target = self.get_unit_at(target_x, target_y)
+        if not target:
+            return self.reject("no_target", f"В клетке ({target_x}, {target_y}) нет юнита")
+            
+        attack_modifier = self._rule_at(attacker, attacker.x, attacker.y).attack_modifier
+        
+        damage = int(attacker.attack * attack_modifier)
+        self._unit_changing(target)
+        actual_damage = target.take_damage(damage)
+        self._unit_changed(target)
+        
+        if bus.active:
+            bus.emit(DamageDealt(attacker, target, actual_damage, attack_modifier,
+                                 self._terrain_at(attacker.x, attacker.y)))
+        
+        if not target.is_alive():
+            if bus.active:
+                bus.emit(UnitDied(target))
+            self.remove_unit(target)
+            
+        return True
+
+    @undoable
+    def resolve_attacks(self, pairs: Iterable[Tuple[Unit, Unit]]) -> List[Optional[int]]:
+        """Провести пакет атак (атакующий, цель) за один проход.
+
+        Результат совпадает с вызовами attack_unit(attacker, target.x, target.y)
+        по порядку. Урон до брони считается сразу для всех атакующих, броня
+        и здоровье целей собираются в плоские списки; урон после брони и
+        новое здоровье считаются одним проходом по парам, затем здоровье
+        записывается в цели, а погибшие убираются с поля одним пакетом.
+        Атаки по цели, погибшей раньше в пакете или отсутствующей на поле,
+        пропускаются. Цели с переопределенным take_damage получают урон
+        через него. Возвращает нанесенный урон для каждой пары (None -
+        атака пропущена).
+        """
+        pairs = list(pairs)
+        if not pairs:
+            return []
+        attackers = list(map(itemgetter(0), pairs))
+        targets = list(map(itemgetter(1), pairs))
+        strength = self._attack_strength(attackers)
+
+        # Цели без повторов в порядке первой атаки и номер цели каждой пары
+        victims = list(dict.fromkeys(targets))
+        codes = list(map(dict(zip(victims, range(len(victims)))).__getitem__, targets))
+        units_by_id = self._units_by_id
+        # цели, по которым еще можно бить: на поле и пока живы
+        open_slots = bytearray(map(is_, map(units_by_id.get, map(attrgetter("id"), victims)), victims))
+        armor = list(map(attrgetter("armor"), victims))
+        health = list(map(attrgetter("health"), victims))
+        powers = map(strength.__getitem__, attackers)
+
+        if all(type(unit).take_damage is Unit.take_damage for unit in victims):
+            results, killed = self._hits_flat(codes, powers, armor, health, open_slots)
+            for unit, before, after in zip(victims, map(attrgetter("health"), victims), health):
+                if after != before:
+                    self._unit_changing(unit)
+                    unit.health = after
+                    self._unit_changed(unit)
+        else:
+            results, killed = self._hits_custom(victims, codes, powers, armor, open_slots)
+
+        dead = [victims[slot] for slot in killed]
+        self._detach_units(dead)
+
+        if bus.active:
+            applied = [damage for damage in results if damage is not None]
+            bus.emit(AttacksResolved(len(applied), len(pairs), sum(applied), len(dead)))
+        return results
+
+    @staticmethod
+    def _hits_flat(codes, powers, armor, health, open_slots):
+        """Один проход пакета по плоским спискам целей.
+
+        codes - номер цели каждой пары, powers - урон до брони каждой пары,
+        open_slots - цели, по которым еще можно бить (на поле и живы).
+        health меняется на месте. Возвращает урон каждой пары (None -
+        пропущена) и номера погибших целей в порядке гибели.
+        """
+        results: List[Optional[int]] = []
+        append = results.append
+        killed = []
+        for slot, power in zip(codes, powers):
+            if not open_slots[slot]:
+                append(None)
+                continue
+            damage = power - armor[slot]
+            if damage < 0:
+                damage = 0
+            append(damage)
+            current = health[slot] = health[slot] - damage
+            if current <= 0:
+                open_slots[slot] = 0
+                killed.append(slot)
+        return results, killed
+
+    def _hits_custom(self, victims, codes, powers, armor, open_slots):
+        """Проход пакета, в котором у части целей свой take_damage: такие
+        цели получают урон через него, остальные - как в _hits_flat"""
+        results: List[Optional[int]] = []
+        killed = []
+        changed = {}
+        for slot, power in zip(codes, powers):
+            if not open_slots[slot]:
+                results.append(None)
+                continue
+            target = victims[slot]
+            if slot not in changed:
+                changed[slot] = target
+                self._unit_changing(target)
+            if type(target).take_damage is Unit.take_damage:
+                damage = max(0, power - armor[slot])
+                target.health -= damage
+            else:
+                damage = target.take_damage(power)
+            results.append(damage)
+            if target.health <= 0:
+                open_slots[slot] = 0
+                killed.append(slot)
+        for target in changed.values():
+            self._unit_changed(target)
+        return results, killed
+
+    def _attack_strength(self, attackers: Sequence[Unit]) -> Dict[Unit, int]:
+        """Урон до брони каждого атакующего пакета: int(атака * модификатор ландшафта)"""
+        width = self.width
+        terrain = self.terrain
+        unique = list(dict.fromkeys(attackers))
+        np = numpy() if len(unique) >= NUMPY_MIN_BATCH and isinstance(terrain, bytearray) else None
+        if np is not None:
+            # таблица модификаторов [тип юнита, код ландшафта] и индексы в нее
+            samples = dict(zip(map(type, unique), unique))
+            type_index = dict(zip(samples, range(len(samples))))
+            modifiers = np.array([[rule.attack_modifier for rule in TERRAIN_RULES.row(sample)]
+                                  for sample in samples.values()], dtype=np.float64)
+            count = len(unique)
+            types = np.fromiter(map(type_index.__getitem__, map(type, unique)), np.intp, count)
+            xs = np.fromiter(map(attrgetter("x"), unique), np.intp, count)
+            ys = np.fromiter(map(attrgetter("y"), unique), np.intp, count)
+            codes = np.frombuffer(terrain, dtype=np.uint8)[ys * width + xs]
+            attacks = np.fromiter(map(attrgetter("attack"), unique), np.float64, count)
+            damage = (attacks * modifiers[types, codes]).astype(np.int64).tolist()
+        else:
+            rows = {}
+            damage = []
+            for attacker in unique:
+                row = rows.get(type(attacker))
+                if row is None:
+                    row = rows[type(attacker)] = TERRAIN_RULES.row(attacker)
+                damage.append(int(attacker.attack * row[terrain[attacker.y * width + attacker.x]].attack_modifier))
+        return dict(zip(unique, damage))
+
+    @undoable
+    def move_group(self, units: Iterable[Unit], target) -> List[Optional[Tuple[int, int]]]:
+        """Переместить группу юнитов на один ход к цели по полям потока.
+
+        target - клетка (x, y) или объект с позицией (база, юнит). Юниты
+        ходят по порядку удаленности от цели: ближние первыми освобождают
+        клетки для идущих следом. Занятую клетку пути юнит обходит через
+        соседа, который тоже ближе к цели, или останавливается перед ней;
+        за ход юнит проходит по полю столько клеток, сколько позволяет
+        move_range. Возвращает новую позицию каждого юнита (None - юнит
+        не сдвинулся).
+        """
+        units = list(units)
+        results: List[Optional[Tuple[int, int]]] = [None] * len(units)
+        target_x, target_y = target if isinstance(target, tuple) else target.get_position()
+        if target_x is None or not self._is_valid_position(target_x, target_y):
+            self.reject("invalid_position", f"Неверные координаты цели: ({target_x}, {target_y})")
+            return results
+
+        order = []
+        for position, unit in enumerate(units):
+            if not self.has_unit(unit):
+                continue
+            try:
+                flow = self.flow_field(target_x, target_y, unit)
+            except ValueError as error:
+                # поле потока не строится для карт больше FLOW_FIELD_MAX_CELLS
+                self.reject("map_too_large", str(error))
+                return results
+            distance = flow.distance_at(unit.x, unit.y)
+            if distance:
+                order.append((distance, position, unit, flow))
+        order.sort(key=lambda item: item[:2])
+
+        moved = 0
+        for _, position, unit, flow in order:
+            destination = self._flow_destination(unit, flow)
+            if destination is not None:
+                self._relocate_unit(unit, *destination)
+                results[position] = destination
+                moved += 1
+
+        if bus.active:
+            bus.emit(GroupMoved(moved, len(units), target_x, target_y))
+        return results
+
+    def _flow_destination(self, unit: Unit, flow: 'FlowField') -> Optional[Tuple[int, int]]:
+        """Последняя клетка пути юнита по полю потока, до которой он дойдет
+        за ход через свободные клетки"""
+        width = self.width
+        costs = self.cost_fields.costs_for(unit)
+        steps = flow.steps
+        offsets = flow.offsets
+        index = unit.y * width + unit.x
+        budget = unit.move_range
+        destination = None
+        while True:
+            code = steps[index]
+            entry = costs[index + offsets[code]] if code else BLOCKED
+            if entry == BLOCKED or entry & STOP:
+                step = self._flow_sidestep(index, flow, costs)
+                if step is None:
+                    break
+                entry = costs[step]
+            else:
+                step = index + offsets[code]
+            budget -= entry
+            if budget < 0:
+                break
+            index = destination = step
+        if destination is None:
+            return None
+        y, x = divmod(destination, width)
+        return (x, y)
+
+    def _flow_sidestep(self, index: int, flow: 'FlowField', costs) -> Optional[int]:
+        """Свободная соседняя клетка, ближайшая к цели по полю потока и
+        ближе текущей, или None"""
+        width, height = self.width, self.height
+        distance = flow.distance
+        best = None
+        best_distance = distance[index]
+        y, x = divmod(index, width)
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if not (0 <= nx < width and 0 <= ny < height):
+                continue
+            neighbour = ny * width + nx
+            entry = costs[neighbour]
+            if entry == BLOCKED or entry & STOP:
+                continue
+            if distance[neighbour] < best_distance:
+                best, best_distance = neighbour, distance[neighbour]
+        return best
+
+    @undoable
+    def expire_effects(self, turn: int) -> List[TimedEffect]:
+        """Снять бонусы эффектов, срок которых наступил к ходу turn"""
+        expired = self.effects.due(turn)
+        for effect in expired:
+            unit = effect.unit
+            if self.has_unit(unit):
+                self._unit_changing(unit)
+                setattr(unit, effect.stat, getattr(unit, effect.stat) - effect.amount)
+                self._unit_changed(unit)
+            self._remove_effect(effect)
+        if expired and bus.active:
+            bus.emit(EffectsExpired(expired))
+        return expired
+
+    def display(self, diff: bool = False):
+        """Вывести поле; рендерер с кэшем символов создается при первом выводе.
+
+        diff=True - выводить только изменения с прошлого кадра (ANSI). Карта
+        больше Renderer.FULL_FRAME_MAX_CELLS клеток выводится окном просмотра.
+        """
+        from Renderer import FieldRenderer, Viewport
+        if self.renderer is None:
+            FieldRenderer(self)
+        if not self.renderer.full_frame_allowed():
+            # полный кадр такой карты не строится - показываем окно у первой базы
+            viewport = Viewport.for_terminal(self)
+            if self.bases:
+                viewport.center_on(*self.bases[0].get_position())
+            self.renderer.render_viewport(viewport)
+        elif diff:
+            self.renderer.render_diff()
+        else:
+            self.renderer.render()
+
+    def get_terrain_at(self, x: int, y: int) -> Optional[Landscape]:
+        if not self._is_valid_position(x, y):
+            return None
+        return self._terrain_at(x, y)
+
+    def _is_valid_position(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def is_cell_empty(self, x: int, y: int) -> bool:
+        cell = self.get_unit_at(x, y)
+        return cell is None or isinstance(cell, NeutralObject)
+
+    def get_unit_at(self, x: int, y: int) -> Optional[Unit]:
+        if not self._is_valid_position(x, y):
+            return None
+        cell = self.occupants.get((x, y))
+        return cell if isinstance(cell, Unit) else None
+
+    @undoable
+    def add_unit(self, unit: Unit, x: int, y: int, owner: Optional[Base] = None) -> bool:
+        if not self._is_valid_position(x, y):
+            return self.reject("invalid_position", f"Неверные координаты: ({x}, {y})")
+            
+        terrain = self._terrain_at(x, y)
+        if not self._rule_at(unit, x, y).passable:
+            return self.reject("impassable", f"{unit.name} не может быть размещен на {terrain}")
+            
+        if len(self._units_by_id) >= self.max_units:
+            return self.reject("unit_limit", f"Достигнуто максимальное количество юнитов: {self.max_units}")
+            
+        if not self.is_cell_empty(x, y):
+            return self.reject("cell_occupied", f"Клетка ({x}, {y}) уже занята")
+            
+        if not unit.is_alive():
+            return self.reject("unit_dead", f"Юнит {unit.name} мертв и не может быть размещен")
+
+        if self.journal is not None:
+            # незаписываемый в журнал тип отклоняется до изменения поля
+            self.journal.unit_type_code(unit)
+        unit.id = self.unit_id_counter
+        self.unit_id_counter += 1
+        self._attach_unit(unit, x, y, owner)
+        if bus.active:
+            bus.emit(UnitPlaced(unit, terrain))
+        return True
+
+    @undoable
+    def remove_unit(self, unit: Unit) -> bool:
+        if not self.has_unit(unit):
+            return self.reject("unit_not_on_field", f"Юнит {unit.name} не найден на поле")
+            
+        self._detach_unit(unit)
+        if bus.active:
+            bus.emit(UnitRemoved(unit))
+        return True
+    
+    # === Низкоуровневые изменения поля ===
+    # Все изменения содержимого клеток проходят через эти методы: они
+    # поддерживают индексы, сбрасывают кэши и пишут журнал, но ничего не
+    # проверяют и не выводят. Их же используют загрузка и воспроизведение
+    # журнала, а также отмена действий (FieldHistory).
+
+    def _place_entity(self, entity, x: int, y: int, index: Optional[int] = None):
+        """Поставить базу или нейтральный объект в клетку (index - место
+        в списке баз или объектов, по умолчанию - в конец)"""
+        entity.set_position(x, y)
+        self.occupants[(x, y)] = entity
+        if isinstance(entity, Base):
+            entity.game_field = self
+        entities = self.bases if isinstance(entity, Base) else self.neutral_objects
+        if index is None:
+            entities.append(entity)
+        else:
+            entities.insert(index, entity)
+        self._cell_changed(x, y)
+        if self.journal is not None:
+            self.journal.entity_added(entity)
+        if self.history is not None:
+            self.history.entity_added(entity)
+
+    def _take_entity(self, entity):
+        """Убрать нейтральный объект (или базу) с поля"""
+        x, y = entity.get_position()
+        entities = self.bases if isinstance(entity, Base) else self.neutral_objects
+        index = entities.index(entity)
+        if self.history is not None:
+            self.history.entity_removing(entity, index)
+        if self.occupants.get((x, y)) is entity:
+            del self.occupants[(x, y)]
+        del entities[index]
+        self._cell_changed(x, y)
+        if self.journal is not None:
+            self.journal.entity_removed(entity)
+
+    def _attach_unit(self, unit: Unit, x: int, y: int, owner: Optional[Base] = None):
+        """Поставить юнита с уже назначенным id в клетку"""
+        if self.unit_store is not None:
+            self.unit_store.add(unit, owner)
+        unit.set_position(x, y)
+        self.occupants[(x, y)] = unit
+        self._units_by_id[unit.id] = unit
+        self.unit_grid.add(unit)
+        if owner is not None:
+            self._unit_owners[unit.id] = owner
+        self._cell_changed(x, y)
+        if self.journal is not None:
+            self.journal.unit_added(unit, owner)
+        if self.history is not None:
+            self.history.unit_added(unit)
+
+    def _relocate_unit(self, unit: Unit, new_x: int, new_y: int):
+        old_x, old_y = unit.get_position()
+        del self.occupants[(old_x, old_y)]
+        self.occupants[(new_x, new_y)] = unit
+        unit.set_position(new_x, new_y)
+        self.unit_grid.move(unit, old_x, old_y)
+        self._cell_changed(old_x, old_y)
+        self._cell_changed(new_x, new_y)
+        if self.journal is not None:
+            self.journal.unit_moved(unit)
+        if self.history is not None:
+            self.history.unit_moved(unit, old_x, old_y)
+
+    def _detach_unit(self, unit: Unit):
+        """Убрать юнита с поля и из списка базы-владельца"""
+        self._detach_units((unit,))
+
+    def _detach_units(self, units: Sequence[Unit]):
+        """Убрать юнитов с поля и из списков баз-владельцев; кэши клеток
+        сбрасываются одним проходом после всех удалений"""
+        history = self.history
+        journal = self.journal
+        store = self.unit_store
+        occupants = self.occupants
+        units_by_id = self._units_by_id
+        owners = self._unit_owners
+        forget = self.reachability.forget
+        grid_remove = self.unit_grid.remove
+        freed = []
+        for unit in units:
+            if history is not None:
+                history.unit_removing(unit)
+            x, y = unit.x, unit.y
+            if occupants.get((x, y)) is unit:
+                del occupants[(x, y)]
+                freed.append((x, y))
+            forget(unit)
+            grid_remove(unit, x, y)
+            del units_by_id[unit.id]
+            owner = owners.pop(unit.id, None)
+            if owner is not None and unit in owner.owned_units:
+                owner.owned_units.remove(unit)
+            if journal is not None:
+                journal.unit_removed(unit)
+            if store is not None:
+                store.remove(unit)
+        for x, y in freed:
+            self._cell_changed(x, y)
+
+    def _set_terrain_code(self, x: int, y: int, code: int):
+        """Записать код ландшафта клетки и сбросить зависящие от него кэши"""
+        index = y * self.width + x
+        if self.history is not None:
+            self.history.terrain_changing(x, y, self.terrain[index])
+        self.terrain[index] = code
+        self._cell_changed(x, y)
+        self.sight.invalidate_cell(x, y)
+        if self.renderer is not None:
+            self.renderer.terrain_changed(x, y)
+        if self.journal is not None:
+            self.journal.terrain_changed(x, y, code)
+
+    def _add_effect(self, effect: TimedEffect):
+        """Поставить эффект на учет (бонус уже добавлен к характеристике)"""
+        self.effects.push(effect)
+        if self.journal is not None:
+            self.journal.effect_added(effect)
+        if self.history is not None:
+            self.history.effect_added(effect)
+
+    def _remove_effect(self, effect: TimedEffect):
+        """Снять эффект с учета (характеристику не меняет)"""
+        self.effects.cancel(effect)
+        if self.journal is not None:
+            self.journal.effect_removed(effect)
+        if self.history is not None:
+            self.history.effect_removed(effect)
+
+    def _sort_units(self):
+        """Вернуть юнитов в порядок размещения (id выдаются по возрастанию)
+        после возврата убранных юнитов на поле"""
+        self._units_by_id = dict(sorted(self._units_by_id.items()))
+
+    def _unit_changing(self, unit: Unit):
+        """Сообщить, что характеристики юнита сейчас изменятся (для отмены)"""
+        if self.history is not None:
+            self.history.unit_changing(unit)
+
+    def _unit_changed(self, unit: Unit):
+        """Сообщить, что характеристики юнита (здоровье, броня, атака) изменились"""
+        if self.journal is not None:
+            self.journal.unit_changed(unit)
+
+    def _restore_unit(self, unit: Unit, owner: Optional[Base] = None):
+        """Вернуть юнита с уже заданными id и позицией, включая его в список
+        базы-владельца (загрузка сохранения)"""
+        self._attach_unit(unit, unit.x, unit.y, owner)
+        if owner is not None:
+            owner.owned_units.append(unit)
+
+    def get_unit_info(self):
+        """Показать информацию о всех юнитах на поле"""
+        if not self.units:
+            print("❌ На поле нет юнитов")
+        return
+    
+        print(f"\n📋 СПИСОК ЮНИТОВ НА ПОЛЕ:")
+        for i, unit in enumerate(self.units, 1):
+            try:
+            # Безопасное получение позиции
+                if hasattr(unit, 'get_position'):
+                    pos = unit.get_position()
+                    x, y = pos if pos else ("?", "?")
+                else:
+                    x, y = getattr(unit, 'x', "?"), getattr(unit, 'y', "?")
+            
+                status = "жив" if unit.is_alive() else "мертв"
+            
+                print(f"{i}. {unit.name} - ({x}, {y}) - {status}")
+                print(f"   ❤️ {unit.health}/{unit.max_health} HP | ⚔️ {unit.attack} ATK | 🛡️ {unit.armor} ARM")
+            except Exception as e:
                 print(f"{i}. Ошибка при выводе информации о юните: {e}")
\ No newline at end of file
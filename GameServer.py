@@ -0,0 +1,391 @@
+"""Сервер игр: много независимых партий в одном процессе на asyncio.
+
+Каждое подключение (TCP или Unix-сокет) - отдельная сессия со своим
+GameEngine и своей конфигурацией. Протокол строковый: клиент шлет по
+одному JSON-объекту в строке, сервер отвечает одной строкой на каждый
+запрос:
+
+    -> {"id": 1, "action": "new_game", "width": 10, "height": 10}
+    <- {"id": 1, "action": "new_game", "ok": true, "data": {...}, "error": null, "error_code": null}
+    -> {"id": 2, "action": "move", "unit_id": 1, "x": 3, "y": 3}
+    <- {"id": 2, "action": "move", "ok": true, "data": {"unit_id": 1, "x": 3, "y": 3}, "error": null,
+        "error_code": null}
+
+Команды юнитов и баз - GameEngine.ACTIONS с теми же параметрами, что у
+GameEngine.execute. Команды сессии:
+
+    new_game        новая партия: width, height, max_units, base_name, seed
+                    (seed - зерно генератора случайных чисел только этой партии)
+    state           ход, базы и юниты партии
+    config_get      конфигурация сессии
+    config_set      изменить конфигурацию: {"values": {"difficulty": "hard"}}
+    ping            проверка связи
+    quit            закрыть сессию
+
+При подключении сервер присылает приветствие с номером сессии. Неверные
+параметры дают ответ с кодом invalid_params, исключение внутри команды -
+ответ с кодом internal_error; подключение в обоих случаях остается открытым.
+
+Бюджеты сессии:
+
+    память      оценка размера партии: поле, поля стоимости всех классов
+                передвижения, max_units юнитов и кэш полей потока
+                move_group. Кэш полей потока сессии ограничен тем, что
+                остается от memory_budget (не больше FLOW_CACHE_SIZE);
+                партия, в которую не помещается хотя бы одно поле потока
+                сверх кэша (оно строится до вытеснения старого), не
+                создается
+    процессор   ведро токенов процессорного времени: сессия получает
+                cpu_share секунды процессора в секунду с запасом cpu_burst;
+                исчерпавшая запас сессия ждет пополнения, не задерживая
+                остальных. Ведро проверяется перед командой, поэтому одна
+                дорогая команда (new_game на пределе памяти, первое поле
+                потока move_group) может уйти в минус - сессия отработает
+                долг ожиданием перед следующими командами
+
+Дорогие команды (POOLED_ACTIONS: new_game строит карту, move_group -
+поля потока) выполняются в пуле из workers потоков, а не в цикле
+событий: долгая команда занимает один поток и не останавливает прием и
+ответы остальных сессий. Остальные команды короткие и выполняются прямо
+в цикле - передача в поток стоила бы дороже их самих. Команды одной
+сессии идут по очереди.
+
+Запуск:
+    python GameServer.py [--host 127.0.0.1] [--port 8765] [--unix PATH]
+"""
+import asyncio
+import copy
+import json
+import random
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from GameEngine import GameEngine, CommandResult
+from GameConfig import GameConfig, ConfigValidator
+from CostFields import MOVEMENT_CLASSES
+from TerrainGenerator import TerrainGenerator
+
+# Оценка памяти партии: постоянная часть поля, байт на клетку и на юнита
+FIELD_BYTES = 16 * 1024
+CELL_BYTES = 2
+UNIT_BYTES = 1024
+# Поля стоимости: байт на клетку для каждого класса передвижения (в худшем
+# случае у всех классов разные правила ландшафта)
+COST_CELL_BYTES = len(MOVEMENT_CLASSES) + 1
+
+# Максимальная длина строки запроса
+MAX_LINE = 64 * 1024
+
+SESSION_ACTIONS = ("new_game", "state", "config_get", "config_set", "ping", "quit")
+# Команды, работа которых растет с размером карты: выполняются в пуле потоков
+POOLED_ACTIONS = ("new_game", "move_group")
+
+
+def estimate_game_memory(width: int, height: int, max_units: int, flow_fields: int = 0) -> int:
+    """Оценка памяти партии в байтах вместе с flow_fields полями потока"""
+    from FlowFields import FLOW_CELL_BYTES
+    cells = width * height
+    return (FIELD_BYTES + cells * (CELL_BYTES + COST_CELL_BYTES) + max_units * UNIT_BYTES
+            + flow_fields * cells * FLOW_CELL_BYTES)
+
+
+def flow_cache_size(width: int, height: int, max_units: int, budget: int) -> int:
+    """Сколько полей потока держать в кэше партии, чтобы она оставалась в
+    бюджете памяти; 0 - не помещается даже одно поле сверх кэша"""
+    from FlowFields import FLOW_CACHE_SIZE
+    per_field = estimate_game_memory(width, height, max_units, 1) - estimate_game_memory(width, height, max_units)
+    fields = (budget - estimate_game_memory(width, height, max_units)) // per_field
+    # новое поле строится до вытеснения старого из полного кэша
+    return max(0, min(FLOW_CACHE_SIZE, fields - 1))
+
+
+class Session:
+    """Состояние одной партии на сервере"""
+    __slots__ = ("id", "server", "engine", "config", "tokens", "refilled", "cpu_used",
+                 "commands", "memory")
+
+    def __init__(self, session_id: int, server: 'GameServer'):
+        self.id = session_id
+        self.server = server
+        self.engine: Optional[GameEngine] = None
+        # своя копия конфигурации создается при первом обращении
+        self.config: Optional[GameConfig] = None
+        self.tokens = server.cpu_burst
+        self.refilled = time.monotonic()
+        self.cpu_used = 0.0
+        self.commands = 0
+        self.memory = 0
+
+    # === Бюджет процессора ===
+
+    def cpu_wait(self) -> float:
+        """Сколько секунд подождать до следующей команды (0 - можно выполнять)"""
+        now = time.monotonic()
+        rate = self.server.cpu_share
+        self.tokens = min(self.server.cpu_burst, self.tokens + (now - self.refilled) * rate)
+        self.refilled = now
+        return -self.tokens / rate if self.tokens < 0 else 0.0
+
+    def handle(self, request: Dict[str, Any]) -> CommandResult:
+        """Выполнить запрос и списать затраченное процессорное время.
+
+        Исключение внутри команды становится ответом с кодом internal_error:
+        один неудачный запрос не закрывает подключение клиента.
+        """
+        started = time.thread_time()
+        try:
+            return self._dispatch(request)
+        except Exception as e:
+            traceback.print_exc()
+            return CommandResult(str(request.get("action")), False,
+                                 error=f"Внутренняя ошибка сервера: {type(e).__name__}: {e}",
+                                 error_code="internal_error")
+        finally:
+            spent = time.thread_time() - started
+            self.tokens -= spent
+            self.cpu_used += spent
+            self.commands += 1
+
+    # === Команды ===
+
+    def _dispatch(self, request: Dict[str, Any]) -> CommandResult:
+        action = request.get("action")
+        params = {key: value for key, value in request.items() if key not in ("action", "id")}
+        if action in SESSION_ACTIONS:
+            try:
+                return getattr(self, "_" + action)(**params)
+            except TypeError as e:
+                return CommandResult(action, False, error=f"Неверные параметры команды: {e}",
+                                     error_code="invalid_params")
+        if self.engine is None:
+            return CommandResult(str(action), False, error="Нет активной партии: начните с new_game")
+        return self.engine.execute(dict(params, action=action))
+
+    def _get_config(self) -> GameConfig:
+        if self.config is None:
+            self.config = copy.deepcopy(self.server.config)
+        return self.config
+
+    def _new_game(self, width: int = None, height: int = None, max_units: int = 20,
+                  base_name: str = "Главная база", seed: int = None) -> CommandResult:
+        config = self.config or self.server.config
+        default_width, default_height = config.map_size
+        width = default_width if width is None else width
+        height = default_height if height is None else height
+        if not all(isinstance(value, int) and value > 0 for value in (width, height, max_units)):
+            return CommandResult("new_game", False, error="Размеры поля и число юнитов должны быть положительными")
+        flow_fields = flow_cache_size(width, height, max_units, self.server.memory_budget)
+        memory = estimate_game_memory(width, height, max_units, max(flow_fields, 1) + 1)
+        if not flow_fields:
+            return CommandResult("new_game", False,
+                                 error=f"Партия не помещается в лимит памяти сессии: {memory} > "
+                                       f"{self.server.memory_budget} байт")
+        # у каждой партии свой генератор: seed одной сессии не трогает
+        # случайность остальных
+        self.engine = GameEngine.new_game(width, height, max_units, base_name=str(base_name),
+                                          terrain_generator=TerrainGenerator.from_config(config),
+                                          rng=random.Random(seed))
+        from FlowFields import FlowFields
+        field = self.engine.game_field
+        field.flow_fields = FlowFields(field, size=flow_fields)
+        self.memory = memory
+        return CommandResult("new_game", True, {"width": width, "height": height, "max_units": max_units,
+                                                "memory": memory})
+
+    def _state(self) -> CommandResult:
+        if self.engine is None:
+            return CommandResult("state", False, error="Нет активной партии: начните с new_game")
+        field = self.engine.game_field
+        return CommandResult("state", True, {
+            "turn": self.engine.turn_count,
+            "running": self.engine.is_running,
+            "bases": [{"name": base.name, "x": base.x, "y": base.y, "health": base.health,
+                       "resources": base.resources} for base in field.bases],
+            "units": [{"id": unit.id, "name": unit.name, "x": unit.x, "y": unit.y,
+                       "health": unit.health} for unit in field.units],
+        })
+
+    def _config_get(self) -> CommandResult:
+        return CommandResult("config_get", True, (self.config or self.server.config).to_dict())
+
+    def _config_set(self, values: Dict[str, Any]) -> CommandResult:
+        if not isinstance(values, dict):
+            return CommandResult("config_set", False, error="values должен быть объектом")
+        values = dict(values)
+        map_size = values.get("map_size")
+        # размер принимается в виде config_get ({"width", "height"}) или списком
+        if isinstance(map_size, dict):
+            values["map_size"] = (map_size.get("width"), map_size.get("height"))
+        elif isinstance(map_size, list):
+            values["map_size"] = tuple(map_size)
+        try:
+            # сначала проверяем все значения, чтобы не применить часть
+            checked = ConfigValidator.for_class(GameConfig).validate(values)
+        except ValueError as e:
+            return CommandResult("config_set", False, error=str(e))
+        config = self._get_config()
+        for name, value in checked.items():
+            setattr(config, name, value)
+        return CommandResult("config_set", True, config.to_dict())
+
+    def _ping(self) -> CommandResult:
+        return CommandResult("ping", True, {"session": self.id, "commands": self.commands,
+                                            "cpu_used": round(self.cpu_used, 6), "memory": self.memory})
+
+    def _quit(self) -> CommandResult:
+        return CommandResult("quit", True)
+
+
+class GameServer:
+    """Хранит сессии и обслуживает подключения"""
+
+    def __init__(self, config: Optional[GameConfig] = None, max_sessions: int = 10_000,
+                 memory_budget: int = 1024 * 1024, cpu_share: float = 0.1, cpu_burst: float = 0.5,
+                 idle_timeout: Optional[float] = None, workers: int = 4):
+        # шаблон конфигурации для сессий; файл читается при первой партии
+        self._config = config
+        self._config_lock = threading.Lock()
+        self.max_sessions = max_sessions
+        self.memory_budget = memory_budget
+        self.cpu_share = cpu_share
+        self.cpu_burst = cpu_burst
+        self.idle_timeout = idle_timeout
+        self.workers = workers
+        # потоки, в которых выполняются команды сессий
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.sessions: Dict[int, Session] = {}
+        # потоки записи открытых сессий, чтобы закрыть их при остановке
+        self._writers: Dict[int, asyncio.StreamWriter] = {}
+        self._next_id = 1
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def config(self) -> GameConfig:
+        # сессии обращаются к шаблону из потоков пула команд
+        with self._config_lock:
+            if self._config is None:
+                self._config = GameConfig(environ={})
+            return self._config
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765, unix_path: Optional[str] = None):
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="game-session")
+        if unix_path:
+            self._server = await asyncio.start_unix_server(self._serve, unix_path, limit=MAX_LINE)
+        else:
+            self._server = await asyncio.start_server(self._serve, host, port, limit=MAX_LINE)
+        return self._server
+
+    @property
+    def address(self):
+        return self._server.sockets[0].getsockname() if self._server else None
+
+    async def close(self):
+        """Перестать принимать подключения и закрыть открытые сессии"""
+        if self._server is not None:
+            self._server.close()
+        for writer in list(self._writers.values()):
+            writer.close()
+        # обработчики сессий завершаются, прочитав конец потока
+        while self.sessions:
+            await asyncio.sleep(0.01)
+        if self._server is not None:
+            await self._server.wait_closed()
+            self._server = None
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        if len(self.sessions) >= self.max_sessions:
+            self._send(writer, CommandResult("hello", False, error="Сервер заполнен"))
+            writer.close()
+            return
+        session = Session(self._next_id, self)
+        self._next_id += 1
+        self.sessions[session.id] = session
+        self._writers[session.id] = writer
+        try:
+            self._send(writer, CommandResult("hello", True, {"session": session.id,
+                                                             "actions": SESSION_ACTIONS + GameEngine.ACTIONS}))
+            await writer.drain()
+            while True:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    break
+                except (asyncio.LimitOverrunError, ValueError):
+                    self._send(writer, CommandResult("error", False, error="Слишком длинная строка запроса"))
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("запрос должен быть JSON-объектом")
+                except ValueError as e:
+                    self._send(writer, CommandResult("error", False, error=f"Неверный JSON: {e}"))
+                    await writer.drain()
+                    continue
+                wait = session.cpu_wait()
+                if wait:
+                    await asyncio.sleep(wait)
+                if request.get("action") in POOLED_ACTIONS:
+                    result = await asyncio.get_running_loop().run_in_executor(self._executor, session.handle,
+                                                                              request)
+                else:
+                    result = session.handle(request)
+                self._send(writer, result, request.get("id"))
+                await writer.drain()
+                if result.action == "quit":
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            del self.sessions[session.id]
+            del self._writers[session.id]
+            writer.close()
+
+    @staticmethod
+    def _send(writer: asyncio.StreamWriter, result: CommandResult, request_id=None):
+        response = result.to_dict()
+        if request_id is not None:
+            response["id"] = request_id
+        writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+
+
+async def _run(args):
+    server = GameServer(max_sessions=args.max_sessions, memory_budget=args.memory_budget,
+                        cpu_share=args.cpu_share, idle_timeout=args.idle_timeout, workers=args.workers)
+    await server.start(args.host, args.port, args.unix)
+    print(f"🌐 Сервер игр запущен: {args.unix or server.address}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Сервер игр с протоколом JSON-строк")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="путь к Unix-сокету вместо TCP")
+    parser.add_argument("--max-sessions", type=int, default=10_000)
+    parser.add_argument("--memory-budget", type=int, default=1024 * 1024, help="байт на сессию")
+    parser.add_argument("--cpu-share", type=float, default=0.1, help="доля ядра на сессию")
+    parser.add_argument("--workers", type=int, default=4, help="потоков для выполнения команд")
+    parser.add_argument("--idle-timeout", type=float, default=None, help="секунд до закрытия простаивающей сессии")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_run(args))
+    except KeyboardInterrupt:
+        print("👋 Сервер остановлен")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""История изменений поля для отмены и повтора действий.
+
+FieldHistory подключается к полю (GameField.history) и, как журнал
+автосохранения, получает вызовы из низкоуровневых методов поля. Каждый
+вызов записывает обратимую дельту: юнит поставлен, перемещен, убран,
+характеристики изменены, объект поставлен или убран, ландшафт изменен,
+временный эффект добавлен или снят. Базы поля сообщают истории о смене
+ресурсов, здоровья и состава армии (Base._changing) - создание юнита
+базой отменяется вместе с тратой ресурсов.
+Дельты одного действия (перемещение, атака с гибелью цели, взаимодействие
+с объектом, добавление и удаление юнита) собираются в шаг - публичные
+методы поля, отмеченные undoable, открывают шаг на время своей работы.
+
+Отмена шага применяет обратные дельты в обратном порядке через те же
+низкоуровневые методы поля, поэтому индексы, кэши, рендерер и журнал
+остаются согласованными, а стоимость отмены пропорциональна числу
+изменений шага, а не размеру поля. Обратные дельты сами записываются
+в новый шаг - он и становится шагом повтора.
+
+trial() - пробный блок для перебора вариантов: все изменения внутри
+блока откатываются при выходе из него и не попадают в историю.
+"""
+import contextlib
+import functools
+from operator import attrgetter
+from typing import Dict, List, Optional
+from Base import UnitRoster
+
+# Характеристики юнита, которые сохраняет дельта "юнит изменен"
+UNIT_STATS = ("health", "max_health", "armor", "attack", "move_range")
+# Поля базы, которые сохраняет дельта "база изменена" (вместе с составом армии)
+BASE_STATS = ("resources", "health", "max_health")
+
+DELTA_UNIT_ADDED = 1
+DELTA_UNIT_MOVED = 2
+DELTA_UNIT_CHANGED = 3
+DELTA_UNIT_REMOVED = 4
+DELTA_ENTITY_ADDED = 5
+DELTA_ENTITY_REMOVED = 6
+DELTA_TERRAIN_CHANGED = 7
+DELTA_EFFECT_ADDED = 8
+DELTA_EFFECT_REMOVED = 9
+DELTA_BASE_CHANGED = 10
+
+_read_stats = attrgetter(*UNIT_STATS)
+_read_base = attrgetter(*BASE_STATS)
+
+
+class HistoryStep:
+    """Дельты одного действия и счетчик id юнитов до него"""
+    __slots__ = ("deltas", "unit_id_counter", "saved_units", "saved_bases")
+
+    def __init__(self, unit_id_counter: int):
+        self.deltas: List[tuple] = []
+        self.unit_id_counter = unit_id_counter
+        # id юнитов, характеристики которых уже сохранены в этом шаге
+        self.saved_units: Dict[int, None] = {}
+        # id(база) баз, состояние которых уже сохранено в этом шаге
+        self.saved_bases: Dict[int, None] = {}
+
+
+def undoable(method):
+    """Выполнить метод поля одним шагом истории (если история подключена)"""
+    @functools.wraps(method)
+    def wrapper(field, *args, **kwargs):
+        history = field.history
+        if history is None:
+            return method(field, *args, **kwargs)
+        with history.step():
+            return method(field, *args, **kwargs)
+    return wrapper
+
+
+class FieldHistory:
+    """Неограниченные стеки отмены и повтора изменений поля"""
+
+    def __init__(self, game_field):
+        self.game_field = game_field
+        self.undo_stack: List[HistoryStep] = []
+        self.redo_stack: List[HistoryStep] = []
+        self._step: Optional[HistoryStep] = None
+        self._paused = False
+
+    # === Подключение ===
+
+    def attach(self):
+        self.game_field.history = self
+        return self
+
+    def detach(self):
+        if self.game_field.history is self:
+            self.game_field.history = None
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self.undo_stack)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self.redo_stack)
+
+    # === Шаги ===
+
+    @contextlib.contextmanager
+    def step(self):
+        """Собрать изменения поля внутри блока в один шаг отмены.
+
+        Вложенные блоки входят в уже открытый шаг. Новый непустой шаг
+        очищает стек повтора.
+        """
+        if self._step is not None:
+            yield self._step
+            return
+        step = self._step = HistoryStep(self.game_field.unit_id_counter)
+        try:
+            yield step
+        finally:
+            self._step = None
+            if step.deltas:
+                self.undo_stack.append(step)
+                self.redo_stack.clear()
+
+    @contextlib.contextmanager
+    def trial(self):
+        """Пробные изменения: при выходе из блока поле возвращается в
+        исходное состояние, стеки отмены и повтора не меняются"""
+        outer = self._step
+        step = outer if outer is not None else HistoryStep(self.game_field.unit_id_counter)
+        mark = len(step.deltas)
+        unit_id_counter = self.game_field.unit_id_counter
+        self._step = step
+        try:
+            yield self.game_field
+        finally:
+            self._paused = True
+            try:
+                self._apply_inverse(step.deltas[mark:])
+            finally:
+                self._paused = False
+            del step.deltas[mark:]
+            step.saved_units = {delta[1].id: None for delta in step.deltas
+                                if delta[0] == DELTA_UNIT_CHANGED}
+            step.saved_bases = {id(delta[1]): None for delta in step.deltas
+                                if delta[0] == DELTA_BASE_CHANGED}
+            self.game_field.unit_id_counter = unit_id_counter
+            self._step = outer
+
+    def undo(self) -> bool:
+        """Отменить последний шаг"""
+        if not self.undo_stack or self._step is not None:
+            return False
+        self.redo_stack.append(self._replay(self.undo_stack.pop()))
+        return True
+
+    def redo(self) -> bool:
+        """Повторить последний отмененный шаг"""
+        if not self.redo_stack or self._step is not None:
+            return False
+        self.undo_stack.append(self._replay(self.redo_stack.pop()))
+        return True
+
+    def _replay(self, step: HistoryStep) -> HistoryStep:
+        """Применить обратные дельты шага; возвращает шаг, отменяющий это"""
+        reverse = self._step = HistoryStep(self.game_field.unit_id_counter)
+        try:
+            self._apply_inverse(step.deltas)
+        finally:
+            self._step = None
+        self.game_field.unit_id_counter = step.unit_id_counter
+        return reverse
+
+    def _apply_inverse(self, deltas: List[tuple]):
+        field = self.game_field
+        restored_units = False
+        for delta in reversed(deltas):
+            kind = delta[0]
+            if kind == DELTA_UNIT_ADDED:
+                field._detach_unit(delta[1])
+            elif kind == DELTA_UNIT_MOVED:
+                _, unit, x, y = delta
+                field._relocate_unit(unit, x, y)
+            elif kind == DELTA_UNIT_CHANGED:
+                _, unit, stats = delta
+                self.unit_changing(unit)
+                for name, value in zip(UNIT_STATS, stats):
+                    setattr(unit, name, value)
+                field._unit_changed(unit)
+            elif kind == DELTA_UNIT_REMOVED:
+                _, unit, x, y, owner, roster_index = delta
+                field._attach_unit(unit, x, y, owner)
+                if roster_index is not None:
+                    owner.owned_units.insert(roster_index, unit)
+                restored_units = True
+            elif kind == DELTA_ENTITY_ADDED:
+                field._take_entity(delta[1])
+            elif kind == DELTA_ENTITY_REMOVED:
+                _, entity, x, y, list_index, state = delta
+                field._place_entity(entity, x, y, list_index)
+                vars(entity).update(state)
+            elif kind == DELTA_TERRAIN_CHANGED:
+                _, x, y, code = delta
+                field._set_terrain_code(x, y, code)
+            elif kind == DELTA_EFFECT_ADDED:
+                field._remove_effect(delta[1])
+            elif kind == DELTA_EFFECT_REMOVED:
+                field._add_effect(delta[1])
+            elif kind == DELTA_BASE_CHANGED:
+                _, base, stats, roster = delta
+                self.base_changing(base)
+                for name, value in zip(BASE_STATS, stats):
+                    setattr(base, name, value)
+                base.owned_units = UnitRoster(roster)
+        if restored_units:
+            field._sort_units()
+
+    # === Вызовы из GameField ===
+
+    def _record(self, delta: tuple):
+        if self._paused:
+            return
+        if self._step is not None:
+            self._step.deltas.append(delta)
+        else:
+            # изменение вне действия - отдельный шаг
+            step = HistoryStep(self.game_field.unit_id_counter)
+            step.deltas.append(delta)
+            self.undo_stack.append(step)
+            self.redo_stack.clear()
+
+    def unit_added(self, unit):
+        self._record((DELTA_UNIT_ADDED, unit))
+
+    def unit_moved(self, unit, old_x: int, old_y: int):
+        self._record((DELTA_UNIT_MOVED, unit, old_x, old_y))
+
+    def unit_changing(self, unit):
+        """Характеристики юнита сейчас изменятся: сохранить их один раз за шаг"""
+        step = self._step
+        if step is not None and not self._paused:
+            if unit.id in step.saved_units:
+                return
+            step.saved_units[unit.id] = None
+        self._record((DELTA_UNIT_CHANGED, unit, _read_stats(unit)))
+
+    def base_changing(self, base):
+        """Ресурсы, здоровье или армия базы сейчас изменятся: сохранить их один раз за шаг"""
+        step = self._step
+        if step is not None and not self._paused:
+            if id(base) in step.saved_bases:
+                return
+            step.saved_bases[id(base)] = None
+        self._record((DELTA_BASE_CHANGED, base, _read_base(base), list(base.owned_units)))
+
+    def unit_removing(self, unit):
+        owner = self.game_field.get_unit_owner(unit)
+        roster_index = None
+        if owner is not None and unit in owner.owned_units:
+            roster_index = owner.owned_units.index(unit)
+        self._record((DELTA_UNIT_REMOVED, unit, unit.x, unit.y, owner, roster_index))
+
+    def entity_added(self, entity):
+        self._record((DELTA_ENTITY_ADDED, entity))
+
+    def entity_removing(self, entity, list_index: int):
+        # состояние объекта (например, обнаруженная ловушка) возвращается при отмене
+        self._record((DELTA_ENTITY_REMOVED, entity, entity.x, entity.y, list_index, dict(vars(entity))))
+
+    def terrain_changing(self, x: int, y: int, old_code: int):
+        self._record((DELTA_TERRAIN_CHANGED, x, y, old_code))
+
+    def effect_added(self, effect):
+        self._record((DELTA_EFFECT_ADDED, effect))
+
+    def effect_removed(self, effect):
+        self._record((DELTA_EFFECT_REMOVED, effect))
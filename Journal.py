@@ -0,0 +1,330 @@
+"""Журнал ходов для инкрементального автосохранения.
+
+Полный снимок (SaveFormat) пишется только раз в snapshot_every ходов, а
+между снимками каждое изменение поля дописывается в журнал компактной
+двоичной записью: код операции (1 байт) и данные фиксированной длины.
+Записи копятся в буфере и сбрасываются на диск в конце хода, поэтому
+стоимость автосохранения хода пропорциональна числу изменений за ход, а
+не размеру карты.
+
+Файл журнала начинается с заголовка, где записан ход снимка, к которому
+он относится. Восстановление загружает снимок и воспроизводит журнал,
+если ходы совпадают; журнал от старого снимка отбрасывается.
+"""
+import os
+import struct
+from typing import Dict, Tuple
+from Base import Base, UnitRoster
+from Units import UnitFactory, Archer, Crossbowman, unit_class, STAT_FIELDS
+from Effects import TimedEffect
+import SaveFormat
+
+JOURNAL_MAGIC = b"GJRN"
+JOURNAL_VERSION = 1
+SNAPSHOT_INTERVAL = 10
+
+# magic, version, ход снимка
+JOURNAL_HEADER = struct.Struct("<4sHI")
+
+OP_UNIT_ADDED = 1
+OP_UNIT_MOVED = 2
+OP_UNIT_CHANGED = 3
+OP_UNIT_REMOVED = 4
+OP_OBJECT_ADDED = 5
+OP_ENTITY_REMOVED = 6
+OP_BASE_ADDED = 7
+OP_BASE_CHANGED = 8
+OP_TURN_END = 9
+OP_TERRAIN_CHANGED = 10
+OP_EFFECT_ADDED = 11
+OP_EFFECT_REMOVED = 12
+
+OPCODE = struct.Struct("<B")
+# id, код типа, x, y, health, max_health, armor, attack, move_range,
+# attack_range, индекс базы-владельца (-1 - нет), флаги
+UNIT_ADDED = struct.Struct("<IBiiiiiiiiiB")
+# id, x, y
+UNIT_MOVED = struct.Struct("<Iii")
+# id, health, armor, attack, флаги
+UNIT_CHANGED = struct.Struct("<IiiiB")
+# id
+UNIT_REMOVED = struct.Struct("<I")
+# код типа, x, y, флаги
+OBJECT_ADDED = struct.Struct("<Bii")
+# x, y
+ENTITY_REMOVED = struct.Struct("<ii")
+# x, y, health, max_health, max_units, resources, длина названия (название следует за записью)
+BASE_ADDED = struct.Struct("<iiiiiiH")
+# индекс базы, health, resources
+BASE_CHANGED = struct.Struct("<Iii")
+# номер хода
+TURN_END = struct.Struct("<I")
+# x, y, код ландшафта
+TERRAIN_CHANGED = struct.Struct("<iiB")
+# id эффекта, id юнита, код характеристики, величина, ход окончания
+EFFECT_ADDED = struct.Struct("<IIBiI")
+# id эффекта
+EFFECT_REMOVED = struct.Struct("<I")
+
+RECORD_SIZES = {
+    OP_UNIT_ADDED: UNIT_ADDED.size,
+    OP_UNIT_MOVED: UNIT_MOVED.size,
+    OP_UNIT_CHANGED: UNIT_CHANGED.size,
+    OP_UNIT_REMOVED: UNIT_REMOVED.size,
+    OP_OBJECT_ADDED: OBJECT_ADDED.size,
+    OP_ENTITY_REMOVED: ENTITY_REMOVED.size,
+    OP_BASE_ADDED: BASE_ADDED.size,
+    OP_BASE_CHANGED: BASE_CHANGED.size,
+    OP_TURN_END: TURN_END.size,
+    OP_TERRAIN_CHANGED: TERRAIN_CHANGED.size,
+    OP_EFFECT_ADDED: EFFECT_ADDED.size,
+    OP_EFFECT_REMOVED: EFFECT_REMOVED.size,
+}
+
+
+def _unit_flags(unit) -> int:
+    return SaveFormat.FLAG_BOLT_LOADED if getattr(unit, "bolt_loaded", False) else 0
+
+
+class TurnJournal:
+    """Автосохранение: периодические снимки и журнал изменений между ними.
+
+    Подключается к полю движка (GameField.journal) и получает вызовы из
+    низкоуровневых методов поля. Конец хода отмечает GameEngine.next_turn.
+    """
+
+    def __init__(self, engine, path_prefix: str = "autosave",
+                 snapshot_every: int = SNAPSHOT_INTERVAL):
+        if snapshot_every < 1:
+            raise ValueError("Интервал снимков должен быть не меньше 1 хода")
+        self.engine = engine
+        self.snapshot_path = path_prefix + ".sav"
+        self.journal_path = path_prefix + ".journal"
+        self.snapshot_every = snapshot_every
+        self._buffer = bytearray()
+        self._file = None
+        # класс юнита -> код типа; пересчитывается, если тип зарегистрирован позже
+        self._type_codes: Dict[type, int] = {}
+        self._base_state: Dict[int, Tuple[int, int]] = {}
+
+    # === Подключение и снимки ===
+
+    def attach(self):
+        """Подключиться к полю и начать с полного снимка"""
+        self.engine.game_field.journal = self
+        self.write_snapshot()
+
+    def detach(self):
+        if self.engine.game_field.journal is self:
+            self.engine.game_field.journal = None
+        self.close()
+
+    def close(self):
+        if self._file is not None:
+            self._flush()
+            self._file.close()
+            self._file = None
+
+    def write_snapshot(self):
+        """Записать полный снимок и начать новый журнал"""
+        temp_path = self.snapshot_path + ".tmp"
+        SaveFormat.save_game(self.engine, temp_path)
+        os.replace(temp_path, self.snapshot_path)
+        if self._file is not None:
+            self._file.close()
+        self._buffer.clear()
+        self._file = open(self.journal_path, "wb")
+        self._file.write(JOURNAL_HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION, self.engine.turn_count))
+        self._file.flush()
+        self._remember_bases()
+
+    def end_turn(self):
+        """Завершить ход: записать изменения баз и сбросить журнал на диск"""
+        field = self.engine.game_field
+        for index, base in enumerate(field.bases):
+            state = (base.health, base.resources)
+            if self._base_state.get(id(base)) != state:
+                self._base_state[id(base)] = state
+                self._append(OP_BASE_CHANGED, BASE_CHANGED.pack(index, base.health, base.resources))
+        self._append(OP_TURN_END, TURN_END.pack(self.engine.turn_count))
+
+        if self.engine.turn_count % self.snapshot_every == 0:
+            self.write_snapshot()
+        else:
+            self._flush()
+
+    def _remember_bases(self):
+        self._base_state = {id(base): (base.health, base.resources)
+                            for base in self.engine.game_field.bases}
+
+    def _append(self, opcode: int, payload: bytes):
+        self._buffer += OPCODE.pack(opcode)
+        self._buffer += payload
+
+    def _flush(self):
+        if self._buffer and self._file is not None:
+            self._file.write(self._buffer)
+            self._file.flush()
+            self._buffer.clear()
+
+    # === Вызовы из GameField ===
+
+    def unit_type_code(self, unit) -> int:
+        """Код типа юнита по текущему UnitFactory; SaveFormatError, если тип
+        не зарегистрирован (GameField проверяет это до изменения поля)"""
+        cls = unit_class(unit)
+        code = self._type_codes.get(cls)
+        if code is None:
+            self._type_codes = {cls: code for code, cls in enumerate(UnitFactory.UNIT_TYPES.values())}
+            code = self._type_codes.get(cls)
+            if code is None:
+                raise SaveFormat.SaveFormatError(
+                    f"Тип юнита {cls.__name__} не зарегистрирован в UnitFactory и не может попасть в журнал")
+        return code
+
+    def unit_added(self, unit, owner):
+        field = self.engine.game_field
+        owner_index = field.bases.index(owner) if owner is not None else -1
+        self._append(OP_UNIT_ADDED, UNIT_ADDED.pack(
+            unit.id, self.unit_type_code(unit), unit.x, unit.y, unit.health,
+            unit.max_health, unit.armor, unit.attack, unit.move_range,
+            getattr(unit, "attack_range", 0), owner_index, _unit_flags(unit)))
+
+    def unit_moved(self, unit):
+        self._append(OP_UNIT_MOVED, UNIT_MOVED.pack(unit.id, unit.x, unit.y))
+
+    def unit_changed(self, unit):
+        self._append(OP_UNIT_CHANGED, UNIT_CHANGED.pack(
+            unit.id, unit.health, unit.armor, unit.attack, _unit_flags(unit)))
+
+    def unit_removed(self, unit):
+        self._append(OP_UNIT_REMOVED, UNIT_REMOVED.pack(unit.id))
+
+    def entity_added(self, entity):
+        if isinstance(entity, Base):
+            name = entity.name.encode("utf-8")
+            self._append(OP_BASE_ADDED, BASE_ADDED.pack(
+                entity.x, entity.y, entity.health, entity.max_health,
+                entity.max_units, entity.resources, len(name)) + name)
+            self._base_state[id(entity)] = (entity.health, entity.resources)
+        else:
+            self._append(OP_OBJECT_ADDED, OBJECT_ADDED.pack(
+                SaveFormat.OBJECT_TYPES.index(type(entity)), entity.x, entity.y))
+
+    def entity_removed(self, entity):
+        self._append(OP_ENTITY_REMOVED, ENTITY_REMOVED.pack(entity.x, entity.y))
+
+    def terrain_changed(self, x, y, code):
+        self._append(OP_TERRAIN_CHANGED, TERRAIN_CHANGED.pack(x, y, code))
+
+    def effect_added(self, effect):
+        self._append(OP_EFFECT_ADDED, EFFECT_ADDED.pack(
+            effect.id, effect.unit.id, STAT_FIELDS.index(effect.stat), effect.amount, effect.expires_turn))
+
+    def effect_removed(self, effect):
+        self._append(OP_EFFECT_REMOVED, EFFECT_REMOVED.pack(effect.id))
+
+    # === Восстановление ===
+
+    @staticmethod
+    def restore(path_prefix: str = "autosave", echo: bool = False):
+        """Загрузить последний снимок и воспроизвести журнал после него"""
+        engine = SaveFormat.load_game(path_prefix + ".sav", echo=echo)
+        journal_path = path_prefix + ".journal"
+        if not os.path.exists(journal_path):
+            return engine
+        with open(journal_path, "rb") as f:
+            data = f.read()
+        if len(data) < JOURNAL_HEADER.size:
+            return engine
+        magic, version, snapshot_turn = JOURNAL_HEADER.unpack_from(data)
+        if magic != JOURNAL_MAGIC or version != JOURNAL_VERSION:
+            raise SaveFormat.SaveFormatError("Файл журнала поврежден или неизвестной версии")
+        if snapshot_turn != engine.turn_count:
+            return engine  # журнал относится к более старому снимку
+        _replay(engine, memoryview(data)[JOURNAL_HEADER.size:])
+        return engine
+
+
+def _replay(engine, data: memoryview):
+    field = engine.game_field
+    unit_classes = list(UnitFactory.UNIT_TYPES.values())
+    offset = 0
+    end = len(data)
+    while offset < end:
+        opcode = data[offset]
+        size = RECORD_SIZES.get(opcode)
+        if size is None:
+            raise SaveFormat.SaveFormatError(f"Неизвестная запись журнала: {opcode}")
+        offset += 1
+        if offset + size > end:
+            break  # недописанная последняя запись
+        record = data[offset:offset + size]
+        offset += size
+
+        if opcode == OP_UNIT_MOVED:
+            unit_id, x, y = UNIT_MOVED.unpack(record)
+            field._relocate_unit(field.get_unit_by_id(unit_id), x, y)
+        elif opcode == OP_UNIT_CHANGED:
+            unit_id, health, armor, attack, flags = UNIT_CHANGED.unpack(record)
+            unit = field.get_unit_by_id(unit_id)
+            unit.health, unit.armor, unit.attack = health, armor, attack
+            if isinstance(unit, Crossbowman):
+                unit.bolt_loaded = bool(flags & SaveFormat.FLAG_BOLT_LOADED)
+        elif opcode == OP_UNIT_ADDED:
+            (unit_id, type_code, x, y, health, max_health, armor, attack, move_range,
+             attack_range, owner_index, flags) = UNIT_ADDED.unpack(record)
+            unit = unit_classes[type_code]()
+            unit.id = unit_id
+            unit.x, unit.y = x, y
+            unit.health, unit.max_health = health, max_health
+            unit.armor, unit.attack, unit.move_range = armor, attack, move_range
+            if isinstance(unit, Archer):
+                unit.attack_range = attack_range
+            if isinstance(unit, Crossbowman):
+                unit.bolt_loaded = bool(flags & SaveFormat.FLAG_BOLT_LOADED)
+            field._restore_unit(unit, field.bases[owner_index] if owner_index >= 0 else None)
+            field.unit_id_counter = max(field.unit_id_counter, unit_id + 1)
+        elif opcode == OP_UNIT_REMOVED:
+            (unit_id,) = UNIT_REMOVED.unpack(record)
+            field._detach_unit(field.get_unit_by_id(unit_id))
+        elif opcode == OP_ENTITY_REMOVED:
+            x, y = ENTITY_REMOVED.unpack(record)
+            field._take_entity(field.get_entity_at(x, y))
+        elif opcode == OP_OBJECT_ADDED:
+            type_code, x, y = OBJECT_ADDED.unpack(record)
+            field._place_entity(SaveFormat.OBJECT_TYPES[type_code](), x, y)
+        elif opcode == OP_BASE_ADDED:
+            x, y, health, max_health, max_units, resources, name_size = BASE_ADDED.unpack(record)
+            name = bytes(data[offset:offset + name_size]).decode("utf-8")
+            offset += name_size
+            base = Base(name, max_units)
+            base.health, base.max_health, base.resources = health, max_health, resources
+            field._place_entity(base, x, y)
+        elif opcode == OP_BASE_CHANGED:
+            index, health, resources = BASE_CHANGED.unpack(record)
+            base = field.bases[index]
+            base.health, base.resources = health, resources
+        elif opcode == OP_TERRAIN_CHANGED:
+            x, y, code = TERRAIN_CHANGED.unpack(record)
+            field._set_terrain_code(x, y, code)
+        elif opcode == OP_EFFECT_ADDED:
+            effect_id, unit_id, stat_code, amount, expires_turn = EFFECT_ADDED.unpack(record)
+            field._add_effect(TimedEffect(effect_id, field.get_unit_by_id(unit_id),
+                                          STAT_FIELDS[stat_code], amount, expires_turn))
+        elif opcode == OP_EFFECT_REMOVED:
+            (effect_id,) = EFFECT_REMOVED.unpack(record)
+            effect = field.effects.get(effect_id)
+            if effect is not None:  # эффекты юнитов вне поля снимок не хранит
+                field._remove_effect(effect)
+        elif opcode == OP_TURN_END:
+            (turn,) = TURN_END.unpack(record)
+            for base in field.bases:
+                # то же, что Base.update_units, но без сообщений
+                base.owned_units = UnitRoster(unit for unit in base.owned_units if unit.is_alive())
+            engine.turn_count = turn
+            # истекшие эффекты уже сняты записями журнала
+            field.effects.turn = turn
+            engine.is_running = not field.bases or any(base.is_alive() for base in field.bases)
+    # юниты, возвращенные отменой действия, в живой игре стоят на своем месте по id
+    field._sort_units()
@@ -1,87 +1,191 @@
-from abc import ABC, abstractmethod
-from enum import Enum
-from Units import *
-
-class TerrainType(Enum):
-    PLAIN = "равнина"
-    FOREST = "лес"
-    MOUNTAIN = "горы"
-    SWAMP = "болото"
-
-class Landscape(ABC):
-    """Абстрактный базовый класс для ландшафта"""
-    
-    def __init__(self, terrain_type: TerrainType, move_cost: int, attack_modifier: float = 1.0):
-        self.terrain_type = terrain_type
-        self.move_cost = move_cost  # стоимость перемещения
-        self.attack_modifier = attack_modifier  # модификатор атаки
-        
-    @abstractmethod
-    def can_pass(self, unit: 'Unit') -> bool:
-        """Может ли юнит пройти через этот ландшафт"""
-        pass
-    
-    def get_attack_bonus(self, unit: 'Unit') -> float:
-        """Бонус/штраф к атаке для юнита"""
-        return self.attack_modifier
-    
-    def __str__(self):
-        return f"{self.terrain_type.value}"
-
-class Plain(Landscape):
-    """Равнина - легкопроходимая местность"""
-    
-    def __init__(self):
-        super().__init__(TerrainType.PLAIN, move_cost=1, attack_modifier=1.0)
-    
-    def can_pass(self, unit: 'Unit') -> bool:
-        return True
-
-class Forest(Landscape):
-    """Лес - укрытие для лучников, сложен для кавалерии"""
-    
-    def __init__(self):
-        super().__init__(TerrainType.FOREST, move_cost=2, attack_modifier=1.2)
-    
-    def can_pass(self, unit: 'Unit') -> bool:
-        # Кавалерия с трудом проходит через лес
-        from Units import Cavalry
-        if isinstance(unit, Cavalry):
-            return unit.move_range >= 2  # только кавалерия с высокой подвижностью
-        return True
-        
-    
-    def get_attack_bonus(self, unit: 'Unit') -> float:
-        from Units import Archer
-        if isinstance(unit, Archer):
-            return 1.3  # лучники получают бонус в лесу
-        return 1.0
-
-class Mountain(Landscape):
-    """Горы - отличная позиция, но сложны для перемещения"""
-    
-    def __init__(self):
-        super().__init__(TerrainType.MOUNTAIN, move_cost=3, attack_modifier=1.5)
-    
-    def can_pass(self, unit: 'Unit') -> bool:
-        from Units import Cavalry
-        # Кавалерия не может проходить через горы
-        return not isinstance(unit, Cavalry)
-    
-    def get_attack_bonus(self, unit: 'Unit') -> float:
-        from Units import Archer
-        if isinstance(unit, Archer):
-            return 1.5  # лучники получают большой бонус в горах
-        return 1.2
-
-class Swamp(Landscape):
-    """Болото - замедляет всех, кроме некоторых типов"""
-    
-    def __init__(self):
-        super().__init__(TerrainType.SWAMP, move_cost=4, attack_modifier=0.8)
-    
-    def can_pass(self, unit: 'Unit') -> bool:
-        return True  # все могут пройти, но медленно
-    
-    def get_attack_bonus(self, unit: 'Unit') -> float:
-        return 0.8  # штраф к атаке в болоте
\ No newline at end of file
+from abc import ABC, abstractmethod
+from enum import Enum
+from typing import NamedTuple, Tuple
+from Units import Unit, Archer, Cavalry, UnitFactory
+
+class TerrainType(Enum):
+    PLAIN = "равнина"
+    FOREST = "лес"
+    MOUNTAIN = "горы"
+    SWAMP = "болото"
+
+# Коды ландшафта для компактного хранения карты (один байт на клетку)
+TERRAIN_CODES = {
+    TerrainType.PLAIN: 0,
+    TerrainType.FOREST: 1,
+    TerrainType.MOUNTAIN: 2,
+    TerrainType.SWAMP: 3,
+}
+
+class Landscape(ABC):
+    """Абстрактный базовый класс для ландшафта.
+
+    Правила прохода и бонусы атаки описываются в подклассах методами
+    rule_can_pass/rule_attack_bonus, но вызываются только при компиляции
+    таблицы TERRAIN_RULES. Публичные can_pass/get_attack_bonus/get_move_cost
+    читают готовую строку таблицы за O(1).
+    """
+    
+    def __init__(self, terrain_type: TerrainType, move_cost: int, attack_modifier: float = 1.0,
+                 blocks_sight: bool = False):
+        self.terrain_type = terrain_type
+        self.code = TERRAIN_CODES[terrain_type]
+        self.move_cost = move_cost  # стоимость перемещения
+        self.attack_modifier = attack_modifier  # модификатор атаки
+        self.blocks_sight = blocks_sight  # закрывает линию видимости для выстрелов
+        
+    @abstractmethod
+    def rule_can_pass(self, unit: 'Unit') -> bool:
+        """Правило: может ли юнит пройти через этот ландшафт"""
+        pass
+    
+    def rule_attack_bonus(self, unit: 'Unit') -> float:
+        """Правило: бонус/штраф к атаке для юнита"""
+        return self.attack_modifier
+    
+    def rule_move_cost(self, unit: 'Unit') -> int:
+        """Правило: стоимость входа юнита на клетку"""
+        return self.move_cost
+    
+    def can_pass(self, unit: 'Unit') -> bool:
+        """Может ли юнит пройти через этот ландшафт"""
+        return TERRAIN_RULES.row(unit)[self.code].passable
+    
+    def get_attack_bonus(self, unit: 'Unit') -> float:
+        """Бонус/штраф к атаке для юнита"""
+        return TERRAIN_RULES.row(unit)[self.code].attack_modifier
+    
+    def get_move_cost(self, unit: 'Unit') -> int:
+        """Стоимость входа юнита на клетку"""
+        return TERRAIN_RULES.row(unit)[self.code].move_cost
+    
+    def __str__(self):
+        return f"{self.terrain_type.value}"
+
+class Plain(Landscape):
+    """Равнина - легкопроходимая местность"""
+    
+    def __init__(self):
+        super().__init__(TerrainType.PLAIN, move_cost=1, attack_modifier=1.0)
+    
+    def rule_can_pass(self, unit: 'Unit') -> bool:
+        return True
+
+class Forest(Landscape):
+    """Лес - укрытие для лучников, сложен для кавалерии"""
+    
+    def __init__(self):
+        super().__init__(TerrainType.FOREST, move_cost=2, attack_modifier=1.2)
+    
+    def rule_can_pass(self, unit: 'Unit') -> bool:
+        # Кавалерия с трудом проходит через лес
+        if isinstance(unit, Cavalry):
+            return unit.move_range >= 2  # только кавалерия с высокой подвижностью
+        return True
+        
+    
+    def rule_attack_bonus(self, unit: 'Unit') -> float:
+        if isinstance(unit, Archer):
+            return 1.3  # лучники получают бонус в лесу
+        return 1.0
+
+class Mountain(Landscape):
+    """Горы - отличная позиция, но сложны для перемещения"""
+    
+    def __init__(self):
+        super().__init__(TerrainType.MOUNTAIN, move_cost=3, attack_modifier=1.5, blocks_sight=True)
+    
+    def rule_can_pass(self, unit: 'Unit') -> bool:
+        # Кавалерия не может проходить через горы
+        return not isinstance(unit, Cavalry)
+    
+    def rule_attack_bonus(self, unit: 'Unit') -> float:
+        if isinstance(unit, Archer):
+            return 1.5  # лучники получают большой бонус в горах
+        return 1.2
+
+class Swamp(Landscape):
+    """Болото - замедляет всех, кроме некоторых типов"""
+    
+    def __init__(self):
+        super().__init__(TerrainType.SWAMP, move_cost=4, attack_modifier=0.8)
+    
+    def rule_can_pass(self, unit: 'Unit') -> bool:
+        return True  # все могут пройти, но медленно
+    
+    def rule_attack_bonus(self, unit: 'Unit') -> float:
+        return 0.8  # штраф к атаке в болоте
+
+
+# Общие экземпляры ландшафта (flyweight): карта хранит только коды,
+# а по коду всегда возвращается один и тот же объект
+TERRAINS = (Plain(), Forest(), Mountain(), Swamp())
+
+
+# Коды ландшафта, закрывающего обзор: SIGHT_BLOCKERS[code] == 1
+SIGHT_BLOCKERS = bytes(int(terrain.blocks_sight) for terrain in TERRAINS)
+
+
+def terrain_by_code(code: int) -> Landscape:
+    """Получить общий экземпляр ландшафта по его коду"""
+    return TERRAINS[code]
+
+
+class TerrainRule(NamedTuple):
+    """Скомпилированное правило для пары (класс юнита, тип ландшафта)"""
+    passable: bool
+    move_cost: int
+    attack_modifier: float
+
+
+class TerrainRuleTable:
+    """Плотная таблица правил: класс юнита -> кортеж правил по кодам ландшафта.
+
+    Строка для класса строится один раз по экземпляру-прототипу, поэтому
+    правила, зависящие от атрибутов (например move_range кавалерии),
+    берутся из значений класса по умолчанию. Классы, которых нет в
+    таблице (зарегистрированные в UnitFactory позже или созданные
+    напрямую), компилируются при первом обращении.
+    """
+
+    def __init__(self, terrains: Tuple[Landscape, ...]):
+        self._terrains = terrains
+        self._rows = {}
+
+    def compile(self, unit_classes):
+        """Скомпилировать строки для набора классов юнитов"""
+        for unit_class in unit_classes:
+            self.row_for_class(unit_class)
+
+    def row(self, unit: 'Unit') -> Tuple[TerrainRule, ...]:
+        """Строка правил для юнита, индекс - код ландшафта"""
+        try:
+            return self._rows[type(unit)]
+        except KeyError:
+            row = self._rows[type(unit)] = self._build_row(unit)
+            return row
+
+    def row_for_class(self, unit_class) -> Tuple[TerrainRule, ...]:
+        """Строка правил для класса юнита с конструктором без аргументов"""
+        try:
+            return self._rows[unit_class]
+        except KeyError:
+            row = self._rows[unit_class] = self._build_row(unit_class())
+            return row
+
+    def rule(self, unit: 'Unit', code: int) -> TerrainRule:
+        return self.row(unit)[code]
+
+    def _build_row(self, prototype: 'Unit') -> Tuple[TerrainRule, ...]:
+        return tuple(
+            TerrainRule(
+                bool(terrain.rule_can_pass(prototype)),
+                terrain.rule_move_cost(prototype),
+                terrain.rule_attack_bonus(prototype),
+            )
+            for terrain in self._terrains
+        )
+
+
+TERRAIN_RULES = TerrainRuleTable(TERRAINS)
+TERRAIN_RULES.compile(UnitFactory.UNIT_TYPES.values())
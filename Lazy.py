@@ -0,0 +1,35 @@
+"""Отложенная загрузка необязательных модулей.
+
+NumPy нужен только для больших пакетов (урон сотен атак, генерация
+больших карт, запросы по UnitStore), поэтому модули игры не импортируют
+его при загрузке, а спрашивают при первой такой операции:
+
+    np = numpy()
+    if np is not None:
+        ...
+
+Короткие запуски (--help, рабочие процессы симулятора, сервер) не
+платят за импорт NumPy, если до больших пакетов дело не дошло.
+"""
+import importlib
+from typing import Dict, Optional
+
+_MISSING = object()
+_modules: Dict[str, object] = {}
+
+
+def optional_module(name: str) -> Optional[object]:
+    """Модуль name или None, если он не установлен; импорт - при первом вызове"""
+    module = _modules.get(name, _MISSING)
+    if module is _MISSING:
+        try:
+            module = importlib.import_module(name)
+        except ImportError:
+            module = None
+        _modules[name] = module
+    return module
+
+
+def numpy():
+    """NumPy или None"""
+    return optional_module("numpy")
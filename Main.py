@@ -1,9 +1,41 @@
-# main.py
-from Game import Game
-
-if __name__ == "__main__":
-    game = Game()
-    game.start()
-    
-
-    
+# main.py
+"""Точка входа консольной игры.
+
+Модули игры импортируются только после разбора аргументов и только для
+выбранного действия: --help и ошибки в аргументах не загружают поле,
+юнитов и меню, а файл конфигурации читается при первом обращении к ней.
+"""
+import argparse
+import sys
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Консольная стратегическая игра")
+    parser.add_argument("--config", default="game_config.json",
+                        help="файл конфигурации (по умолчанию game_config.json)")
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="ПАРАМЕТР=ЗНАЧЕНИЕ",
+                        help="переопределить параметр конфигурации, например --set difficulty=hard")
+    parser.add_argument("--watch-config", action="store_true",
+                        help="применять изменения файла конфигурации без перезапуска")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    from GameConfig import GameConfig, ConfigValidator, parse_overrides
+    try:
+        overrides = parse_overrides(args.overrides)
+        # переопределения проверяются сразу, без чтения файла конфигурации
+        ConfigValidator.for_class(GameConfig).validate_text(overrides)
+    except ValueError as e:
+        print(f"❌ Ошибка конфигурации: {e}")
+        return 2
+
+    from Game import Game
+    game = Game(watch_config=args.watch_config, config_file=args.config, overrides=overrides)
+    game.start()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""Замеры ключевых операций игры.
+
+Profiler подменяет методы из TARGETS на обертки только на время включения:
+пока замеры выключены, классы содержат исходные методы и игра не платит
+за профилирование ничего. Для каждой операции считаются:
+
+    calls       число вызовов
+    total       суммарное время вызовов (с вложенными операциями)
+    own         собственное время без вложенных замеряемых операций
+    max         самый долгий вызов
+    allocated   прирост памяти Python за вызовы (tracemalloc, если включен
+                учет памяти)
+
+Отчет выгружается в JSON или в формате pstats:
+
+    profiler.export_pstats("game.prof")
+    python -m pstats game.prof
+"""
+import functools
+import importlib
+import inspect
+import json
+import marshal
+import time
+import tracemalloc
+from typing import Dict, List, Tuple
+
+# модуль, класс и метод замеряемых операций
+TARGETS: Tuple[Tuple[str, str, str], ...] = (
+    ("GameField", "GameField", "move_unit"),
+    ("GameField", "GameField", "move_group"),
+    ("GameField", "GameField", "attack_unit"),
+    ("GameField", "GameField", "display"),
+    ("GameField", "GameField", "add_unit"),
+    ("Base", "Base", "create_unit"),
+    ("Game", "Game", "next_turn"),
+    ("TerrainGenerator", "TerrainGenerator", "generate"),
+    ("TerrainGenerator", "TerrainGenerator", "chunk"),
+)
+
+
+class OperationStats:
+    """Счетчики одной операции"""
+    __slots__ = ("name", "code", "calls", "total", "own", "max", "allocated", "callers")
+
+    def __init__(self, name: str, code: Tuple[str, int, str]):
+        self.name = name
+        # (файл, строка, имя) - ключ функции в формате pstats
+        self.code = code
+        self.calls = 0
+        self.total = 0.0
+        self.own = 0.0
+        self.max = 0.0
+        self.allocated = 0
+        # имя вызывающей замеряемой операции -> число вызовов
+        self.callers: Dict[str, int] = {}
+
+    def to_dict(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "total_ms": round(self.total * 1000, 3),
+            "own_ms": round(self.own * 1000, 3),
+            "mean_ms": round(self.total * 1000 / self.calls, 4) if self.calls else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+            "allocated_bytes": self.allocated,
+            "callers": dict(self.callers),
+        }
+
+
+class Profiler:
+    """Включаемые во время игры замеры операций из TARGETS"""
+
+    def __init__(self, targets=TARGETS, track_memory: bool = False):
+        self.targets = targets
+        self.track_memory = track_memory
+        self.stats: Dict[str, OperationStats] = {}
+        # (класс, метод, исходная функция) подмененных методов
+        self._patched: List[Tuple[type, str, object]] = []
+        # стек вызовов замеряемых операций: [имя, время вложенных вызовов]
+        self._stack: List[list] = []
+        self._started_tracemalloc = False
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._patched)
+
+    # === Включение ===
+
+    def enable(self):
+        """Подменить методы обертками; повторное включение ничего не делает"""
+        if self.enabled:
+            return
+        for module_name, class_name, method_name in self.targets:
+            owner = getattr(importlib.import_module(module_name), class_name)
+            original = owner.__dict__[method_name]
+            name = f"{class_name}.{method_name}"
+            stats = self.stats.get(name)
+            if stats is None:
+                code = inspect.unwrap(original).__code__
+                stats = OperationStats(name, (code.co_filename, code.co_firstlineno, name))
+                self.stats[name] = stats
+            setattr(owner, method_name, self._wrap(original, stats))
+            self._patched.append((owner, method_name, original))
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def disable(self):
+        """Вернуть исходные методы; накопленные счетчики сохраняются"""
+        for owner, method_name, original in reversed(self._patched):
+            setattr(owner, method_name, original)
+        self._patched.clear()
+        self._stack.clear()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def reset(self):
+        self.stats.clear()
+        if self.enabled:
+            # обертки держат ссылки на старые счетчики - подменяем заново
+            self.disable()
+            self.enable()
+
+    def _wrap(self, method, stats: OperationStats):
+        stack = self._stack
+        clock = time.perf_counter
+        traced_memory = tracemalloc.get_traced_memory
+        is_tracing = tracemalloc.is_tracing
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            tracing = is_tracing()
+            memory_before = traced_memory()[0] if tracing else 0
+            frame = [stats.name, 0.0]
+            if stack:
+                caller = stack[-1][0]
+                stats.callers[caller] = stats.callers.get(caller, 0) + 1
+            stack.append(frame)
+            started = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = clock() - started
+                stack.pop()
+                if stack:
+                    stack[-1][1] += elapsed
+                stats.calls += 1
+                stats.total += elapsed
+                stats.own += elapsed - frame[1]
+                if elapsed > stats.max:
+                    stats.max = elapsed
+                if tracing:
+                    stats.allocated += traced_memory()[0] - memory_before
+        return wrapper
+
+    # === Отчеты ===
+
+    def report(self) -> List[OperationStats]:
+        """Операции, которые вызывались, по убыванию суммарного времени"""
+        return sorted((s for s in self.stats.values() if s.calls), key=lambda s: s.total, reverse=True)
+
+    def display(self):
+        rows = self.report()
+        state = "включены" if self.enabled else "выключены"
+        memory = "вкл" if self.track_memory else "выкл"
+        print(f"\n⏱️  ПРОИЗВОДИТЕЛЬНОСТЬ (замеры {state}, учет памяти: {memory})")
+        if not rows:
+            print("   Нет данных: включите замеры и сыграйте несколько ходов")
+            return
+        print(f"{'операция':>28} | {'вызовов':>8} | {'всего, мс':>10} | {'своё, мс':>10} | "
+              f"{'среднее, мс':>11} | {'макс, мс':>9} | {'память, КБ':>10}")
+        print("-" * 104)
+        for s in rows:
+            print(f"{s.name:>28} | {s.calls:>8} | {s.total * 1000:>10.2f} | {s.own * 1000:>10.2f} | "
+                  f"{s.total * 1000 / s.calls:>11.4f} | {s.max * 1000:>9.3f} | {s.allocated / 1024:>10.1f}")
+
+    def to_dict(self) -> Dict:
+        return {s.name: s.to_dict() for s in self.report()}
+
+    def export_json(self, filename: str):
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=4)
+
+    def export_pstats(self, filename: str):
+        """Сохранить счетчики в формате cProfile, читаемом pstats.Stats(filename)"""
+        codes = {s.name: s.code for s in self.stats.values()}
+        stats = {}
+        for s in self.report():
+            callers = {codes[name]: calls for name, calls in s.callers.items()}
+            stats[s.code] = (s.calls, s.calls, s.own, s.total, callers)
+        with open(filename, "wb") as f:
+            marshal.dump(stats, f)
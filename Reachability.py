@@ -0,0 +1,156 @@
+import heapq
+from typing import Dict, List, Optional, Tuple
+from Units import Unit
+from CostFields import COST_MASK, STOP
+
+Cell = Tuple[int, int]
+
+# Размер корзины пространственного индекса кэшированных карт достижимости
+BUCKET_SIZE = 8
+
+
+class ReachMap:
+    """Карта достижимости юнита: стоимость и предыдущая клетка пути для
+    каждой клетки, куда юнит может переместиться за один ход"""
+
+    __slots__ = ("origin", "budget", "costs", "previous", "buckets")
+
+    def __init__(self, origin: Cell, budget: int):
+        self.origin = origin
+        self.budget = budget
+        self.costs: Dict[Cell, int] = {}
+        self.previous: Dict[Cell, Cell] = {}
+        self.buckets: Tuple[Cell, ...] = ()
+
+    def __contains__(self, cell: Cell) -> bool:
+        return cell in self.costs and cell != self.origin
+
+    def __len__(self) -> int:
+        return len(self.costs) - 1
+
+    def cells(self) -> List[Cell]:
+        """Все достижимые клетки, кроме исходной"""
+        return [cell for cell in self.costs if cell != self.origin]
+
+    def cost_to(self, x: int, y: int) -> Optional[int]:
+        return self.costs.get((x, y))
+
+    def path_to(self, x: int, y: int) -> Optional[List[Cell]]:
+        """Путь от исходной клетки до (x, y) включительно, или None"""
+        cell = (x, y)
+        if cell not in self.costs:
+            return None
+        path = [cell]
+        while cell != self.origin:
+            cell = self.previous[cell]
+            path.append(cell)
+        path.reverse()
+        return path
+
+
+class ReachabilityEngine:
+    """Поиск клеток, достижимых юнитом за ход (ограниченный алгоритм Дейкстры).
+
+    Стоимость входа на клетку берется из поля стоимости класса юнита
+    (CostFields): клетки с юнитами и базами непроходимы, клетка с
+    нейтральным объектом может быть целью хода, но путь через нее не
+    продолжается. Результаты
+    кэшируются для каждого юнита и сбрасываются, только когда меняется
+    клетка в пределах радиуса его перемещения.
+    """
+
+    def __init__(self, game_field):
+        self.game_field = game_field
+        self._cache: Dict[int, ReachMap] = {}
+        self._buckets: Dict[Cell, Dict[int, ReachMap]] = {}
+
+    def reach(self, unit: Unit) -> ReachMap:
+        """Карта достижимости юнита из его текущей позиции"""
+        key = id(unit)
+        cached = self._cache.get(key)
+        origin = (unit.x, unit.y)
+        if cached is not None:
+            if cached.origin == origin and cached.budget == unit.move_range:
+                return cached
+            self._drop(key, cached)
+
+        reach_map = self._search(unit, origin, unit.move_range)
+        self._store(key, reach_map)
+        return reach_map
+
+    def invalidate_cell(self, x: int, y: int):
+        """Сбросить карты, в радиус которых попадает изменившаяся клетка"""
+        bucket = self._buckets.get((x // BUCKET_SIZE, y // BUCKET_SIZE))
+        if not bucket:
+            return
+        for key, reach_map in list(bucket.items()):
+            origin_x, origin_y = reach_map.origin
+            if abs(x - origin_x) + abs(y - origin_y) <= reach_map.budget:
+                self._drop(key, reach_map)
+
+    def forget(self, unit: Unit):
+        """Удалить кэш юнита (например, после его гибели)"""
+        reach_map = self._cache.get(id(unit))
+        if reach_map is not None:
+            self._drop(id(unit), reach_map)
+
+    def clear(self):
+        self._cache.clear()
+        self._buckets.clear()
+
+    def _search(self, unit: Unit, origin: Cell, budget: int) -> ReachMap:
+        field = self.game_field
+        width, height = field.width, field.height
+        field_costs = field.cost_fields.costs_for(unit)
+
+        reach_map = ReachMap(origin, budget)
+        costs = reach_map.costs
+        previous = reach_map.previous
+        costs[origin] = 0
+        heap = [(0, origin)]
+
+        while heap:
+            cost, cell = heapq.heappop(heap)
+            if cost > costs[cell]:
+                continue
+            x, y = cell
+            if cell != origin and field_costs[y * width + x] & STOP:
+                # нейтральный объект: можно зайти, но не пройти насквозь
+                continue
+            for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if not (0 <= nx < width and 0 <= ny < height):
+                    continue
+                entry = field_costs[ny * width + nx]
+                if not entry:
+                    continue
+                new_cost = cost + (entry & COST_MASK)
+                if new_cost > budget:
+                    continue
+                neighbour = (nx, ny)
+                if new_cost < costs.get(neighbour, budget + 1):
+                    costs[neighbour] = new_cost
+                    previous[neighbour] = cell
+                    heapq.heappush(heap, (new_cost, neighbour))
+        return reach_map
+
+    def _store(self, key: int, reach_map: ReachMap):
+        origin_x, origin_y = reach_map.origin
+        radius = reach_map.budget
+        buckets = tuple(
+            (bx, by)
+            for by in range((origin_y - radius) // BUCKET_SIZE, (origin_y + radius) // BUCKET_SIZE + 1)
+            for bx in range((origin_x - radius) // BUCKET_SIZE, (origin_x + radius) // BUCKET_SIZE + 1)
+        )
+        reach_map.buckets = buckets
+        self._cache[key] = reach_map
+        for bucket in buckets:
+            self._buckets.setdefault(bucket, {})[key] = reach_map
+
+    def _drop(self, key: int, reach_map: ReachMap):
+        self._cache.pop(key, None)
+        for bucket in reach_map.buckets:
+            entries = self._buckets.get(bucket)
+            if entries is not None:
+                entries.pop(key, None)
+                if not entries:
+                    del self._buckets[bucket]
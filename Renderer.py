@@ -0,0 +1,544 @@
+"""Отрисовка игрового поля в консоль с кэшем символов клеток.
+
+FieldRenderer хранит символ каждой клетки и готовые строки карты (буфер
+строится при первом полном кадре). GameField сообщает ему об изменившихся
+клетках (через _cell_changed), и перед выводом пересчитываются только они
+и их строки. Кадр целиком выводится одним вызовом write.
+
+В режиме разностей (render_diff) рендерер сам владеет экраном
+терминала: первый кадр рисуется с очисткой экрана, а следующие
+передают только изменившиеся клетки ANSI-перемещениями курсора, так что
+стоимость перерисовки пропорциональна числу изменений.
+
+Для больших карт есть окно просмотра (Viewport) - часть карты вокруг
+юнита или базы с прокруткой - и миникарта (Minimap), где один символ
+обозначает блок клеток. Их вывод зависит от размера терминала, а не
+карты: окно читает ландшафт и занятые клетки только внутри себя, а
+миникарта считает ландшафт блока при первом выводе по выборке клеток
+(на чанковой карте - по уже сгенерированным чанкам) и не просматривает
+карту целиком.
+"""
+import math
+import os
+import shutil
+import sys
+from typing import Dict, List, Optional
+from Units import Unit, Infantry, Archer, Cavalry, Healer, Ballista
+from Base import Base
+from NeutralObject import NeutralObject
+
+TERRAIN_GLYPHS = tuple(f" {symbol} " for symbol in (" ", "♣", "▲", "~"))
+BASE_GLYPH = "[🏰]"
+
+LEGEND = ("\n📋 ЛЕГЕНДА:\n"
+          "I-пехота A-лучники C-кавалерия H-лекарь 🏰-база ⚱-фонтан K-кузнец T-ловушка S-сундук\n"
+          "♣-лес ▲-горы ~-болото  -равнина\n")
+
+# Наибольшая карта, для которой строится буфер полного кадра; больше -
+# только окно просмотра и миникарта (чанковая карта - всегда только они)
+FULL_FRAME_MAX_CELLS = 1_000_000
+
+# Строки кадра до карты: пустая, заголовок, счетчики, номера столбцов
+HEADER_LINES = 4
+COUNTS_LINE = 2
+LEGEND_LINES = LEGEND.count("\n")
+
+# Миникарта: преобладающий ландшафт блока, юниты и базы в блоке
+MINIMAP_TERRAIN = (".", "♣", "▲", "~")
+MINIMAP_UNIT = "*"
+MINIMAP_BASE = "@"
+# Блок чанковой карты, ни один чанк которого еще не генерировался
+MINIMAP_UNEXPLORED = " "
+# Не больше MINIMAP_SAMPLES x MINIMAP_SAMPLES клеток на блок при подсчете ландшафта
+MINIMAP_SAMPLES = 16
+
+# Что стоит в клетке (для счетчиков миникарты)
+KIND_EMPTY = 0
+KIND_UNIT = 1
+KIND_BASE = 2
+KIND_OBJECT = 3
+
+# Символы классов юнитов вычисляются один раз на класс
+_unit_glyphs: Dict[type, str] = {}
+
+
+def unit_glyph(unit: Unit) -> str:
+    glyph = _unit_glyphs.get(type(unit))
+    if glyph is None:
+        if isinstance(unit, Infantry):
+            symbol = "I"
+        elif isinstance(unit, Ballista):
+            symbol = "B"
+        elif isinstance(unit, Archer):
+            symbol = "A"
+        elif isinstance(unit, Cavalry):
+            symbol = "C"
+        elif isinstance(unit, Healer):
+            symbol = "H"
+        else:
+            symbol = "U"
+        glyph = _unit_glyphs[type(unit)] = f"[{symbol}]"
+    return glyph
+
+
+def entity_kind(entity) -> int:
+    if entity is None:
+        return KIND_EMPTY
+    if isinstance(entity, Unit):
+        return KIND_UNIT
+    if isinstance(entity, Base):
+        return KIND_BASE
+    return KIND_OBJECT
+
+
+def supports_ansi(stream) -> bool:
+    """Понимает ли поток вывода ANSI-последовательности управления курсором"""
+    if not hasattr(stream, "isatty") or not stream.isatty():
+        return False
+    if os.environ.get("TERM") == "dumb":
+        return False
+    return os.name != "nt" or "WT_SESSION" in os.environ or "ANSICON" in os.environ
+
+
+class FieldRenderer:
+    """Кэширующий рендерер GameField.
+
+    Буфер символов - плоский список, индекс клетки y * width + x, как у
+    карты ландшафта. Он нужен только полному кадру и строится при первом
+    frame(); окно просмотра и миникарта без него обходятся. Строки карты
+    хранятся готовыми и собираются заново только для строк с
+    изменившимися клетками. У поля один рендерер: новый рендерер
+    подключается к полю вместо прежнего.
+    """
+
+    def __init__(self, game_field, stream=None):
+        self.game_field = game_field
+        self.stream = stream  # None - текущий sys.stdout
+        self._glyphs: Optional[List[str]] = None  # None - буфер еще не строился
+        self._rows: List[str] = []
+        self._dirty = set()
+        self._stale_rows = set()  # строки, которые нужно собрать перед полным кадром
+        self._wide_rows: Dict[int, int] = {}  # строка -> число широких символов (баз)
+        self.minimap: Optional[Minimap] = None
+        # Клетки, изменившиеся после последнего кадра render_diff:
+        # индекс -> символ, который сейчас на экране
+        self._on_screen: Dict[int, str] = {}
+        self._screen_counts: Optional[str] = None
+        game_field.renderer = self
+
+    def invalidate(self):
+        """Сбросить буфер и миникарту (например, после записи в field.terrain
+        в обход GameField); буфер построится заново при следующем полном кадре"""
+        self._glyphs = None
+        self._rows = []
+        self._wide_rows = {}
+        self._dirty.clear()
+        self._stale_rows.clear()
+        self._on_screen.clear()
+        self._screen_counts = None
+        if self.minimap is not None:
+            self.minimap.rebuild()
+
+    def cell_changed(self, x: int, y: int):
+        # окно просмотра читает поле напрямую: запоминать клетку нужно,
+        # только если есть буфер или миникарта
+        if self._glyphs is not None or self.minimap is not None:
+            self._dirty.add(y * self.game_field.width + x)
+
+    def terrain_changed(self, x: int, y: int):
+        """Ландшафт клетки изменился (символ клетки обновит cell_changed)"""
+        if self.minimap is not None:
+            self.minimap.terrain_changed(x, y)
+
+    def full_frame_allowed(self) -> bool:
+        """Можно ли вывести карту полным кадром (frame, render, render_diff)"""
+        field = self.game_field
+        return (field.width * field.height <= FULL_FRAME_MAX_CELLS
+                and isinstance(field.terrain, (bytes, bytearray)))
+
+    # === Вывод ===
+
+    def render(self):
+        """Вывести кадр целиком одним вызовом write"""
+        stream = self.stream or sys.stdout
+        stream.write(self.frame())
+        stream.flush()
+        # обычный вывод сдвигает экран: следующий render_diff начнет с полного кадра
+        self._on_screen.clear()
+        self._screen_counts = None
+
+    def render_diff(self):
+        """Вывести только клетки, изменившиеся с прошлого кадра render_diff.
+
+        Первый кадр (и любой кадр, если терминал не поддерживает ANSI или
+        карта не помещается на экран) выводится целиком.
+        """
+        stream = self.stream or sys.stdout
+        if not supports_ansi(stream):
+            self.render()
+            return
+        field = self.game_field
+        if (self._screen_counts is None
+                or shutil.get_terminal_size().lines <= field.height + HEADER_LINES + LEGEND_LINES):
+            text = "\x1b[H\x1b[2J" + self.frame()
+            self._on_screen.clear()
+            self._screen_counts = self._counts_line()
+            stream.write(text)
+            stream.flush()
+            return
+
+        self._apply_dirty()
+        changed = self._pending_screen_cells()
+        width = field.width
+        parts = []
+        counts = self._counts_line()
+        if counts != self._screen_counts:
+            parts.append(f"\x1b[{COUNTS_LINE + 1};1H{counts}\x1b[K")
+            self._screen_counts = counts
+        rewritten = set()
+        for index in changed:
+            y, x = divmod(index, width)
+            if y in rewritten:
+                continue
+            if y in self._wide_rows:
+                # широкий символ базы сдвигает столбцы - перерисовываем строку
+                parts.append(f"\x1b[{HEADER_LINES + y + 1};1H{self._row_prefix(y)}{self._row(y)}\x1b[K")
+                rewritten.add(y)
+            else:
+                column = len(self._row_prefix(y)) + 3 * x + 1
+                parts.append(f"\x1b[{HEADER_LINES + y + 1};{column}H{self._glyphs[index]}")
+        parts.append(f"\x1b[{HEADER_LINES + field.height + LEGEND_LINES + 1};1H")
+        stream.write("".join(parts))
+        stream.flush()
+
+    def frame(self) -> str:
+        """Текст кадра: заголовок, карта и легенда"""
+        if self._glyphs is None:
+            self._build_buffer()
+        self._apply_dirty()
+        for y in self._stale_rows:
+            self._rows[y] = self._build_row(y)
+        self._stale_rows.clear()
+        field = self.game_field
+        lines = [
+            f"\n🎮 ИГРОВОЕ ПОЛЕ {field.width}x{field.height}",
+            self._counts_line(),
+            "   " + " ".join(f"{i:2}" for i in range(field.width)),
+        ]
+        lines.extend(self._row_prefix(y) + row for y, row in enumerate(self._rows))
+        return "\n".join(lines) + "\n" + LEGEND
+
+    def viewport_frame(self, viewport: 'Viewport') -> str:
+        """Текст окна просмотра: ландшафт и занятые клетки читаются только внутри окна"""
+        field = self.game_field
+        width = field.width
+        terrain = field.terrain
+        occupants = field.occupants
+        entity_glyph = self._entity_glyph
+        x0, y0 = viewport.x, viewport.y
+        x1 = min(field.width, x0 + viewport.cols)
+        y1 = min(field.height, y0 + viewport.rows)
+        lines = [
+            f"\n🔭 ОКНО ({x0}-{x1 - 1}, {y0}-{y1 - 1}) ПОЛЯ {field.width}x{field.height}",
+            self._counts_line(),
+            "   " + " ".join(f"{i:2}" for i in range(x0, x1)),
+        ]
+        for y in range(y0, y1):
+            row = [TERRAIN_GLYPHS[code] for code in terrain[y * width + x0:y * width + x1]]
+            for x in range(x0, x1):
+                entity = occupants.get((x, y))
+                if entity is not None:
+                    row[x - x0] = entity_glyph(entity)
+            lines.append(self._row_prefix(y) + "".join(row))
+        return "\n".join(lines) + "\n" + LEGEND
+
+    def render_viewport(self, viewport: 'Viewport'):
+        stream = self.stream or sys.stdout
+        stream.write(self.viewport_frame(viewport))
+        stream.flush()
+        self._screen_counts = None
+
+    def get_minimap(self, block: Optional[int] = None) -> 'Minimap':
+        """Миникарта поля; block=None - размер блока по размеру терминала"""
+        if block is None:
+            block = Minimap.block_for_terminal(self.game_field)
+        if self.minimap is None or self.minimap.block != block:
+            self._apply_dirty()
+            self.minimap = Minimap(self.game_field, block)
+        return self.minimap
+
+    def render_minimap(self, block: Optional[int] = None, viewport: Optional['Viewport'] = None):
+        minimap = self.get_minimap(block)
+        self._apply_dirty()
+        stream = self.stream or sys.stdout
+        stream.write(minimap.frame(viewport))
+        stream.flush()
+        self._screen_counts = None
+
+    # === Вспомогательные методы ===
+
+    def _build_buffer(self):
+        """Символы всех клеток и строки карты для полного кадра"""
+        field = self.game_field
+        if not self.full_frame_allowed():
+            raise ValueError(f"Карта {field.width}x{field.height} слишком велика для полного кадра "
+                             f"(не больше {FULL_FRAME_MAX_CELLS} клеток в памяти) - "
+                             "используйте окно просмотра")
+        width = field.width
+        self._glyphs = [TERRAIN_GLYPHS[code] for code in field.terrain]
+        self._wide_rows = {}
+        for (x, y), entity in field.occupants.items():
+            glyph = self._glyphs[y * width + x] = self._entity_glyph(entity)
+            if glyph == BASE_GLYPH:
+                self._wide_rows[y] = self._wide_rows.get(y, 0) + 1
+        self._rows = [self._build_row(y) for y in range(field.height)]
+        self._stale_rows.clear()
+        # буфер уже учитывает все клетки; миникарте их изменения еще нужны
+        if self.minimap is None:
+            self._dirty.clear()
+
+    def _apply_dirty(self):
+        """Пересчитать символы изменившихся клеток и отметить их строки"""
+        if not self._dirty:
+            return
+        field = self.game_field
+        width = field.width
+        occupants = field.occupants
+        terrain = field.terrain
+        glyphs = self._glyphs
+        on_screen = self._on_screen
+        rows = self._stale_rows
+        minimap = self.minimap
+        for index in self._dirty:
+            y, x = divmod(index, width)
+            entity = occupants.get((x, y))
+            if minimap is not None:
+                minimap.cell_changed(index, entity)
+            if glyphs is None:
+                continue
+            glyph = self._entity_glyph(entity) if entity is not None else TERRAIN_GLYPHS[terrain[index]]
+            old = glyphs[index]
+            if glyph != old:
+                on_screen.setdefault(index, old)
+                glyphs[index] = glyph
+                rows.add(y)
+                if old == BASE_GLYPH or glyph == BASE_GLYPH:
+                    self._count_wide(y, 1 if glyph == BASE_GLYPH else -1)
+        self._dirty.clear()
+
+    def _pending_screen_cells(self) -> List[int]:
+        """Клетки, чей символ на экране отличается от текущего"""
+        glyphs = self._glyphs
+        changed = sorted(index for index, shown in self._on_screen.items() if glyphs[index] != shown)
+        self._on_screen.clear()
+        return changed
+
+    def _count_wide(self, y: int, delta: int):
+        count = self._wide_rows.get(y, 0) + delta
+        if count > 0:
+            self._wide_rows[y] = count
+        else:
+            self._wide_rows.pop(y, None)
+
+    def _row(self, y: int) -> str:
+        if y in self._stale_rows:
+            self._rows[y] = self._build_row(y)
+            self._stale_rows.discard(y)
+        return self._rows[y]
+
+    def _build_row(self, y: int) -> str:
+        width = self.game_field.width
+        return "".join(self._glyphs[y * width:(y + 1) * width])
+
+    def _counts_line(self) -> str:
+        field = self.game_field
+        return (f"   Юнитов: {field.unit_count}/{field.max_units}, Баз: {len(field.bases)}, "
+                f"Объектов: {len(field.neutral_objects)}")
+
+    @staticmethod
+    def _row_prefix(y: int) -> str:
+        return f"{y:2} "
+
+    @staticmethod
+    def _entity_glyph(entity) -> str:
+        if isinstance(entity, Unit):
+            return unit_glyph(entity)
+        if isinstance(entity, Base):
+            return BASE_GLYPH
+        if isinstance(entity, NeutralObject):
+            return f"[{entity.symbol}]"
+        return "[?]"
+
+
+class Viewport:
+    """Окно просмотра: левый верхний угол и размер в клетках"""
+
+    def __init__(self, game_field, cols: int, rows: int):
+        if cols <= 0 or rows <= 0:
+            raise ValueError("Размер окна должен быть положительным")
+        self.game_field = game_field
+        self.cols = min(cols, game_field.width)
+        self.rows = min(rows, game_field.height)
+        self.x = 0
+        self.y = 0
+
+    @classmethod
+    def for_terminal(cls, game_field) -> 'Viewport':
+        """Окно, которое помещается в текущий терминал вместе с заголовком и легендой"""
+        size = shutil.get_terminal_size()
+        cols = max(1, (size.columns - 4) // 3)
+        rows = max(1, size.lines - HEADER_LINES - LEGEND_LINES - 2)
+        return cls(game_field, cols, rows)
+
+    def center_on(self, x: int, y: int):
+        self.x = x - self.cols // 2
+        self.y = y - self.rows // 2
+        self._clamp()
+
+    def pan(self, dx: int, dy: int):
+        self.x += dx
+        self.y += dy
+        self._clamp()
+
+    def contains(self, x: int, y: int) -> bool:
+        return self.x <= x < self.x + self.cols and self.y <= y < self.y + self.rows
+
+    def _clamp(self):
+        self.x = max(0, min(self.x, self.game_field.width - self.cols))
+        self.y = max(0, min(self.y, self.game_field.height - self.rows))
+
+
+class Minimap:
+    """Миникарта: один символ на блок block x block клеток.
+
+    Для каждого блока хранится преобладающий ландшафт и число юнитов и
+    баз. Счетчики строятся по занятым клеткам поля (O(число объектов)) и
+    обновляются FieldRenderer при изменении клеток. Ландшафт блока
+    считается при первом выводе блока: на обычной карте - по сетке не
+    больше MINIMAP_SAMPLES x MINIMAP_SAMPLES клеток, на чанковой - по
+    преобладающему ландшафту уже сгенерированных чанков блока (чанки ради
+    миникарты не генерируются, неразведанный блок пуст). Смена ландшафта
+    сбрасывает только блок с клеткой, поэтому вывод миникарты стоит
+    O(число блоков) и от размера карты не зависит.
+    """
+
+    def __init__(self, game_field, block: int):
+        if block <= 0:
+            raise ValueError("Размер блока должен быть положительным")
+        self.game_field = game_field
+        self.block = block
+        self.cols = math.ceil(game_field.width / block)
+        self.rows = math.ceil(game_field.height / block)
+        self._kinds: Dict[int, int] = {}  # индекс занятой клетки -> KIND_*
+        self._units: List[int] = []
+        self._bases: List[int] = []
+        self._terrain: List[Optional[str]] = []  # None - блок еще не считался
+        self.rebuild()
+
+    @staticmethod
+    def block_for_terminal(game_field) -> int:
+        """Наименьший блок, при котором миникарта помещается в терминал"""
+        size = shutil.get_terminal_size()
+        cols = max(1, size.columns - 4)
+        rows = max(1, size.lines - 4)
+        return max(1, math.ceil(game_field.width / cols), math.ceil(game_field.height / rows))
+
+    def rebuild(self):
+        """Сбросить ландшафт блоков и пересчитать юнитов и базы по занятым клеткам"""
+        field = self.game_field
+        width = field.width
+        blocks = self.cols * self.rows
+        self._terrain = [None] * blocks
+        self._kinds = {}
+        self._units = [0] * blocks
+        self._bases = [0] * blocks
+        for (x, y), entity in field.occupants.items():
+            self.cell_changed(y * width + x, entity)
+
+    def cell_changed(self, index: int, entity):
+        kind = entity_kind(entity)
+        old = self._kinds.get(index, KIND_EMPTY)
+        if kind == old:
+            return
+        if kind == KIND_EMPTY:
+            del self._kinds[index]
+        else:
+            self._kinds[index] = kind
+        y, x = divmod(index, self.game_field.width)
+        block_index = (y // self.block) * self.cols + x // self.block
+        if old == KIND_UNIT:
+            self._units[block_index] -= 1
+        elif old == KIND_BASE:
+            self._bases[block_index] -= 1
+        if kind == KIND_UNIT:
+            self._units[block_index] += 1
+        elif kind == KIND_BASE:
+            self._bases[block_index] += 1
+
+    def terrain_changed(self, x: int, y: int):
+        """Сбросить ландшафт блока с клеткой (x, y): он пересчитается при выводе"""
+        self._terrain[(y // self.block) * self.cols + x // self.block] = None
+
+    def glyph(self, bx: int, by: int) -> str:
+        index = by * self.cols + bx
+        if self._bases[index]:
+            return MINIMAP_BASE
+        if self._units[index]:
+            return MINIMAP_UNIT
+        glyph = self._terrain[index]
+        if glyph is None:
+            glyph = self._block_terrain(bx, by)
+        return glyph
+
+    def frame(self, viewport: Optional[Viewport] = None) -> str:
+        """Текст миникарты; блоки окна просмотра обрамляются скобками"""
+        field = self.game_field
+        lines = [f"\n🗺️ МИНИКАРТА {field.width}x{field.height}, блок {self.block}x{self.block}"]
+        if viewport is not None:
+            first_row = viewport.y // self.block
+            last_row = (viewport.y + viewport.rows - 1) // self.block
+            first_col = viewport.x // self.block
+            last_col = (viewport.x + viewport.cols - 1) // self.block
+        for by in range(self.rows):
+            row = "".join(self.glyph(bx, by) for bx in range(self.cols))
+            if viewport is not None:
+                left, right = ("[", "]") if first_row <= by <= last_row else (" ", " ")
+                row = row[:first_col] + left + row[first_col:last_col + 1] + right + row[last_col + 1:]
+            lines.append(row)
+        lines.append(f"{MINIMAP_BASE}-база {MINIMAP_UNIT}-юниты ♣-лес ▲-горы ~-болото .-равнина"
+                     + (" []-окно просмотра" if viewport is not None else ""))
+        return "\n".join(lines) + "\n"
+
+    def _block_terrain(self, bx: int, by: int) -> str:
+        """Преобладающий ландшафт блока; запоминается, если блок полностью известен"""
+        field = self.game_field
+        block = self.block
+        x_start, x_end = bx * block, min(field.width, (bx + 1) * block)
+        y_start, y_end = by * block, min(field.height, (by + 1) * block)
+        terrain = field.terrain
+        counts = [0] * len(MINIMAP_TERRAIN)
+        complete = True
+        if not isinstance(terrain, (bytes, bytearray)):
+            # ChunkedTerrain
+            size = terrain.chunk_size
+            for cy in range(y_start // size, (y_end - 1) // size + 1):
+                rows = min(y_end, (cy + 1) * size) - max(y_start, cy * size)
+                for cx in range(x_start // size, (x_end - 1) // size + 1):
+                    code = terrain.dominant_code(cx, cy)
+                    if code is None:
+                        complete = False
+                    elif code < len(counts):
+                        counts[code] += rows * (min(x_end, (cx + 1) * size) - max(x_start, cx * size))
+        else:
+            width = field.width
+            step = max(1, math.ceil(block / MINIMAP_SAMPLES))
+            for row in range(y_start, y_end, step):
+                segment = terrain[row * width + x_start:row * width + x_end:step]
+                for code in range(len(counts)):
+                    counts[code] += segment.count(code)
+        if not any(counts):
+            return MINIMAP_UNEXPLORED
+        glyph = MINIMAP_TERRAIN[counts.index(max(counts))]
+        if complete:
+            self._terrain[by * self.cols + bx] = glyph
+        return glyph
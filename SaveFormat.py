@@ -0,0 +1,230 @@
+"""Двоичный формат сохранения игры.
+
+Файл состоит из заголовка и секций, идущих подряд:
+
+    заголовок       HEADER
+    типы юнитов     имена типов UnitFactory через "\\n" (UTF-8)
+    ландшафт        width * height байт, коды ландшафта построчно
+    базы            BASE_RECORD на каждую базу
+    юниты           UNIT_RECORD на каждого юнита
+    объекты         OBJECT_RECORD на каждый нейтральный объект
+    эффекты         EFFECT_RECORD на каждый временный эффект (с версии 2)
+    строки          названия баз (UTF-8), на них ссылаются записи баз
+
+Все числа - little-endian. Записи фиксированной длины читаются через
+struct.iter_unpack, а ландшафт копируется из отображенного в память
+файла одним срезом, без разбора по клеткам.
+"""
+import mmap
+import struct
+from typing import List
+from GameField import GameField
+from GameEngine import GameEngine
+from Base import Base
+from Units import UnitFactory, Archer, Crossbowman, unit_class, STAT_FIELDS
+from Effects import TimedEffect
+from NeutralObject import HealingFountain, ArmorSmith, Trap, TreasureChest
+
+MAGIC = b"GSAV"
+VERSION = 2
+
+# magic, version
+PREFIX = struct.Struct("<4sH")
+# magic, version, width, height, max_units, turn_count, unit_id_counter,
+# размер таблицы типов, число баз, юнитов, объектов, эффектов, размер секции строк
+HEADER = struct.Struct("<4sHIIIIIIIIIII")
+# заголовок версии 1 - без числа эффектов
+HEADER_V1 = struct.Struct("<4sHIIIIIIIIII")
+# x, y, health, max_health, max_units, resources, смещение и длина названия
+BASE_RECORD = struct.Struct("<iiiiiiII")
+# id, код типа, x, y, health, max_health, armor, attack, move_range,
+# attack_range, индекс базы-владельца (-1 - нет), флаги
+UNIT_RECORD = struct.Struct("<IBiiiiiiiiiB")
+# код типа, x, y, флаги
+OBJECT_RECORD = struct.Struct("<BiiB")
+# id эффекта, id юнита, код характеристики, величина, ход окончания
+EFFECT_RECORD = struct.Struct("<IIBiI")
+
+FLAG_BOLT_LOADED = 1
+FLAG_VISIBLE = 1
+
+OBJECT_TYPES = (HealingFountain, ArmorSmith, Trap, TreasureChest)
+
+
+class SaveFormatError(ValueError):
+    """Файл не является сохранением игры или поврежден"""
+
+
+def save_game(engine: GameEngine, filename: str):
+    """Сохранить состояние движка (поле, базы, юниты, объекты, ход) в файл"""
+    field = engine.game_field
+    type_names = list(UnitFactory.UNIT_TYPES)
+    type_codes = {unit_class: code for code, unit_class in enumerate(UnitFactory.UNIT_TYPES.values())}
+    type_table = "\n".join(type_names).encode("utf-8")
+    base_index = {id(base): index for index, base in enumerate(field.bases)}
+
+    strings = bytearray()
+    base_records = bytearray()
+    for base in field.bases:
+        name = base.name.encode("utf-8")
+        base_records += BASE_RECORD.pack(base.x, base.y, base.health, base.max_health,
+                                         base.max_units, base.resources, len(strings), len(name))
+        strings += name
+
+    units = field.units
+    unit_records = bytearray(UNIT_RECORD.size * len(units))
+    pack_unit = UNIT_RECORD.pack_into
+    get_owner = field.get_unit_owner
+    offset = 0
+    for unit in units:
+        cls = unit_class(unit)
+        if cls not in type_codes:
+            raise SaveFormatError(f"Тип юнита {cls.__name__} не зарегистрирован в UnitFactory")
+        owner = get_owner(unit)
+        flags = FLAG_BOLT_LOADED if getattr(unit, "bolt_loaded", False) else 0
+        pack_unit(unit_records, offset, unit.id, type_codes[cls], unit.x, unit.y,
+                  unit.health, unit.max_health, unit.armor, unit.attack, unit.move_range,
+                  getattr(unit, "attack_range", 0),
+                  base_index[id(owner)] if owner is not None else -1, flags)
+        offset += UNIT_RECORD.size
+
+    object_records = bytearray()
+    for obj in field.neutral_objects:
+        flags = FLAG_VISIBLE if getattr(obj, "visible", False) else 0
+        object_records += OBJECT_RECORD.pack(OBJECT_TYPES.index(type(obj)), obj.x, obj.y, flags)
+
+    effect_records = bytearray()
+    effect_count = 0
+    for effect in field.effects:
+        # эффекты юнитов, убранных с поля, ничего не снимут - их не сохраняем
+        if field.has_unit(effect.unit):
+            effect_records += EFFECT_RECORD.pack(effect.id, effect.unit.id, STAT_FIELDS.index(effect.stat),
+                                                 effect.amount, effect.expires_turn)
+            effect_count += 1
+
+    header = HEADER.pack(MAGIC, VERSION, field.width, field.height, field.max_units,
+                         engine.turn_count, field.unit_id_counter, len(type_table),
+                         len(field.bases), len(units), len(field.neutral_objects), effect_count,
+                         len(strings))
+    with open(filename, "wb") as f:
+        f.write(header)
+        f.write(type_table)
+        terrain = field.terrain
+        f.write(terrain if isinstance(terrain, bytearray) else bytes(terrain))
+        f.write(base_records)
+        f.write(unit_records)
+        f.write(object_records)
+        f.write(effect_records)
+        f.write(strings)
+
+
+def load_game(filename: str, echo: bool = False) -> GameEngine:
+    """Загрузить сохранение и вернуть новый движок с восстановленным полем"""
+    with open(filename, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise SaveFormatError("Файл сохранения пуст")
+    with data:
+        try:
+            return _load(memoryview(data), echo)
+        except SaveFormatError as error:
+            # кадр _load в трассировке держит срезы mmap, и закрыть его было бы нельзя
+            raise error.with_traceback(None)
+
+
+def _load(data: memoryview, echo: bool) -> GameEngine:
+    if len(data) < PREFIX.size:
+        raise SaveFormatError("Файл слишком короткий для сохранения игры")
+    magic, version = PREFIX.unpack_from(data)
+    if magic != MAGIC:
+        raise SaveFormatError("Файл не является сохранением игры")
+    if version not in (1, VERSION):
+        raise SaveFormatError(f"Неподдерживаемая версия сохранения: {version}")
+    header = HEADER if version == VERSION else HEADER_V1
+    if len(data) < header.size:
+        raise SaveFormatError("Файл слишком короткий для сохранения игры")
+    if version == VERSION:
+        (_, _, width, height, max_units, turn_count, unit_id_counter, type_table_size,
+         base_count, unit_count, object_count, effect_count, strings_size) = header.unpack_from(data)
+    else:
+        (_, _, width, height, max_units, turn_count, unit_id_counter, type_table_size,
+         base_count, unit_count, object_count, strings_size) = header.unpack_from(data)
+        effect_count = 0
+
+    offset = header.size
+    sections = _split(data, offset, [
+        type_table_size,
+        width * height,
+        BASE_RECORD.size * base_count,
+        UNIT_RECORD.size * unit_count,
+        OBJECT_RECORD.size * object_count,
+        EFFECT_RECORD.size * effect_count,
+        strings_size,
+    ])
+    type_table, terrain, base_data, unit_data, object_data, effect_data, strings = sections
+
+    unit_classes = []
+    for name in bytes(type_table).decode("utf-8").split("\n") if type_table_size else []:
+        if name not in UnitFactory.UNIT_TYPES:
+            raise SaveFormatError(f"Неизвестный тип юнита в сохранении: {name}")
+        unit_classes.append(UnitFactory.UNIT_TYPES[name])
+
+    field = GameField(width, height, max_units, terrain=bytearray(terrain))
+    field.unit_id_counter = unit_id_counter
+    strings = bytes(strings)
+
+    bases: List[Base] = []
+    for x, y, health, max_health, base_max_units, resources, name_offset, name_size in \
+            BASE_RECORD.iter_unpack(base_data):
+        base = Base(strings[name_offset:name_offset + name_size].decode("utf-8"), base_max_units)
+        base.health = health
+        base.max_health = max_health
+        base.resources = resources
+        field._place_entity(base, x, y)
+        bases.append(base)
+
+    restore_unit = field._restore_unit
+    for (unit_id, type_code, x, y, health, max_health, armor, attack, move_range,
+         attack_range, owner_index, flags) in UNIT_RECORD.iter_unpack(unit_data):
+        unit = unit_classes[type_code]()
+        unit.id = unit_id
+        unit.x = x
+        unit.y = y
+        unit.health = health
+        unit.max_health = max_health
+        unit.armor = armor
+        unit.attack = attack
+        unit.move_range = move_range
+        if isinstance(unit, Archer):
+            unit.attack_range = attack_range
+        if isinstance(unit, Crossbowman):
+            unit.bolt_loaded = bool(flags & FLAG_BOLT_LOADED)
+        restore_unit(unit, bases[owner_index] if owner_index >= 0 else None)
+
+    for type_code, x, y, flags in OBJECT_RECORD.iter_unpack(object_data):
+        obj = OBJECT_TYPES[type_code]()
+        if isinstance(obj, Trap):
+            obj.visible = bool(flags & FLAG_VISIBLE)
+        field._place_entity(obj, x, y)
+
+    # бонусы эффектов уже учтены в характеристиках юнитов
+    field.effects.turn = turn_count
+    for effect_id, unit_id, stat_code, amount, expires_turn in EFFECT_RECORD.iter_unpack(effect_data):
+        field._add_effect(TimedEffect(effect_id, field.get_unit_by_id(unit_id),
+                                      STAT_FIELDS[stat_code], amount, expires_turn))
+
+    engine = GameEngine(field, echo=echo)
+    engine.turn_count = turn_count
+    engine.is_running = not bases or any(base.is_alive() for base in bases)
+    return engine
+
+
+def _split(data: memoryview, offset: int, sizes: List[int]) -> List[memoryview]:
+    sections = []
+    for size in sizes:
+        if offset + size > len(data):
+            raise SaveFormatError("Файл сохранения обрезан")
+        sections.append(data[offset:offset + size])
+        offset += size
+    return sections
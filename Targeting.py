@@ -0,0 +1,157 @@
+"""Поиск целей в радиусе атаки и линия видимости.
+
+SpatialGrid - индекс юнитов поля по корзинам BUCKET_SIZE x BUCKET_SIZE
+клеток: запрос "юниты в радиусе r" просматривает только корзины,
+пересекающие квадрат вокруг точки, а не все юниты поля. GameField
+обновляет индекс из своих низкоуровневых методов.
+
+LineOfSight - множество клеток, видимых из точки в радиусе r: луч к
+каждой клетке строится алгоритмом Брезенхэма, и ландшафт, закрывающий
+обзор (Landscape.blocks_sight - горы), на промежуточных клетках луча
+прерывает выстрел. Сама клетка стрелка и клетка цели обзор не закрывают.
+Результаты кэшируются по (x, y, радиус) и сбрасываются только при
+изменении ландшафта в пределах радиуса.
+"""
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterator, List, Tuple
+from Units import Unit
+from Landscape import SIGHT_BLOCKERS
+
+Cell = Tuple[int, int]
+
+BUCKET_SIZE = 8
+# Сколько множеств видимости хранится в кэше
+SIGHT_CACHE_SIZE = 4096
+
+
+def bresenham_line(x0: int, y0: int, x1: int, y1: int) -> List[Cell]:
+    """Клетки отрезка от (x0, y0) до (x1, y1) включительно"""
+    dx = abs(x1 - x0)
+    dy = -abs(y1 - y0)
+    sx = 1 if x0 < x1 else -1
+    sy = 1 if y0 < y1 else -1
+    err = dx + dy
+    x, y = x0, y0
+    cells = [(x, y)]
+    while x != x1 or y != y1:
+        e2 = 2 * err
+        if e2 >= dy:
+            err += dy
+            x += sx
+        if e2 <= dx:
+            err += dx
+            y += sy
+        cells.append((x, y))
+    return cells
+
+
+class SpatialGrid:
+    """Юниты поля, разложенные по квадратным корзинам"""
+
+    def __init__(self, bucket: int = BUCKET_SIZE):
+        self.bucket = bucket
+        self._buckets: Dict[Cell, Dict[int, Unit]] = {}
+
+    def add(self, unit: Unit):
+        key = (unit.x // self.bucket, unit.y // self.bucket)
+        self._buckets.setdefault(key, {})[id(unit)] = unit
+
+    def remove(self, unit: Unit, x: int, y: int):
+        key = (x // self.bucket, y // self.bucket)
+        units = self._buckets.get(key)
+        if units is not None:
+            units.pop(id(unit), None)
+            if not units:
+                del self._buckets[key]
+
+    def move(self, unit: Unit, old_x: int, old_y: int):
+        bucket = self.bucket
+        if (old_x // bucket, old_y // bucket) != (unit.x // bucket, unit.y // bucket):
+            self.remove(unit, old_x, old_y)
+            self.add(unit)
+
+    def query(self, x: int, y: int, radius: int) -> Iterator[Unit]:
+        """Юниты на манхэттенском расстоянии не больше radius от (x, y)"""
+        bucket = self.bucket
+        buckets = self._buckets
+        for by in range((y - radius) // bucket, (y + radius) // bucket + 1):
+            for bx in range((x - radius) // bucket, (x + radius) // bucket + 1):
+                units = buckets.get((bx, by))
+                if units:
+                    for unit in units.values():
+                        if abs(unit.x - x) + abs(unit.y - y) <= radius:
+                            yield unit
+
+
+class LineOfSight:
+    """Видимость клеток с учетом ландшафта, закрывающего обзор"""
+
+    def __init__(self, game_field, cache_size: int = SIGHT_CACHE_SIZE):
+        self.game_field = game_field
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[int, int, int], FrozenSet[Cell]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def visible(self, x: int, y: int, radius: int) -> FrozenSet[Cell]:
+        """Клетки поля в радиусе radius, видимые из (x, y)"""
+        key = (x, y, radius)
+        cells = self._cache.get(key)
+        if cells is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return cells
+        self.misses += 1
+        cells = self._cache[key] = self._compute(x, y, radius)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return cells
+
+    def is_clear(self, x0: int, y0: int, x1: int, y1: int) -> bool:
+        """Не закрыт ли отрезок между клетками (без учета концов)"""
+        field = self.game_field
+        return _line_clear(field.terrain, field.width, x0, y0, x1, y1)
+
+    def invalidate_cell(self, x: int, y: int):
+        """Ландшафт клетки изменился: сбросить множества, в радиус которых она входит"""
+        stale = [key for key in self._cache if abs(key[0] - x) + abs(key[1] - y) <= key[2]]
+        for key in stale:
+            del self._cache[key]
+
+    def clear(self):
+        self._cache.clear()
+
+    def _compute(self, ox: int, oy: int, radius: int) -> FrozenSet[Cell]:
+        field = self.game_field
+        width, height = field.width, field.height
+        terrain = field.terrain
+        visible = []
+        for y in range(max(0, oy - radius), min(height, oy + radius + 1)):
+            span = radius - abs(y - oy)
+            for x in range(max(0, ox - span), min(width, ox + span + 1)):
+                if _line_clear(terrain, width, ox, oy, x, y):
+                    visible.append((x, y))
+        return frozenset(visible)
+
+
+def _line_clear(terrain, width: int, x0: int, y0: int, x1: int, y1: int) -> bool:
+    """Брезенхэм от (x0, y0) к (x1, y1): нет ли на промежуточных клетках
+    ландшафта, закрывающего обзор"""
+    dx = abs(x1 - x0)
+    dy = -abs(y1 - y0)
+    sx = 1 if x0 < x1 else -1
+    sy = 1 if y0 < y1 else -1
+    err = dx + dy
+    x, y = x0, y0
+    blockers = SIGHT_BLOCKERS
+    while x != x1 or y != y1:
+        e2 = 2 * err
+        if e2 >= dy:
+            err += dy
+            x += sx
+        if e2 <= dx:
+            err += dx
+            y += sy
+        if (x != x1 or y != y1) and blockers[terrain[y * width + x]]:
+            return False
+    return True
@@ -0,0 +1,224 @@
+"""Генерация карты ландшафта целиком из зерна.
+
+Два стиля:
+    uniform - каждая клетка независимо, по весам типов ландшафта (как
+              раньше, но одним вызовом randbytes и таблицей bytes.translate);
+    noise   - сглаженный value noise: связные леса, горные хребты и болота
+              в низинах.
+
+Шум строится на целочисленной решетке с шагом feature_size. Значение узла
+решетки - хэш (зерно, координаты узла), смешанный с крупной решеткой,
+поэтому любой прямоугольник карты можно построить независимо и он совпадет
+с тем же участком полной карты (так генерируются чанки ChunkedTerrain).
+Интерполяция целочисленная, поэтому при одном зерне результат побайтно
+одинаков с NumPy и без него. Без NumPy строка карты собирается из
+закэшированных отрезков между соседними узлами, а высоты переводятся в
+коды ландшафта одним bytes.translate.
+"""
+import random
+from collections import Counter
+from itertools import repeat
+from operator import lshift, or_
+from typing import Dict, List, Optional
+from Lazy import numpy
+
+STYLES = ("uniform", "noise")
+
+# Имена весов в GameConfig -> коды ландшафта
+TERRAIN_NAMES = ("plain", "forest", "mountain", "swamp")
+DEFAULT_WEIGHTS = {"plain": 0.6, "forest": 0.2, "mountain": 0.15, "swamp": 0.05}
+# Коды ландшафта по возрастанию высоты для стиля noise: болото, равнина, лес, горы
+ELEVATION_ORDER = (3, 0, 1, 2)
+
+DEFAULT_FEATURE_SIZE = 16
+# Во сколько раз крупная решетка реже мелкой
+COARSE_FACTOR = 8
+# Размер участка шума, по которому считаются пороги высот
+SAMPLE_SIZE = 1024
+# Сколько строк NumPy обрабатывает за раз
+NUMPY_ROWS = 256
+
+
+def _lattice_hash(seed: int, i: int, j: int) -> int:
+    """Псевдослучайный байт узла решетки (i, j)"""
+    h = (i * 0x9E3779B1 + j * 0x85EBCA77 + seed * 0xC2B2AE3D) & 0xFFFFFFFF
+    h ^= h >> 15
+    h = (h * 0x2C1B3C6D) & 0xFFFFFFFF
+    h ^= h >> 12
+    h = (h * 0x297A2D39) & 0xFFFFFFFF
+    h ^= h >> 15
+    return h & 0xFF
+
+
+def _smooth_weights(size: int) -> List[int]:
+    """Веса smoothstep 3t^2 - 2t^3 для t = k / size в единицах 1/65536"""
+    return [k * k * (3 * size - 2 * k) * 65536 // size ** 3 for k in range(size)]
+
+
+class TerrainGenerator:
+    """Генератор кодов ландшафта по весам и стилю"""
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, style: str = "uniform",
+                 feature_size: int = DEFAULT_FEATURE_SIZE):
+        weights = dict(DEFAULT_WEIGHTS if weights is None else weights)
+        unknown = set(weights) - set(TERRAIN_NAMES)
+        if unknown:
+            raise ValueError(f"Неизвестные типы ландшафта: {', '.join(sorted(unknown))}")
+        if any(weight < 0 for weight in weights.values()) or sum(weights.values()) <= 0:
+            raise ValueError("Веса ландшафта должны быть неотрицательными и не все нулевыми")
+        if style not in STYLES:
+            raise ValueError(f"Стиль ландшафта должен быть одним из: {', '.join(STYLES)}")
+        if feature_size < 2:
+            raise ValueError("Размер деталей шума должен быть не меньше 2")
+        total = sum(weights.values())
+        self.weights = [weights.get(name, 0.0) / total for name in TERRAIN_NAMES]
+        self.style = style
+        self.feature_size = feature_size
+        self._weights = _smooth_weights(feature_size)
+        self._coarse_weights = _smooth_weights(COARSE_FACTOR)
+        self._uniform_table = self._build_uniform_table()
+        self._noise_tables: Dict[int, bytes] = {}
+
+    @classmethod
+    def from_config(cls, config) -> 'TerrainGenerator':
+        return cls(config.terrain_weights, config.terrain_style)
+
+    # === Генерация ===
+
+    def generate(self, width: int, height: int, seed: int) -> bytearray:
+        """Карта width x height: коды ландшафта построчно, индекс y * width + x"""
+        if self.style == "uniform":
+            return bytearray(random.Random(seed).randbytes(width * height).translate(self._uniform_table))
+        return self.region(0, 0, width, height, seed)
+
+    def region(self, x0: int, y0: int, width: int, height: int, seed: int) -> bytearray:
+        """Прямоугольник карты стиля noise; совпадает с тем же участком полной карты"""
+        return bytearray(self._elevation(x0, y0, width, height, seed).translate(self._noise_table(seed)))
+
+    def chunk(self, cx: int, cy: int, size: int, seed: int) -> bytearray:
+        """Квадратный чанк size x size для ChunkedTerrain"""
+        if self.style == "uniform":
+            rng = random.Random(f"{seed}:{cx}:{cy}")
+            return bytearray(rng.randbytes(size * size).translate(self._uniform_table))
+        return self.region(cx * size, cy * size, size, size, seed)
+
+    # === Таблицы перевода байта в код ландшафта ===
+
+    def _build_uniform_table(self) -> bytes:
+        """256 значений случайного байта делятся между типами по весам
+        (метод наибольших остатков)"""
+        shares = [weight * 256 for weight in self.weights]
+        counts = [int(share) for share in shares]
+        by_remainder = sorted(range(len(shares)), key=lambda code: shares[code] - counts[code], reverse=True)
+        for code in by_remainder[:256 - sum(counts)]:
+            counts[code] += 1
+        table = bytearray()
+        for code, count in enumerate(counts):
+            table += bytes([code]) * count
+        return bytes(table)
+
+    def _noise_table(self, seed: int) -> bytes:
+        """Пороги высот по распределению шума на эталонном участке, чтобы
+        доли типов ландшафта совпадали с весами; зависят только от зерна"""
+        table = self._noise_tables.get(seed)
+        if table is not None:
+            return table
+        histogram = Counter(self._elevation(0, 0, SAMPLE_SIZE, SAMPLE_SIZE, seed))
+        total = SAMPLE_SIZE * SAMPLE_SIZE
+        bounds = []
+        cumulative = 0.0
+        for code in ELEVATION_ORDER:
+            cumulative += self.weights[code]
+            bounds.append(cumulative * total)
+        table = bytearray(256)
+        band = 0
+        seen = 0
+        for value in range(256):
+            count = histogram.get(value, 0)
+            while band < len(ELEVATION_ORDER) - 1 and seen + count / 2 > bounds[band]:
+                band += 1
+            table[value] = ELEVATION_ORDER[band]
+            seen += count
+        table = self._noise_tables[seed] = bytes(table)
+        return table
+
+    # === Шум ===
+
+    def _lattice(self, i0: int, j0: int, columns: int, rows: int, seed: int) -> List[List[int]]:
+        """Узлы мелкой решетки: 3/4 - крупная сглаженная решетка, 1/4 - детали"""
+        factor = COARSE_FACTOR
+        weights = self._coarse_weights
+        coarse_seed = seed ^ 0x5BD1E995
+        ci0 = i0 // factor
+        coarse_columns = range(ci0, (i0 + columns - 1) // factor + 2)
+        # горизонтально сглаженные строки крупной решетки
+        smoothed = {}
+        lattice = []
+        for j in range(j0, j0 + rows):
+            cj, kj = divmod(j, factor)
+            for cy in (cj, cj + 1):
+                if cy not in smoothed:
+                    nodes = [_lattice_hash(coarse_seed, ci, cy) for ci in coarse_columns]
+                    smoothed[cy] = [nodes[ci - ci0] + (((nodes[ci - ci0 + 1] - nodes[ci - ci0]) * weights[ki]) >> 16)
+                                    for ci, ki in map(divmod, range(i0, i0 + columns), repeat(factor))]
+            wj = weights[kj]
+            top = smoothed[cj]
+            bottom = smoothed[cj + 1]
+            lattice.append([(3 * (a + (((b - a) * wj) >> 16)) + _lattice_hash(seed, i, j)) >> 2
+                            for i, a, b in zip(range(i0, i0 + columns), top, bottom)])
+        return lattice
+
+    def _elevation(self, x0: int, y0: int, width: int, height: int, seed: int) -> bytes:
+        """Высоты 0..255 прямоугольника: билинейная интерполяция узлов со smoothstep"""
+        size = self.feature_size
+        i0, j0 = x0 // size, y0 // size
+        columns = (x0 + width - 1) // size - i0 + 2
+        rows = (y0 + height - 1) // size - j0 + 2
+        lattice = self._lattice(i0, j0, columns, rows, seed)
+        # NumPy необязателен: есть реализация на bytes
+        if width * height >= NUMPY_ROWS * NUMPY_ROWS and numpy() is not None:
+            return self._elevation_numpy(lattice, x0 - i0 * size, y0 - j0 * size, width, height)
+
+        weights = self._weights
+        offset = x0 - i0 * size
+        # 1. Горизонтальная интерполяция только в строках решетки. Отрезок
+        #    между соседними узлами a и b зависит лишь от пары (a, b).
+        segments: Dict[int, bytes] = {}
+        segment = segments.__getitem__
+        strips = []
+        for nodes in lattice:
+            keys = list(map(or_, map(lshift, nodes, repeat(8)), nodes[1:]))
+            for key in set(keys).difference(segments):
+                a, b = key >> 8, key & 0xFF
+                segments[key] = bytes(a + (((b - a) * w) >> 16) for w in weights)
+            # байт на 32-битную ячейку: вертикальную интерполяцию всей строки
+            # считает одно умножение длинных чисел, переносов между ячейками нет
+            lanes = bytearray(4 * width)
+            lanes[::4] = b"".join(map(segment, keys))[offset:offset + width]
+            strips.append(int.from_bytes(lanes, "little"))
+
+        # 2. Вертикальная интерполяция: a + ((b - a) * w >> 16) для каждой
+        #    клетки - это байт 2 ячейки a * (65536 - w) + b * w.
+        parts = []
+        for y in range(y0, y0 + height):
+            j, ky = divmod(y, size)
+            w = weights[ky]
+            mixed = strips[j - j0] * (65536 - w) + strips[j - j0 + 1] * w
+            parts.append(mixed.to_bytes(4 * width, "little")[2::4])
+        return b"".join(parts)
+
+    def _elevation_numpy(self, lattice, offset_x: int, offset_y: int, width: int, height: int) -> bytes:
+        """То же, что _elevation, массивами NumPy (те же целочисленные формулы)"""
+        size = self.feature_size
+        np = numpy()
+        nodes = np.array(lattice, dtype=np.int64)
+        weights = np.array(self._weights, dtype=np.int64)
+        column, kx = np.divmod(np.arange(offset_x, offset_x + width), size)
+        left = nodes[:, column]
+        strips = left + (((nodes[:, column + 1] - left) * weights[kx]) >> 16)
+        out = []
+        for start in range(0, height, NUMPY_ROWS):
+            row, ky = np.divmod(np.arange(offset_y + start, offset_y + min(height, start + NUMPY_ROWS)), size)
+            top = strips[row]
+            out.append((top + (((strips[row + 1] - top) * weights[ky][:, None]) >> 16)).astype(np.uint8).tobytes())
+        return b"".join(out)
@@ -0,0 +1,190 @@
+"""Ленивое хранилище ландшафта по блокам (чанкам) для очень больших карт.
+
+Карта делится на чанки chunk_size x chunk_size клеток. Чанк генерируется
+при первом обращении TerrainGenerator.chunk, результат которого зависит
+только от зерна мира и координат чанка, поэтому выгруженный чанк при
+следующем обращении генерируется заново точно таким же. Сгенерированные чанки
+хранятся в LRU-кэше с ограничением памяти; измененные чанки закреплены
+в памяти и не выгружаются. Для каждого сгенерированного чанка
+запоминается преобладающий ландшафт (dominant_code) - по нему миникарта
+показывает разведанные области, не генерируя остальные.
+
+ChunkedTerrain повторяет ту часть интерфейса bytearray, которой
+пользуется игра (terrain[y * width + x], присваивание клетки, len, срезы
+и bytes()), поэтому GameField, поиск пути и сохранения работают с ним
+так же, как с обычной картой.
+"""
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from TerrainGenerator import TerrainGenerator
+
+CHUNK_SIZE = 64
+# Ограничение памяти сгенерированных чанков по умолчанию
+DEFAULT_MEMORY_LIMIT = 64 * 1024 * 1024
+
+ChunkKey = Tuple[int, int]
+
+
+class ChunkedTerrain:
+    """Карта ландшафта из лениво генерируемых чанков с LRU-выгрузкой"""
+
+    def __init__(self, width: int, height: int, seed: int, chunk_size: int = CHUNK_SIZE,
+                 memory_limit: int = DEFAULT_MEMORY_LIMIT,
+                 generator: Optional[TerrainGenerator] = None):
+        if width <= 0 or height <= 0:
+            raise ValueError("Размеры карты должны быть положительными числами")
+        if chunk_size <= 0:
+            raise ValueError("Размер чанка должен быть положительным")
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.generator = generator or TerrainGenerator()
+        self.max_chunks = max(1, memory_limit // (chunk_size * chunk_size))
+        self._chunks: "OrderedDict[ChunkKey, bytearray]" = OrderedDict()
+        self._edited: Dict[ChunkKey, bytearray] = {}
+        # преобладающий код ландшафта чанков, которые уже генерировались;
+        # переживает выгрузку чанка
+        self._dominant: Dict[ChunkKey, int] = {}
+        # последний использованный чанк: соседние обращения не трогают LRU
+        self._last_key: ChunkKey = (-1, -1)
+        self._last_chunk = bytearray()
+        self.generated = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return self.width * self.height
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1 and start < stop and start // self.width == (stop - 1) // self.width:
+                return self._row_segment(start, stop)
+            return bytes(self._code(i) for i in range(start, stop, step))
+        if index < 0:
+            index += len(self)
+        return self._code(index)
+
+    def __setitem__(self, index: int, code: int):
+        if index < 0:
+            index += len(self)
+        y, x = divmod(index, self.width)
+        size = self.chunk_size
+        key = (x // size, y // size)
+        chunk = self._chunk(key)
+        chunk[(y % size) * size + x % size] = code
+        self._dominant.pop(key, None)
+        # измененный чанк нельзя сгенерировать заново - закрепляем его
+        if key not in self._edited:
+            self._edited[key] = chunk
+            self._chunks.pop(key, None)
+
+    def __iter__(self):
+        for y in range(self.height):
+            yield from self.row(y)
+
+    def __bytes__(self) -> bytes:
+        """Вся карта (для сохранения); недостающие чанки генерируются без
+        кэширования, чтобы не вытеснить из LRU посещенные области"""
+        size = self.chunk_size
+        columns = (self.width + size - 1) // size
+        parts = []
+        for cy in range((self.height + size - 1) // size):
+            chunks = []
+            for cx in range(columns):
+                key = (cx, cy)
+                chunk = self._edited.get(key)
+                if chunk is None:
+                    chunk = self._chunks.get(key)
+                if chunk is None:
+                    chunk = self._generate(key)
+                chunks.append(chunk)
+            for offset in range(min(size, self.height - cy * size)):
+                start = offset * size
+                for cx, chunk in enumerate(chunks):
+                    parts.append(chunk[start:start + min(size, self.width - cx * size)])
+        return b"".join(parts)
+
+    def row(self, y: int) -> bytes:
+        """Строка карты целиком (генерирует все чанки этой полосы)"""
+        size = self.chunk_size
+        cy, offset = divmod(y, size)
+        parts = []
+        for cx in range((self.width + size - 1) // size):
+            chunk = self._chunk((cx, cy))
+            start = offset * size
+            parts.append(chunk[start:start + min(size, self.width - cx * size)])
+        return b"".join(parts)
+
+    def code_at(self, x: int, y: int) -> int:
+        size = self.chunk_size
+        key = (x // size, y // size)
+        chunk = self._last_chunk if key == self._last_key else self._chunk(key)
+        return chunk[(y % size) * size + x % size]
+
+    def dominant_code(self, cx: int, cy: int) -> Optional[int]:
+        """Преобладающий код ландшафта чанка или None, если чанк еще не
+        генерировался (сам чанк при этом не генерируется)"""
+        key = (cx, cy)
+        code = self._dominant.get(key)
+        if code is None:
+            chunk = self._edited.get(key)
+            if chunk is None:
+                chunk = self._chunks.get(key)
+            if chunk is None:
+                return None
+            code = self._dominant[key] = max(set(chunk), key=chunk.count)
+        return code
+
+    @property
+    def loaded_chunks(self) -> int:
+        return len(self._chunks) + len(self._edited)
+
+    @property
+    def memory_bytes(self) -> int:
+        return self.loaded_chunks * self.chunk_size * self.chunk_size
+
+    def _code(self, index: int) -> int:
+        y, x = divmod(index, self.width)
+        return self.code_at(x, y)
+
+    def _row_segment(self, start: int, stop: int) -> bytes:
+        """Клетки [start, stop) одной строки карты срезами чанков"""
+        y, x = divmod(start, self.width)
+        x_end = x + stop - start
+        size = self.chunk_size
+        cy, offset = divmod(y, size)
+        parts = []
+        while x < x_end:
+            cx = x // size
+            chunk = self._last_chunk if (cx, cy) == self._last_key else self._chunk((cx, cy))
+            column = x - cx * size
+            count = min(size - column, x_end - x)
+            parts.append(chunk[offset * size + column:offset * size + column + count])
+            x += count
+        return b"".join(parts)
+
+    def _chunk(self, key: ChunkKey) -> bytearray:
+        chunk = self._edited.get(key)
+        if chunk is None:
+            chunk = self._chunks.get(key)
+            if chunk is None:
+                chunk = self._generate(key)
+                self._chunks[key] = chunk
+                self._dominant[key] = max(set(chunk), key=chunk.count)
+                self.generated += 1
+                if len(self._chunks) > self.max_chunks:
+                    self._chunks.popitem(last=False)
+                    self.evicted += 1
+            else:
+                self._chunks.move_to_end(key)
+        self._last_key = key
+        self._last_chunk = chunk
+        return chunk
+
+    def _generate(self, key: ChunkKey) -> bytearray:
+        cx, cy = key
+        size = self.chunk_size
+        # клетки за краем карты тоже генерируются: чанк всегда квадратный,
+        # и его содержимое не зависит от размеров карты
+        return self.generator.chunk(cx, cy, size, self.seed)
@@ -0,0 +1,227 @@
+"""Хранилище юнитов по столбцам (struct of arrays).
+
+Числовые поля юнитов (здоровье, максимальное здоровье, броня, атака,
+дальность хода, координаты), код типа и владелец лежат в параллельных
+типизированных массивах array, по строке на юнит. Юнит в хранилище -
+тонкое представление строки: при добавлении его класс заменяется
+подклассом-представлением с тем же именем и теми же __slots__, поля
+которого читают и пишут столбцы (ссылка на хранилище и номер строки -
+в слотах _store и _row). Поэтому take_damage, heal, is_alive и весь
+остальной код игры работают с юнитом как раньше, а массовые запросы
+(живые юниты, здоровье по базам) проходят по массивам без обращения к
+объектам - с NumPy векторно, без него одним проходом по столбцам.
+
+Хранилище необязательно: юниты вне его хранят поля в обычных слотах и
+не платят за обращение через столбцы. GameField(unit_store=UnitStore())
+добавляет в хранилище юнитов, размещенных на поле, и возвращает им
+собственные поля при удалении. Настоящий класс юнита - Units.unit_class.
+"""
+from array import array
+from itertools import compress
+from operator import attrgetter
+from typing import Dict, Iterator, List, Optional
+from Units import Unit, STAT_FIELDS
+from Lazy import numpy
+
+HEALTH = STAT_FIELDS.index("health")
+# Координата "не размещен" в столбцах (в юните - None)
+NO_POSITION = -1
+# Код типа свободной строки
+FREE_ROW = -1
+# Код владельца юнита без базы
+NO_OWNER = -1
+
+
+_read_stats = attrgetter(*STAT_FIELDS)
+# Собственные слоты полей Unit: пока юнит в хранилище, они пусты
+_slots = [Unit.__dict__[field] for field in STAT_FIELDS]
+
+
+class _Column:
+    """Поле юнита-представления: ячейка столбца хранилища"""
+    __slots__ = ("index",)
+
+    def __init__(self, index: int):
+        self.index = index
+
+    def __get__(self, unit, owner=None):
+        if unit is None:
+            return self
+        return unit._store.columns[self.index][unit._row]
+
+    def __set__(self, unit, value):
+        unit._store.columns[self.index][unit._row] = value
+
+
+class _Position(_Column):
+    """Координата юнита-представления: None хранится как NO_POSITION"""
+    __slots__ = ()
+
+    def __get__(self, unit, owner=None):
+        if unit is None:
+            return self
+        value = unit._store.columns[self.index][unit._row]
+        return None if value == NO_POSITION else value
+
+    def __set__(self, unit, value):
+        unit._store.columns[self.index][unit._row] = NO_POSITION if value is None else value
+
+
+_views: Dict[type, type] = {}
+
+
+def view_class(unit_class: type) -> type:
+    """Подкласс-представление строки хранилища для класса юнита"""
+    view = _views.get(unit_class)
+    if view is None:
+        namespace = {
+            "__slots__": (),
+            "__module__": unit_class.__module__,
+            "__qualname__": unit_class.__qualname__,
+            "__doc__": unit_class.__doc__,
+            "_view_of": unit_class,
+        }
+        for index, field in enumerate(STAT_FIELDS):
+            namespace[field] = _Position(index) if field in ("x", "y") else _Column(index)
+        view = _views[unit_class] = type(unit_class)(unit_class.__name__, (unit_class,), namespace)
+    return view
+
+
+class UnitStore:
+    """Параллельные массивы характеристик юнитов"""
+
+    def __init__(self):
+        self.columns = [array("q") for _ in STAT_FIELDS]
+        self.type_codes = array("h")
+        self.owner_codes = array("i")
+        self.types: List[type] = []  # код типа -> класс юнита
+        self.owners: List[object] = []  # код владельца -> база
+        self._type_index: Dict[type, int] = {}
+        self._owner_index: Dict[int, int] = {}  # id(база) -> код владельца
+        self._units: List[Optional[Unit]] = []  # строка -> юнит
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._units) - len(self._free)
+
+    def __contains__(self, unit: Unit) -> bool:
+        return type(unit)._view_of is not None and unit._store is self
+
+    def __iter__(self) -> Iterator[Unit]:
+        return (unit for unit in self._units if unit is not None)
+
+    # === Добавление и удаление ===
+
+    def add(self, unit: Unit, owner=None) -> int:
+        """Перенести поля юнита в строку хранилища; возвращает номер строки"""
+        unit_class = type(unit)
+        if unit_class._view_of is not None:
+            if unit._store is not self:
+                raise ValueError(f"Юнит {unit.name} уже находится в другом хранилище")
+            self.set_owner(unit, owner)
+            return unit._row
+
+        values = _read_stats(unit)
+        if self._free:
+            row = self._free.pop()
+            for column, value in zip(self.columns, values):
+                column[row] = NO_POSITION if value is None else value
+            self.type_codes[row] = self._type_code(unit_class)
+            self.owner_codes[row] = self._owner_code(owner)
+            self._units[row] = unit
+        else:
+            row = len(self._units)
+            for column, value in zip(self.columns, values):
+                column.append(NO_POSITION if value is None else value)
+            self.type_codes.append(self._type_code(unit_class))
+            self.owner_codes.append(self._owner_code(owner))
+            self._units.append(unit)
+        for slot in _slots:
+            slot.__delete__(unit)
+        unit.__class__ = view_class(unit_class)
+        unit._store = self
+        unit._row = row
+        return row
+
+    def remove(self, unit: Unit):
+        """Вернуть юниту собственные поля и освободить его строку"""
+        if unit not in self:
+            raise ValueError(f"Юнит {unit.name} не находится в этом хранилище")
+        row = unit._row
+        values = _read_stats(unit)
+        unit.__class__ = type(unit)._view_of
+        for slot, value in zip(_slots, values):
+            slot.__set__(unit, value)
+        unit._store = unit._row = None
+        self.type_codes[row] = FREE_ROW
+        self.owner_codes[row] = NO_OWNER
+        self.columns[HEALTH][row] = 0
+        self._units[row] = None
+        self._free.append(row)
+
+    def set_owner(self, unit: Unit, owner):
+        self.owner_codes[unit._row] = self._owner_code(owner)
+
+    def owner_of(self, unit: Unit):
+        code = self.owner_codes[unit._row]
+        return None if code == NO_OWNER else self.owners[code]
+
+    def type_of_row(self, row: int) -> Optional[type]:
+        code = self.type_codes[row]
+        return None if code == FREE_ROW else self.types[code]
+
+    def _type_code(self, unit_class: type) -> int:
+        code = self._type_index.get(unit_class)
+        if code is None:
+            code = self._type_index[unit_class] = len(self.types)
+            self.types.append(unit_class)
+        return code
+
+    def _owner_code(self, owner) -> int:
+        if owner is None:
+            return NO_OWNER
+        code = self._owner_index.get(id(owner))
+        if code is None:
+            code = self._owner_index[id(owner)] = len(self.owners)
+            self.owners.append(owner)
+        return code
+
+    # === Массовые запросы ===
+    # Свободные строки имеют здоровье 0, поэтому "здоровье > 0" сразу
+    # отбирает живых юнитов, занимающих строки.
+
+    def alive_units(self) -> List[Unit]:
+        """Живые юниты в порядке строк хранилища"""
+        units = self._units
+        # NumPy необязателен: без него запросы идут по массивам array
+        np = numpy() if units else None
+        if np is not None:
+            rows = np.flatnonzero(np.frombuffer(self.columns[HEALTH], dtype=np.int64) > 0)
+            return [units[row] for row in rows.tolist()]
+        return list(compress(units, map((0).__lt__, self.columns[HEALTH])))
+
+    def alive_count(self) -> int:
+        np = numpy() if self._units else None
+        if np is not None:
+            return int(np.count_nonzero(np.frombuffer(self.columns[HEALTH], dtype=np.int64) > 0))
+        return sum(1 for health in self.columns[HEALTH] if health > 0)
+
+    def health_by_owner(self) -> Dict[object, int]:
+        """Суммарное здоровье живых юнитов по владельцам (None - без базы)"""
+        owners = self.owners
+        np = numpy() if self._units else None
+        if np is not None:
+            health = np.frombuffer(self.columns[HEALTH], dtype=np.int64)
+            alive = health > 0
+            codes = np.frombuffer(self.owner_codes, dtype=np.int32)[alive] + 1
+            totals = np.bincount(codes, weights=health[alive], minlength=len(owners) + 1)
+            sums = [int(total) for total in totals.tolist()]
+        else:
+            sums = [0] * (len(owners) + 1)
+            for code, health in zip(self.owner_codes, self.columns[HEALTH]):
+                if health > 0:
+                    sums[code + 1] += health
+        result = {owner: total for owner, total in zip(owners, sums[1:]) if total}
+        if sums[0]:
+            result[None] = sums[0]
+        return result
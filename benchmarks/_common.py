@@ -0,0 +1,23 @@
+"""Общие помощники бенчмарков: путь к модулям игры и подавление вывода."""
+import contextlib
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+class NullWriter:
+    """Поток вывода, который отбрасывает все сообщения игровых объектов"""
+
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def quiet():
+    """Контекст, в котором print() игровых объектов ничего не выводит"""
+    return contextlib.redirect_stdout(NullWriter())
@@ -0,0 +1,114 @@
+"""Бенчмарк пакетных атак: GameField.resolve_attacks против attack_unit.
+
+Запуск:
+    python benchmarks/bench_batch_attacks.py [--attacks 100,1000,10000] [--repeat 5] [--no-numpy]
+
+Для каждого размера пакета строятся два одинаковых поля; на одном атаки
+выполняются по одной через attack_unit, на другом - одним вызовом
+resolve_attacks. Печатается лучшее из repeat время обоих путей и
+проверяется, что здоровье всех юнитов и состав поля после атак
+совпадают. --no-numpy замеряет путь без NumPy (плоские списки).
+"""
+import argparse
+import gc
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _common import quiet
+from Base import Base
+from GameField import GameField
+import Lazy
+from Lazy import numpy
+from Units import Swordsman, Spearman, Crossbowman, Knight, Healer
+
+UNIT_CLASSES = (Swordsman, Spearman, Crossbowman, Knight, Healer)
+
+
+def build_field(count, seed):
+    rng = random.Random(seed)
+    random.seed(seed)
+    side = int(math.sqrt(count * 2)) + 2
+    field = GameField(side, side, max_units=count)
+    base = Base("База", max_units=count)
+    field.add_base(base, 0, 0)
+    cells = [(x, y) for y in range(side) for x in range(side) if field.is_cell_empty(x, y)]
+    rng.shuffle(cells)
+    while field.unit_count < count and cells:
+        unit = rng.choice(UNIT_CLASSES)()
+        x, y = cells.pop()
+        if field.add_unit(unit, x, y, owner=base):
+            base.owned_units.append(unit)
+    return field, base
+
+
+def make_pairs(field, attacks, seed):
+    rng = random.Random(seed)
+    units = field.units
+    return [(rng.choice(units), rng.choice(units)) for _ in range(attacks)]
+
+
+def snapshot(field, base):
+    return (sorted((unit.id, unit.health, unit.x, unit.y) for unit in field.units),
+            sorted(unit.id for unit in base.owned_units))
+
+
+def run_case(attacks, seed):
+    units = max(16, attacks // 4)
+    scalar_field, scalar_base = build_field(units, seed)
+    batch_field, batch_base = build_field(units, seed)
+    scalar_pairs = make_pairs(scalar_field, attacks, seed)
+    batch_pairs = make_pairs(batch_field, attacks, seed)
+
+    # сборщик мусора во время замеров выключен, как в timeit
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        for attacker, target in scalar_pairs:
+            scalar_field.attack_unit(attacker, target.x, target.y)
+        scalar_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        batch_field.resolve_attacks(batch_pairs)
+        batch_time = time.perf_counter() - started
+    finally:
+        gc.enable()
+
+    same = snapshot(scalar_field, scalar_base) == snapshot(batch_field, batch_base)
+    return scalar_time, batch_time, same
+
+
+def best_case(attacks, seed, repeat):
+    """Лучшее время каждого пути за repeat прогонов на свежих полях"""
+    runs = [run_case(attacks, seed) for _ in range(repeat)]
+    return (min(run[0] for run in runs), min(run[1] for run in runs),
+            all(run[2] for run in runs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--attacks", default="100,1000,10000")
+    parser.add_argument("--seed", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-numpy", action="store_true")
+    args = parser.parse_args()
+    if args.no_numpy:
+        Lazy._modules["numpy"] = None
+
+    print(f"NumPy: {'да' if numpy() is not None else 'нет (списки)'}")
+    print(f"{'атак':>7} | {'attack_unit, мс':>15} | {'resolve_attacks, мс':>19} | {'ускорение':>9} | {'совпадает':>9}")
+    print("-" * 73)
+    for attacks in (int(value) for value in args.attacks.split(",")):
+        with quiet():
+            scalar_time, batch_time, same = best_case(attacks, args.seed, args.repeat)
+        print(f"{attacks:>7} | {scalar_time * 1e3:>15.2f} | {batch_time * 1e3:>19.2f} | "
+              f"{scalar_time / batch_time:>8.1f}x | {'да' if same else 'НЕТ':>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Бенчмарк масштабирования BattleSimulator по числу процессов.
+
+Запуск:
+    python benchmarks/bench_battle_sim.py [--trials 20000] [--workers 1,2,4,8]
+
+Для каждого числа процессов печатает испытаний в секунду, ускорение
+относительно одного процесса и проверяет, что статистика совпадает:
+при одном seed результат не должен зависеть от числа процессов.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import _common  # noqa: F401  (путь к модулям игры)
+from BattleSimulator import Battle, simulate
+from Landscape import TerrainType
+
+
+def main():
+    cores = os.cpu_count() or 1
+    default_workers = sorted({1, 2, 4, cores} if cores >= 4 else {1, cores})
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trials", type=int, default=20000)
+    parser.add_argument("--workers", default=",".join(map(str, default_workers)))
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    battle = Battle(["swordsman"] * 4 + ["crossbowman"] * 2, ["spearman"] * 5 + ["healer"],
+                    TerrainType.FOREST)
+    print(f"{battle}, испытаний: {args.trials}, ядер: {cores}")
+    print(f"{'процессов':>9} | {'испытаний/с':>12} | {'ускорение':>9} | {'совпадает':>9}")
+    print("-" * 50)
+    reference = None
+    base_rate = None
+    for workers in (int(value) for value in args.workers.split(",")):
+        started = time.perf_counter()
+        stats = simulate(battle, args.trials, seed=args.seed, workers=workers)
+        rate = args.trials / (time.perf_counter() - started)
+        result = stats.to_dict()
+        if reference is None:
+            reference, base_rate = result, rate
+        same = "да" if result == reference else "НЕТ"
+        print(f"{workers:>9} | {rate:>12.0f} | {rate / base_rate:>8.2f}x | {same:>9}")
+
+
+if __name__ == "__main__":
+    main()
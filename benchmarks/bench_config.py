@@ -0,0 +1,58 @@
+"""Бенчмарк создания GameConfig: чтение файла каждый раз против кэша по времени изменения.
+
+Запуск:
+    python benchmarks/bench_config.py [--configs 2000]
+
+Во временном каталоге создается game_config.json, затем configs раз
+создается GameConfig: с очисткой кэша файлов перед каждым созданием
+(разбор JSON и проверка сеттерами, как при чтении без кэша) и с кэшем
+(только os.stat). Печатается время одного создания.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _common import quiet
+import GameConfig as config_module
+from GameConfig import GameConfig
+
+
+def measure(configs, cold):
+    started = time.perf_counter()
+    with quiet():
+        for _ in range(configs):
+            if cold:
+                config_module._FILE_CACHE.clear()
+            GameConfig(environ={})
+    return (time.perf_counter() - started) / configs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--configs", type=int, default=2000)
+    args = parser.parse_args()
+
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            with quiet():
+                GameConfig(environ={}).save_to_file()
+            cold = measure(args.configs, cold=True)
+            cached = measure(args.configs, cold=False)
+        finally:
+            os.chdir(previous)
+
+    print(f"{'чтение':>14} | {'создание, мкс':>14}")
+    print("-" * 32)
+    print(f"{'без кэша':>14} | {cold * 1e6:>14.1f}")
+    print(f"{'кэш':>14} | {cached * 1e6:>14.1f}")
+    print(f"Ускорение: {cold / cached:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
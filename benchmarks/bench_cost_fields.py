@@ -0,0 +1,171 @@
+"""Бенчмарк полей стоимости: правила ландшафта против плоского массива.
+
+Запуск:
+    python benchmarks/bench_cost_fields.py [--size 200] [--units 2000] [--searches 2000]
+
+Сравниваются:
+    стоимость клетки    Landscape.can_pass + get_move_cost и проверка
+                        занятости против одного байта поля стоимости;
+    поиск хода          прежний поиск достижимых клеток по правилам
+                        ландшафта (воспроизведен здесь) против
+                        ReachabilityEngine на полях стоимости;
+    обновление          пересчет одной клетки при ходе юнита против
+                        полной перестройки полей.
+"""
+import argparse
+import heapq
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _common import quiet
+from CostFields import BLOCKED, COST_MASK
+from GameField import GameField
+from NeutralObject import NeutralObject
+from Units import Horseman, Swordsman
+
+
+def build_field(size, units):
+    random.seed(1)
+    field = GameField(size, size, max_units=units)
+    rng = random.Random(2)
+    with quiet():
+        while field.unit_count < units:
+            unit = Horseman() if rng.random() < 0.5 else Swordsman()
+            field.add_unit(unit, rng.randrange(size), rng.randrange(size))
+    return field
+
+
+def rule_cost(field, unit, x, y):
+    terrain = field.get_terrain_at(x, y)
+    occupant = field.occupants.get((x, y))
+    if occupant is not None and not isinstance(occupant, NeutralObject):
+        return BLOCKED
+    return terrain.get_move_cost(unit) if terrain.can_pass(unit) else BLOCKED
+
+
+def legacy_search(field, unit):
+    """Поиск достижимых клеток по правилам ландшафта и словарю занятости"""
+    width, height = field.width, field.height
+    terrain = field.terrain
+    occupants = field.occupants
+    rules = field.rules_for(unit)
+    origin = (unit.x, unit.y)
+    budget = unit.move_range
+    costs = {origin: 0}
+    heap = [(0, origin)]
+    while heap:
+        cost, cell = heapq.heappop(heap)
+        if cost > costs[cell]:
+            continue
+        x, y = cell
+        if cell != origin and cell in occupants:
+            continue
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if not (0 <= nx < width and 0 <= ny < height):
+                continue
+            rule = rules[terrain[ny * width + nx]]
+            if not rule.passable:
+                continue
+            new_cost = cost + rule.move_cost
+            if new_cost > budget:
+                continue
+            occupant = occupants.get((nx, ny))
+            if occupant is not None and not isinstance(occupant, NeutralObject):
+                continue
+            if new_cost < costs.get((nx, ny), budget + 1):
+                costs[(nx, ny)] = new_cost
+                heapq.heappush(heap, (new_cost, (nx, ny)))
+    return costs
+
+
+def per_second(count, started):
+    return count / (time.perf_counter() - started)
+
+
+def bench_cell_costs(field, units):
+    size = field.width
+    cells = [(x, y) for y in range(size) for x in range(size)]
+    results = []
+    for unit in units:
+        started = time.perf_counter()
+        for x, y in cells:
+            rule_cost(field, unit, x, y)
+        rules = per_second(len(cells), started)
+        started = time.perf_counter()
+        costs = field.cost_fields.costs_for(unit)
+        for x, y in cells:
+            costs[y * size + x] & COST_MASK
+        results.append((unit.name, rules, per_second(len(cells), started)))
+    return results
+
+
+def bench_search(field, units, searches):
+    started = time.perf_counter()
+    for index in range(searches):
+        legacy_search(field, units[index % len(units)])
+    legacy = per_second(searches, started)
+    engine = field.reachability
+    started = time.perf_counter()
+    for index in range(searches):
+        unit = units[index % len(units)]
+        engine._search(unit, (unit.x, unit.y), unit.move_range)
+    return legacy, per_second(searches, started)
+
+
+def bench_updates(field, moves):
+    units = field.units
+    rng = random.Random(3)
+    started = time.perf_counter()
+    done = 0
+    for _ in range(moves):
+        unit = rng.choice(units)
+        x, y = unit.x + rng.choice((-1, 1)), unit.y
+        if field.can_place(unit, x, y):
+            field._relocate_unit(unit, x, y)
+            done += 1
+    incremental = per_second(done, started)
+    rebuilds = 20
+    started = time.perf_counter()
+    for _ in range(rebuilds):
+        field.cost_fields.rebuild()
+    return incremental, per_second(rebuilds, started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=200)
+    parser.add_argument("--units", type=int, default=2000)
+    parser.add_argument("--searches", type=int, default=2000)
+    parser.add_argument("--moves", type=int, default=20000)
+    args = parser.parse_args()
+
+    field = build_field(args.size, args.units)
+    samples = [next(unit for unit in field.units if isinstance(unit, kind)) for kind in (Swordsman, Horseman)]
+    for unit in field.units:
+        assert legacy_search(field, unit) == field.reachable_cells(unit).costs
+
+    print(f"Поле {args.size}x{args.size}, юнитов: {field.unit_count}, "
+          f"полей стоимости: {len(set(map(id, field.cost_fields.fields().values())))}")
+    print(f"\n{'стоимость клетки':<16} | {'правила, кл/с':>14} | {'массив, кл/с':>14} | {'ускорение':>9}")
+    print("-" * 62)
+    for name, rules, array in bench_cell_costs(field, samples):
+        print(f"{name:<16} | {rules:>14,.0f} | {array:>14,.0f} | {array / rules:>8.1f}x")
+
+    legacy, fields = bench_search(field, field.units, args.searches)
+    print(f"\n{'поиск хода':<16} | {'правила, п/с':>14} | {'поля, п/с':>14} | {'ускорение':>9}")
+    print("-" * 62)
+    print(f"{'_search':<16} | {legacy:>14,.0f} | {fields:>14,.0f} | {fields / legacy:>8.2f}x")
+
+    incremental, rebuild = bench_updates(field, args.moves)
+    print(f"\n{'обновление':<16} | {'операций/с':>14}")
+    print("-" * 33)
+    print(f"{'ход (клетки)':<16} | {incremental:>14,.0f}")
+    print(f"{'перестройка':<16} | {rebuild:>14,.1f}")
+
+
+if __name__ == "__main__":
+    main()
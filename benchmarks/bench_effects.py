@@ -0,0 +1,118 @@
+"""Бенчмарк временных эффектов: очередь EffectScheduler против обхода всех эффектов.
+
+Запуск:
+    python benchmarks/bench_effects.py [--effects 100000] [--units 10000] [--turns 50]
+
+На поле с units юнитами висит effects усилений брони и атаки со сроками
+от 1 до turns ходов. Каждый ход снимаются истекшие эффекты двумя
+способами: GameField.expire_effects (корзины по ходу окончания) и прямым
+обходом всех активных эффектов, как при проверке каждого юнита в конце
+хода. Печатается время тихого хода (ничего не истекает), среднее время
+хода с истечениями и проверяется, что характеристики юнитов после
+обоих способов совпадают и вернулись к исходным.
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _common import quiet
+from GameField import GameField
+from Units import Knight, Swordsman, Crossbowman
+
+UNIT_CLASSES = (Knight, Swordsman, Crossbowman)
+
+
+def build_field(units, seed):
+    random.seed(seed)
+    side = int(math.sqrt(units * 2)) + 2
+    field = GameField(side, side, max_units=units)
+    rng = random.Random(seed)
+    cells = [(x, y) for y in range(side) for x in range(side)]
+    rng.shuffle(cells)
+    with quiet():
+        while field.unit_count < units and cells:
+            field.add_unit(rng.choice(UNIT_CLASSES)(), *cells.pop())
+    return field
+
+
+def add_effects(field, count, turns, seed):
+    """Повесить count эффектов, как это делает взаимодействие с объектом"""
+    rng = random.Random(seed)
+    units = field.units
+    for _ in range(count):
+        unit = rng.choice(units)
+        stat, amount = rng.choice((("armor", 10), ("attack", 15)))
+        setattr(unit, stat, getattr(unit, stat) + amount)
+        field._add_effect(field.effects.create(unit, stat, amount, rng.randint(1, turns)))
+
+
+def stats(field):
+    return [(unit.id, unit.armor, unit.attack) for unit in field.units]
+
+
+def scan_expire(field, active, turn):
+    """Обход всех эффектов: O(n) каждый ход, снятие бонуса - как в expire_effects"""
+    still_active = []
+    for effect in active:
+        if effect.expires_turn <= turn:
+            unit = effect.unit
+            if field.has_unit(unit):
+                field._unit_changing(unit)
+                setattr(unit, effect.stat, getattr(unit, effect.stat) - effect.amount)
+                field._unit_changed(unit)
+            field._remove_effect(effect)
+        else:
+            still_active.append(effect)
+    return still_active
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--effects", type=int, default=100_000)
+    parser.add_argument("--units", type=int, default=10_000)
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    heap_field = build_field(args.units, args.seed)
+    scan_field = build_field(args.units, args.seed)
+    initial = stats(heap_field)
+    add_effects(heap_field, args.effects, args.turns, args.seed)
+    add_effects(scan_field, args.effects, args.turns, args.seed)
+    active = list(scan_field.effects)
+    print(f"Юнитов {heap_field.unit_count}, эффектов {len(heap_field.effects)}, ходов {args.turns}")
+
+    # тихий ход: эффекты истекают не раньше хода 1, поэтому ход 0 пустой
+    started = time.perf_counter()
+    with quiet():
+        heap_field.expire_effects(0)
+    heap_quiet = time.perf_counter() - started
+    started = time.perf_counter()
+    active = scan_expire(scan_field, active, 0)
+    scan_quiet = time.perf_counter() - started
+
+    heap_total = scan_total = 0.0
+    for turn in range(1, args.turns + 1):
+        started = time.perf_counter()
+        with quiet():
+            heap_field.expire_effects(turn)
+        heap_total += time.perf_counter() - started
+        started = time.perf_counter()
+        active = scan_expire(scan_field, active, turn)
+        scan_total += time.perf_counter() - started
+
+    print(f"{'способ':>8} | {'тихий ход, мс':>14} | {'ход с истечениями, мс':>22}")
+    print("-" * 50)
+    print(f"{'очередь':>8} | {heap_quiet * 1000:>14.3f} | {heap_total / args.turns * 1000:>22.2f}")
+    print(f"{'обход':>8} | {scan_quiet * 1000:>14.3f} | {scan_total / args.turns * 1000:>22.2f}")
+    same = stats(heap_field) == stats(scan_field) == initial and not heap_field.effects and not scan_field.effects
+    print("✅ Все бонусы сняты, характеристики совпадают" if same else "❌ Характеристики не совпадают")
+
+
+if __name__ == "__main__":
+    main()
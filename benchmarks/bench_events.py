@@ -0,0 +1,106 @@
+"""Бенчмарк шины событий: move_unit/attack_unit с консольным выводом и без подписчиков.
+
+Запуск:
+    python benchmarks/bench_events.py [--ops 20000]
+
+Режимы:
+    консоль -> файл      ConsoleReporter печатает сообщения в os.devnull -
+                         столько же форматирования и записи, сколько
+                         print() делал до шины событий;
+    консоль -> память    ConsoleReporter, вывод выбрасывается NullWriter
+                         (только форматирование строк);
+    тихий режим          подписчиков нет: события не создаются.
+Для каждого режима печатается число операций в секунду и ускорение
+относительно вывода в файл.
+"""
+import argparse
+import contextlib
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _common import NullWriter
+from GameField import GameField
+from Events import bus, ConsoleReporter
+from Landscape import TERRAIN_CODES, TerrainType
+from Units import Knight, Swordsman
+
+
+def build_field(pairs):
+    """Поле-равнина: в каждой строке мечник в столбце 0 и рыцарь в столбце 1"""
+    random.seed(1)
+    width = 4
+    field = GameField(width, pairs, max_units=pairs * 2)
+    plain = TERRAIN_CODES[TerrainType.PLAIN]
+    for index in range(width * pairs):
+        field.terrain[index] = plain
+    with contextlib.redirect_stdout(NullWriter()):
+        for y in range(pairs):
+            field.add_unit(Swordsman(), 0, y)
+            field.add_unit(Knight(), 1, y)
+    return field
+
+
+def run_moves(field, ops):
+    knights = [unit for unit in field.units if isinstance(unit, Knight)]
+    started = time.perf_counter()
+    for index in range(ops):
+        unit = knights[index % len(knights)]
+        # рыцарь ходит между столбцами 1 и 2
+        field.move_unit(unit, 2 if unit.x == 1 else 1, unit.y)
+    return ops / (time.perf_counter() - started)
+
+
+def run_attacks(field, ops):
+    knights = [unit for unit in field.units if isinstance(unit, Knight)]
+    started = time.perf_counter()
+    for index in range(ops):
+        unit = knights[index % len(knights)]
+        target = field.get_unit_at(0, unit.y)
+        field.attack_unit(unit, 0, unit.y)
+        target.health = target.max_health
+    return ops / (time.perf_counter() - started)
+
+
+def measure(mode, ops, pairs):
+    field = build_field(pairs)
+    reporter = ConsoleReporter()
+    if mode != "quiet":
+        reporter.attach()
+    sink = open(os.devnull, "w", encoding="utf-8") if mode == "file" else NullWriter()
+    try:
+        with contextlib.redirect_stdout(sink):
+            moves = run_moves(field, ops)
+            attacks = run_attacks(field, ops)
+    finally:
+        reporter.detach()
+        if mode == "file":
+            sink.close()
+    return moves, attacks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=20_000)
+    parser.add_argument("--pairs", type=int, default=100)
+    args = parser.parse_args()
+
+    modes = (("file", "консоль -> файл"), ("memory", "консоль -> память"), ("quiet", "тихий режим"))
+    print(f"{'режим':>18} | {'move_unit, оп/с':>16} | {'attack_unit, оп/с':>18} | {'ускорение':>14}")
+    print("-" * 76)
+    reference = None
+    for mode, title in modes:
+        moves, attacks = measure(mode, args.ops, args.pairs)
+        if reference is None:
+            reference = (moves, attacks)
+        print(f"{title:>18} | {moves:>16,.0f} | {attacks:>18,.0f} | "
+              f"{moves / reference[0]:>5.2f}x / {attacks / reference[1]:.2f}x")
+    if bus.active:
+        print("❌ После бенчмарка на шине остались подписчики")
+
+
+if __name__ == "__main__":
+    main()
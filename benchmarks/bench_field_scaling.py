@@ -0,0 +1,92 @@
+"""Бенчмарк масштабирования GameField: стоимость одной операции
+add_unit / move_unit / remove_unit при росте числа юнитов.
+
+Запуск:
+    python benchmarks/bench_field_scaling.py [--counts 10,100,1000,10000,100000]
+
+При индексах id -> юнит, позиция -> объект и юнит -> база время одной
+операции не должно расти вместе с количеством юнитов на поле.
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _common import quiet
+from Base import Base
+from GameField import GameField
+from Units import Swordsman
+
+SAMPLE_OPS = 2000
+
+
+def build_field(count, rng):
+    side = max(8, int(math.sqrt((count + SAMPLE_OPS) * 4)) + 1)
+    field = GameField(side, side, max_units=count + SAMPLE_OPS + 1)
+    field.terrain[:] = bytes(len(field.terrain))  # равнина: стоимость хода не мешает замеру
+    bases = []
+    for index in range(max(1, count // 1000)):
+        base = Base(f"База {index}", max_units=count)
+        field.add_base(base, index % side, side - 1 - (index // side))
+        bases.append(base)
+    cells = [(x, y) for y in range(side) for x in range(side) if field.is_cell_empty(x, y)]
+    rng.shuffle(cells)
+    for index in range(count):
+        unit = Swordsman()
+        base = bases[index % len(bases)]
+        x, y = cells.pop()
+        field.add_unit(unit, x, y, owner=base)
+        base.owned_units.append(unit)
+    return field, bases, cells
+
+
+def per_op_us(func, items):
+    started = time.perf_counter()
+    for item in items:
+        func(*item)
+    return (time.perf_counter() - started) / max(1, len(items)) * 1e6
+
+
+def run_case(count, rng):
+    field, bases, free_cells = build_field(count, rng)
+
+    new_units = [(Swordsman(), *free_cells.pop(), bases[0]) for _ in range(SAMPLE_OPS)]
+    add_us = per_op_us(lambda unit, x, y, base: field.add_unit(unit, x, y, owner=base), new_units)
+
+    units = field.units
+    moves = []
+    for unit in rng.sample(units, min(SAMPLE_OPS, len(units))):
+        x, y = unit.get_position()
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if field.can_place(unit, nx, ny) and not field.get_entity_at(nx, ny):
+                moves.append((unit, nx, ny))
+                break
+    move_us = per_op_us(field.move_unit, moves)
+
+    victims = [(unit,) for unit in rng.sample(field.units, min(SAMPLE_OPS, field.unit_count))]
+    remove_us = per_op_us(field.remove_unit, victims)
+    return add_us, move_us, remove_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", default="10,100,1000,10000,100000")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    random.seed(args.seed)
+    print(f"{'юнитов':>8} | {'add_unit, мкс':>14} | {'move_unit, мкс':>15} | {'remove_unit, мкс':>17}")
+    print("-" * 64)
+    for count in (int(value) for value in args.counts.split(",")):
+        with quiet():
+            add_us, move_us, remove_us = run_case(count, rng)
+        print(f"{count:>8} | {add_us:>14.2f} | {move_us:>15.2f} | {remove_us:>17.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Бенчмарк движения армии к базе: пути каждого юнита против полей потока.
+
+Запуск:
+    python benchmarks/bench_flow_fields.py [--size 60] [--units 100] [--turns 15]
+
+Армия (рыцари и мечники) стоит у левого края карты, вражеская база - у
+правого. Карта - равнина с 20% препятствий: пехота с move_range 1 ходит
+только по равнине, поэтому на карте генератора она заперта в островках. Сравниваются два способа сделать turns ходов:
+
+    по одному       каждый юнит сам ищет путь до базы (алгоритм Дейкстры
+                    по полю стоимости) и идет по нему через move_unit;
+    move_group      один вызов GameField.move_group на ход: поле потока
+                    строится один раз на класс передвижения, следующий
+                    шаг юнит читает за O(1).
+
+Печатается время хода, число перемещений и средняя стоимость пути до
+базы в конце. Отдельно замеряется смена ландшафта при закэшированных
+полях: частичный пересчет против полного построения поля.
+"""
+import argparse
+import heapq
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _common import quiet
+from Base import Base
+from CostFields import BLOCKED, STOP
+from FlowFields import FlowField, static_cost
+from GameField import GameField
+from Landscape import TerrainType
+from Units import Knight, Swordsman
+
+
+def build_field(size, units):
+    random.seed(1)
+    field = GameField(size, size, max_units=units)
+    base = Base("Враг")
+    rng = random.Random(2)
+    field.terrain[:] = bytes(0 if rng.random() < 0.8 else rng.randrange(1, 4) for _ in range(size * size))
+    with quiet():
+        field.add_base(base, size - 2, size // 2)
+        while field.unit_count < units:
+            unit = Knight() if rng.random() < 0.5 else Swordsman()
+            field.add_unit(unit, rng.randrange(size // 4), rng.randrange(size))
+    return field, base
+
+
+def own_path(field, unit, target):
+    """Путь юнита до цели по стоимостям входа, на которые хватает move_range"""
+    width, height = field.width, field.height
+    costs = field.cost_fields.for_unit(unit).entry_costs
+    terrain = field.terrain
+    budget = unit.move_range
+    start = unit.y * width + unit.x
+    goal = target[1] * width + target[0]
+    distance = {start: 0}
+    previous = {}
+    heap = [(0, start)]
+    while heap:
+        cost, cell = heapq.heappop(heap)
+        if cell == goal:
+            break
+        if cost > distance[cell]:
+            continue
+        y, x = divmod(cell, width)
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if not (0 <= nx < width and 0 <= ny < height):
+                continue
+            neighbour = ny * width + nx
+            entry = costs[terrain[neighbour]]
+            # базы и объекты непроходимы, юниты - как и для поля потока - нет
+            if neighbour == goal:
+                entry = entry or 1
+            elif not entry or entry > budget or static_cost(costs, terrain[neighbour],
+                                                            field.occupants.get((nx, ny))) == BLOCKED:
+                continue
+            if cost + entry < distance.get(neighbour, cost + entry + 1):
+                distance[neighbour] = cost + entry
+                previous[neighbour] = cell
+                heapq.heappush(heap, (cost + entry, neighbour))
+    if goal not in previous:
+        return []
+    path = [goal]
+    while path[-1] != start:
+        path.append(previous[path[-1]])
+    path.reverse()
+    return path[1:]
+
+
+def solo_turn(field, units, target):
+    """Ход, в котором каждый юнит ищет свой путь и идет по нему"""
+    width = field.width
+    moved = 0
+    for unit in units:
+        costs = field.cost_fields.costs_for(unit)
+        budget = unit.move_range
+        destination = None
+        for cell in own_path(field, unit, target):
+            entry = costs[cell]
+            if entry == BLOCKED or entry & STOP or entry > budget:
+                break
+            budget -= entry
+            destination = cell
+        if destination is not None:
+            y, x = divmod(destination, width)
+            if field.move_unit(unit, x, y):
+                moved += 1
+    return moved
+
+
+def group_turn(field, units, target):
+    return sum(position is not None for position in field.move_group(units, target))
+
+
+def run(turn, size, units, turns):
+    field, base = build_field(size, units)
+    army = field.units
+    target = base.get_position()
+    moves = 0
+    started = time.perf_counter()
+    with quiet():
+        for _ in range(turns):
+            moves += turn(field, army, target)
+    elapsed = time.perf_counter() - started
+    distances = [field.flow_field(*target, unit).distance_at(unit.x, unit.y) for unit in army]
+    distances = [distance for distance in distances if distance is not None]
+    return elapsed / turns, moves, sum(distances) / max(1, len(distances)), field
+
+
+def bench_terrain_changes(field, changes):
+    """Смена ландшафта при закэшированных полях потока и полное построение"""
+    rng = random.Random(4)
+    kinds = list(TerrainType)
+    flows = field.flow_fields
+    recomputed = flows.recomputed
+    started = time.perf_counter()
+    with quiet():
+        for _ in range(changes):
+            field.set_terrain(rng.randrange(field.width), rng.randrange(field.height), rng.choice(kinds))
+    partial = (time.perf_counter() - started) / changes
+    cells = (flows.recomputed - recomputed) / changes
+    flow = next(iter(flows._fields.values()))
+    started = time.perf_counter()
+    FlowField(field, flow.target, flow.entry_costs)
+    return partial, cells, time.perf_counter() - started, len(flows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=60)
+    parser.add_argument("--units", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=15)
+    parser.add_argument("--changes", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"Поле {args.size}x{args.size}, юнитов: {args.units}, ходов: {args.turns}")
+    print(f"{'способ':>12} | {'мс на ход':>10} | {'перемещений':>11} | {'ср. путь до базы':>16}")
+    print("-" * 60)
+    field = None
+    for title, turn in (("по одному", solo_turn), ("move_group", group_turn)):
+        per_turn, moves, remaining, field = run(turn, args.size, args.units, args.turns)
+        print(f"{title:>12} | {per_turn * 1000:>10.2f} | {moves:>11} | {remaining:>16.1f}")
+
+    partial, cells, full, cached = bench_terrain_changes(field, args.changes)
+    print(f"\nСмена ландшафта при {cached} полях потока в кэше:")
+    print(f"    частичный пересчет: {partial * 1000:.3f} мс на клетку, в среднем {cells:.0f} клеток")
+    print(f"    полное построение поля: {full * 1000:.2f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Бенчмарк накладных расходов Profiler на move_unit/attack_unit.
+
+Запуск:
+    python benchmarks/bench_profiling.py [--ops 20000]
+
+Режимы:
+    без замеров        Profiler создан, но не включен - исходные методы;
+    после замеров      замеры включали и выключили обратно;
+    замеры             включено время и счетчики вызовов;
+    замеры + память    дополнительно учет памяти через tracemalloc.
+Печатается число операций в секунду и замедление относительно режима
+без замеров.
+"""
+import argparse
+import contextlib
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _common import NullWriter
+from GameField import GameField
+from Landscape import TERRAIN_CODES, TerrainType
+from Profiling import Profiler
+from Units import Knight, Swordsman
+
+
+def build_field(pairs):
+    """Поле-равнина: в каждой строке мечник в столбце 0 и рыцарь в столбце 1"""
+    random.seed(1)
+    width = 4
+    field = GameField(width, pairs, max_units=pairs * 2)
+    plain = TERRAIN_CODES[TerrainType.PLAIN]
+    for index in range(width * pairs):
+        field.terrain[index] = plain
+    with contextlib.redirect_stdout(NullWriter()):
+        for y in range(pairs):
+            field.add_unit(Swordsman(), 0, y)
+            field.add_unit(Knight(), 1, y)
+    return field
+
+
+def run(field, ops):
+    knights = [unit for unit in field.units if isinstance(unit, Knight)]
+    started = time.perf_counter()
+    for index in range(ops):
+        unit = knights[index % len(knights)]
+        field.move_unit(unit, 2 if unit.x == 1 else 1, unit.y)
+    moves = ops / (time.perf_counter() - started)
+    started = time.perf_counter()
+    for index in range(ops):
+        unit = knights[index % len(knights)]
+        target = field.get_unit_at(0, unit.y)
+        field.attack_unit(unit, 0, unit.y)
+        target.health = target.max_health
+    return moves, ops / (time.perf_counter() - started)
+
+
+def measure(mode, ops, pairs):
+    field = build_field(pairs)
+    profiler = Profiler(track_memory=mode == "memory")
+    if mode == "after":
+        profiler.enable()
+        profiler.disable()
+    elif mode in ("on", "memory"):
+        profiler.enable()
+    try:
+        return run(field, ops)
+    finally:
+        profiler.disable()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=20_000)
+    parser.add_argument("--pairs", type=int, default=100)
+    args = parser.parse_args()
+
+    modes = (("off", "без замеров"), ("after", "после замеров"), ("on", "замеры"),
+             ("memory", "замеры + память"))
+    print(f"{'режим':>16} | {'move_unit, оп/с':>16} | {'attack_unit, оп/с':>18} | {'замедление':>14}")
+    print("-" * 74)
+    reference = None
+    for mode, title in modes:
+        moves, attacks = measure(mode, args.ops, args.pairs)
+        if reference is None:
+            reference = (moves, attacks)
+        print(f"{title:>16} | {moves:>16,.0f} | {attacks:>18,.0f} | "
+              f"{reference[0] / moves:>5.2f}x / {reference[1] / attacks:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
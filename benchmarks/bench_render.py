@@ -0,0 +1,164 @@
+"""Бенчмарк вывода поля: полный кадр FieldRenderer и режим разностей.
+
+Запуск:
+    python benchmarks/bench_render.py [--sizes 100,500,1000] [--changes 10,100,1000] [--chunked 5000]
+
+Для каждого размера карты печатает время первого кадра (построение
+буфера), повторного кадра без изменений, а также время и объем вывода
+render_diff после заданного числа перемещений юнитов. Объем и время
+кадра разностей должны зависеть от числа изменений, а не от размера карты.
+
+Вторая таблица - окно просмотра 40x20 и миникарта под терминал 120x40
+после 100 перемещений: их время ограничено размером терминала.
+
+Третья - те же окно и миникарта на чанковой карте chunked x chunked
+(ChunkedTerrain): создание рендерера, первый вывод окна, построение
+миникарты и ее кадр, а также сколько чанков сгенерировано. Ни один вывод
+не должен генерировать карту целиком.
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _common import quiet
+from GameField import GameField
+from Renderer import FieldRenderer, Viewport, Minimap
+from Units import Swordsman
+
+
+class FakeTerminal(io.StringIO):
+    """Поток, который выдает себя за терминал с поддержкой ANSI"""
+
+    def isatty(self):
+        return True
+
+
+def build_field(size, rng):
+    field = GameField(size, size, max_units=size * size)
+    field.terrain[:] = bytes(len(field.terrain))
+    cells = [(x, y) for y in range(size) for x in range(size)]
+    rng.shuffle(cells)
+    for x, y in cells[:size * size // 10]:
+        field.add_unit(Swordsman(), x, y)
+    return field
+
+
+def build_chunked_field(size, units, rng):
+    """Чанковая карта с юнитами в окрестности центра"""
+    field = GameField(size, size, max_units=units)
+    center = size // 2
+    while field.unit_count < units:
+        field.add_unit(Swordsman(), center + rng.randrange(-50, 50), center + rng.randrange(-50, 50))
+    return field
+
+
+def move_units(field, count, rng):
+    units = rng.sample(field.units, min(count, field.unit_count))
+    for unit in units:
+        x, y = unit.get_position()
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if field.can_place(unit, nx, ny) and field.get_entity_at(nx, ny) is None:
+                field.move_unit(unit, nx, ny)
+                break
+
+
+def timed(func):
+    started = time.perf_counter()
+    func()
+    return (time.perf_counter() - started) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100,500,1000")
+    parser.add_argument("--changes", default="10,100,1000")
+    parser.add_argument("--chunked", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+    os.environ["LINES"] = "100000"  # кадр разностей требует, чтобы карта помещалась на экран
+
+    rng = random.Random(args.seed)
+    changes = [int(value) for value in args.changes.split(",")]
+    print(f"{'карта':>9} | {'первый кадр, мс':>15} | {'повтор, мс':>10} | "
+          + " | ".join(f"{'diff ' + str(count) + ', мс/байт':>22}" for count in changes))
+    for size in (int(value) for value in args.sizes.split(",")):
+        with quiet():
+            field = build_field(size, rng)
+            terminal = FakeTerminal()
+            renderer = None
+
+            def first_frame():
+                nonlocal renderer
+                renderer = FieldRenderer(field, stream=terminal)
+                renderer.render()
+
+            first = timed(first_frame)
+            repeat = timed(renderer.render)
+            renderer.render_diff()
+            cells = []
+            for count in changes:
+                move_units(field, count, rng)
+                terminal.seek(0)
+                terminal.truncate()
+                elapsed = timed(renderer.render_diff)
+                cells.append(f"{elapsed:>10.2f} / {len(terminal.getvalue()):>9}")
+        print(f"{size:>4}x{size:<4} | {first:>15.2f} | {repeat:>10.2f} | " + " | ".join(f"{c:>22}" for c in cells))
+
+    os.environ["COLUMNS"], os.environ["LINES"] = "120", "40"
+    print()
+    print(f"{'карта':>9} | {'окно 40x20, мс':>14} | {'миникарта, мс':>13} | {'блок':>5}")
+    for size in (int(value) for value in args.sizes.split(",")):
+        with quiet():
+            field = build_field(size, rng)
+            renderer = FieldRenderer(field, stream=io.StringIO())
+            viewport = Viewport(field, 40, 20)
+            viewport.center_on(size // 2, size // 2)
+            minimap = renderer.get_minimap()
+            move_units(field, 100, rng)
+            window = timed(lambda: renderer.render_viewport(viewport))
+            move_units(field, 100, rng)
+            overview = timed(lambda: renderer.render_minimap(viewport=viewport))
+        print(f"{size:>4}x{size:<4} | {window:>14.2f} | {overview:>13.2f} | {minimap.block:>5}")
+
+    size = args.chunked
+    with quiet():
+        field = build_chunked_field(size, 200, rng)
+        terrain = field.terrain
+        before = terrain.generated
+        renderer = None
+
+        def create():
+            nonlocal renderer
+            renderer = FieldRenderer(field, stream=io.StringIO())
+
+        created = timed(create)
+        viewport = Viewport(field, 40, 20)
+        viewport.center_on(size // 2, size // 2)
+        window = timed(lambda: renderer.render_viewport(viewport))
+        minimap = None
+
+        def build_minimap():
+            nonlocal minimap
+            minimap = Minimap(field, Minimap.block_for_terminal(field))
+
+        built = timed(build_minimap)
+        renderer.minimap = minimap
+        move_units(field, 100, rng)
+        overview = timed(lambda: renderer.render_minimap(viewport=viewport))
+        repeat = timed(lambda: renderer.render_minimap(viewport=viewport))
+    chunks = (size // terrain.chunk_size + 1) ** 2
+    print()
+    print(f"Чанковая карта {size}x{size}, блок миникарты {minimap.block}, "
+          f"чанков сгенерировано: {terrain.generated - before} из {chunks} (до вывода: {before})")
+    print(f"{'рендерер, мс':>12} | {'окно, мс':>8} | {'миникарта, мс':>13} | "
+          f"{'кадр миникарты, мс':>18} | {'повтор, мс':>10}")
+    print(f"{created:>12.2f} | {window:>8.2f} | {built:>13.2f} | {overview:>18.2f} | {repeat:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""Нагрузочный клиент GameServer: простаивающие и активные сессии.
+
+Запуск:
+    python benchmarks/bench_server.py [--idle 2000] [--active 200] [--duration 5]
+    python benchmarks/bench_server.py --connect 127.0.0.1:8765   # внешний сервер
+
+Без --connect сервер запускается в том же процессе и цикле событий, что
+и клиенты (на одном ядре они все равно делят процессор). Клиент
+открывает idle простаивающих сессий, затем active сессий, которые
+создают партию и duration секунд шлют команды по одной: перемещения и
+атаки юнитов, создание юнитов и завершение хода. Цели команд берутся из
+состояния партии (state), чтобы замер состоял из настоящих ходов, а не
+из дешевых отказов. Печатается число запросов в секунду, задержки
+(медиана и 99-й процентиль), прирост памяти процесса на простаивающую
+сессию и доля отказов с их кодами.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _common import quiet
+from Base import Base
+from GameServer import GameServer
+
+# Стоимость юнитов, которых создает клиент
+UNIT_COSTS = {unit_type: cost for unit_type, cost in Base("").unit_costs.items()
+              if unit_type in ("swordsman", "crossbowman", "knight", "healer")}
+# Юнитов на поле и у базы (Base по умолчанию)
+MAX_UNITS = 30
+BASE_CAPACITY = Base("").max_units
+STEPS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+def rss_kb() -> int:
+    """Текущий размер резидентной памяти процесса, КБ"""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() // 1024
+
+
+class Client:
+    """Одна сессия: запрос - ответ по одной строке"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 1
+
+    @classmethod
+    async def connect(cls, host, port):
+        reader, writer = await asyncio.open_connection(host, port, limit=1024 * 1024)
+        client = cls(reader, writer)
+        hello = json.loads(await reader.readline())
+        if not hello["ok"]:
+            raise ConnectionError(hello["error"])
+        return client
+
+    async def call(self, action, **params):
+        request = dict(params, action=action, id=self.next_id)
+        self.next_id += 1
+        self.writer.write(json.dumps(request).encode("utf-8") + b"\n")
+        return json.loads(await self.reader.readline())
+
+    def close(self):
+        self.writer.close()
+
+
+class GameView:
+    """Что клиент знает о своей партии: юниты, занятые клетки, ресурсы базы
+    и клетки, куда юниты этого вида уже не смогли пройти из-за ландшафта"""
+
+    def __init__(self, width, height, state, blocked):
+        self.width = width
+        self.height = height
+        self.blocked = blocked
+        self.units = {unit["id"]: (unit["x"], unit["y"]) for unit in state["units"]}
+        self.kinds = {unit["id"]: unit["name"] for unit in state["units"]}
+        self.occupied = set(self.units.values()) | {(base["x"], base["y"]) for base in state["bases"]}
+        self.resources = state["bases"][0]["resources"] if state["bases"] else 0
+
+    def free_steps(self, unit_id):
+        x, y = self.units[unit_id]
+        kind = self.kinds[unit_id]
+        return [(x + dx, y + dy) for dx, dy in STEPS
+                if 0 <= x + dx < self.width and 0 <= y + dy < self.height
+                and (x + dx, y + dy) not in self.occupied
+                and (kind, x + dx, y + dy) not in self.blocked]
+
+    def moved(self, unit_id, x, y):
+        self.occupied.discard(self.units[unit_id])
+        self.units[unit_id] = (x, y)
+        self.occupied.add((x, y))
+
+
+def choose_command(view, rng):
+    """Команда с допустимой целью; отказать может разве что ландшафт клетки"""
+    roll = rng.random()
+    unit_id = rng.choice(list(view.units))
+    if roll < 0.6:
+        cells = view.free_steps(unit_id)
+        if cells:
+            x, y = rng.choice(cells)
+            return "move", {"unit_id": unit_id, "x": x, "y": y}
+    if roll < 0.85 and len(view.units) > 1:
+        target = rng.choice([other for other in view.units if other != unit_id])
+        x, y = view.units[target]
+        return "attack", {"unit_id": unit_id, "x": x, "y": y}
+    affordable = [unit_type for unit_type, cost in UNIT_COSTS.items() if cost <= view.resources]
+    if roll < 0.95 and affordable and len(view.units) < BASE_CAPACITY:
+        return "create_unit", {"base": 0, "unit_type": rng.choice(affordable)}
+    return "next_turn", {}
+
+
+async def play(client, deadline, rng, latencies, counters):
+    """Активная сессия: партия и поток игровых команд до deadline"""
+    game = await client.call("new_game", width=12, height=12, max_units=MAX_UNITS, seed=rng.getrandbits(32))
+    width, height = game["data"]["width"], game["data"]["height"]
+    view = None
+    blocked = set()
+    while time.perf_counter() < deadline:
+        if view is None:
+            # состояние перечитывается после команд, меняющих состав партии
+            view = GameView(width, height, (await client.call("state"))["data"], blocked)
+            if not view.units:
+                break
+        action, params = choose_command(view, rng)
+        started = time.perf_counter()
+        response = await client.call(action, **params)
+        latencies.append(time.perf_counter() - started)
+        counters["requests"] += 1
+        if not response["ok"]:
+            code = response.get("error_code") or "unknown"
+            counters["errors"][code] = counters["errors"].get(code, 0) + 1
+            if action == "move":
+                blocked.add((view.kinds[params["unit_id"]], params["x"], params["y"]))
+        elif action == "move":
+            view.moved(params["unit_id"], response["data"]["x"], response["data"]["y"])
+        else:
+            view = None
+    await client.call("quit")
+    client.close()
+
+
+async def run(args):
+    server = None
+    if args.connect:
+        host, port = args.connect.rsplit(":", 1)
+        port = int(port)
+    else:
+        with quiet():
+            # сервер в том же процессе читает файл конфигурации
+            server = GameServer(max_sessions=args.idle + args.active + 10)
+        await server.start("127.0.0.1", 0)
+        host, port = server.address[:2]
+
+    before = rss_kb()
+    idle = []
+    for _ in range(args.idle):
+        idle.append(await Client.connect(host, port))
+    idle_kb = (rss_kb() - before) / max(args.idle, 1)
+
+    active = [await Client.connect(host, port) for _ in range(args.active)]
+    latencies = []
+    counters = {"requests": 0, "errors": {}}
+    started = time.perf_counter()
+    deadline = started + args.duration
+    rng = random.Random(args.seed)
+    await asyncio.gather(*(play(client, deadline, random.Random(rng.getrandbits(32)), latencies, counters)
+                           for client in active))
+    elapsed = time.perf_counter() - started
+
+    for client in idle:
+        client.close()
+    if server is not None:
+        await server.close()
+
+    latencies.sort()
+    count = len(latencies)
+    print(f"Простаивающих сессий: {args.idle}, активных: {args.active}, {args.duration} с")
+    print(f"{'показатель':>28} | {'значение':>12}")
+    print("-" * 44)
+    print(f"{'запросов в секунду':>28} | {counters['requests'] / elapsed:>12,.0f}")
+    if count:
+        print(f"{'задержка, медиана, мс':>28} | {latencies[count // 2] * 1000:>12.2f}")
+        print(f"{'задержка, 99%, мс':>28} | {latencies[min(count - 1, count * 99 // 100)] * 1000:>12.2f}")
+    print(f"{'память на простой, КБ':>28} | {idle_kb:>12.1f}")
+    errors = sum(counters["errors"].values())
+    print(f"{'отказов игры':>28} | {errors / max(counters['requests'], 1):>11.0%}")
+    for code, count in sorted(counters["errors"].items(), key=lambda item: -item[1]):
+        print(f"{code:>28} | {count:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--idle", type=int, default=2000)
+    parser.add_argument("--active", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--connect", help="адрес внешнего сервера host:port")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
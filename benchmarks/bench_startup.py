@@ -0,0 +1,162 @@
+"""Бенчмарк холодного старта: время импорта по python -X importtime.
+
+Запуск:
+    python benchmarks/bench_startup.py                      # проверка по benchmarks/startup.json
+    python benchmarks/bench_startup.py --save-baseline benchmarks/startup.json
+    python benchmarks/bench_startup.py --baseline other.json --threshold 0.25
+    python benchmarks/bench_startup.py --no-baseline        # только проверка модулей
+
+Каждый сценарий запускается runs раз в новом процессе интерпретатора с
+-X importtime. Время импорта сценария - сумма cumulative времени
+модулей верхнего уровня, которых нет в пустом запуске интерпретатора
+(site, encodings и т.п. не считаются); берется медиана по запускам.
+
+Проверки (код выхода 1 при нарушении):
+    модули      каждый сценарий может загружать только модули игры из
+                ALLOWED_MODULES - появление лишнего модуля (например,
+                Renderer в безголовом движке) считается регрессией
+                независимо от шума времени;
+    время       медиана сценария не должна вырасти больше чем на threshold
+                относительно базового отчета: по умолчанию это
+                benchmarks/startup.json из репозитория. Время зависит от
+                машины, поэтому после смены окружения базовый отчет нужно
+                сохранить заново (--save-baseline).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Базовый отчет, с которым сравнивается время импорта по умолчанию
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "startup.json")
+
+# Модули игры (файлы *.py в корне репозитория)
+GAME_MODULES = frozenset(name[:-3] for name in os.listdir(ROOT)
+                         if name.endswith(".py") and name[0].isupper() or name == "utilities.py")
+
+# Ядро поля, без которого не обходится ни один сценарий с игрой
+_FIELD = {"GameField", "Units", "Landscape", "NeutralObject", "Base", "Reachability", "Targeting",
+          "History", "Effects", "Events", "TerrainGenerator", "Lazy", "CostFields"}
+
+# сценарий -> (аргументы интерпретатора, модули игры, которые можно загрузить)
+SCENARIOS = {
+    "help": (["Main.py", "--help"], {"Main"}),
+    "import_main": (["-c", "import Main"], {"Main"}),
+    "engine": (["-c", "import GameEngine"], _FIELD | {"GameEngine"}),
+    "simulator": (["-c", "import BattleSimulator"], _FIELD | {"GameEngine", "BattleSimulator"}),
+    "server": (["-c", "import GameServer"], _FIELD | {"GameEngine", "GameServer", "GameConfig"}),
+}
+ALLOWED_MODULES = {name: allowed for name, (_, allowed) in SCENARIOS.items()}
+
+
+def parse_importtime(stderr: str):
+    """Модули верхнего уровня с cumulative временем (мкс) и множество всех модулей"""
+    top_level = {}
+    modules = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        module = name.strip()
+        modules.add(module)
+        if not name[1:].startswith(" "):
+            top_level[module] = int(cumulative)
+    return top_level, modules
+
+
+def run_once(args):
+    process = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=ROOT,
+                             capture_output=True, text=True, env=dict(os.environ, PYTHONDONTWRITEBYTECODE="0"))
+    if process.returncode != 0:
+        raise RuntimeError(f"Сценарий {' '.join(args)} завершился с кодом {process.returncode}:\n"
+                           f"{process.stderr[-2000:]}")
+    return parse_importtime(process.stderr)
+
+
+def measure(names, runs):
+    interpreter, _ = run_once(["-c", "pass"])
+    results = {}
+    for name in names:
+        args, allowed = SCENARIOS[name]
+        times = []
+        modules = set()
+        for _ in range(runs):
+            top_level, loaded = run_once(args)
+            times.append(sum(us for module, us in top_level.items() if module not in interpreter))
+            modules = loaded
+        game = sorted(modules & GAME_MODULES)
+        results[name] = {
+            "import_ms": round(statistics.median(times) / 1000, 2),
+            "min_ms": round(min(times) / 1000, 2),
+            "modules": len(modules),
+            "game_modules": game,
+            "unexpected": sorted(set(game) - allowed),
+        }
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Сценарии, время импорта которых выросло больше чем на threshold"""
+    regressions = []
+    for name, item in results.items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous or not previous["import_ms"]:
+            continue
+        change = item["import_ms"] / previous["import_ms"] - 1
+        item["change_vs_baseline"] = round(change, 3)
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--save-baseline", help="сохранить отчет как базовый")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE,
+                        help="сравнить с базовым отчетом (по умолчанию benchmarks/startup.json)")
+    parser.add_argument("--no-baseline", action="store_true", help="не сравнивать время импорта")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="допустимый рост времени импорта (0.25 = +25%%)")
+    args = parser.parse_args(argv)
+
+    names = [name for name in args.scenarios.split(",") if name]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"неизвестные сценарии: {', '.join(unknown)}")
+    results = measure(names, args.runs)
+
+    failed = False
+    regressions = []
+    if args.baseline and not args.no_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+
+    print(f"{'сценарий':>12} | {'импорт, мс':>10} | {'мин, мс':>8} | {'модулей':>8} | {'модулей игры':>12} | изменение")
+    print("-" * 80)
+    for name, item in results.items():
+        change = item.get("change_vs_baseline")
+        print(f"{name:>12} | {item['import_ms']:>10.1f} | {item['min_ms']:>8.1f} | {item['modules']:>8} | "
+              f"{len(item['game_modules']):>12} | {'' if change is None else f'{change:+.0%}'}")
+    for name, item in results.items():
+        if item["unexpected"]:
+            failed = True
+            print(f"❌ {name}: лишние модули игры при старте: {', '.join(item['unexpected'])}", file=sys.stderr)
+    for name in regressions:
+        failed = True
+        print(f"❌ {name}: время импорта выросло на {results[name]['change_vs_baseline']:+.0%}", file=sys.stderr)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "scenarios": results}, f, ensure_ascii=False, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
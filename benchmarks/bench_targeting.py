@@ -0,0 +1,112 @@
+"""Бенчмарк поиска целей: GameField.targets_in_range против полного перебора.
+
+Запуск:
+    python benchmarks/bench_targeting.py [--size 200] [--units 4000] [--rounds 5]
+
+На плотно заселенном поле двух враждующих баз каждый ход все баллисты
+(радиус 6) и арбалетчики (радиус 4) ищут цели. Сравниваются перебор всех
+юнитов поля и запрос по корзинам SpatialGrid, без учета и с учетом линии
+видимости. Между ходами часть юнитов перемещается, ландшафт не меняется,
+поэтому множества видимости берутся из кэша LineOfSight - печатается
+доля попаданий. Результаты быстрых путей сверяются с перебором.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _common import quiet
+from Base import Base
+from GameField import GameField
+from Units import Ballista, Crossbowman, Swordsman, Knight
+
+UNIT_CLASSES = (Ballista, Crossbowman, Swordsman, Knight)
+
+
+def build_field(size, count, seed):
+    rng = random.Random(seed)
+    random.seed(seed)
+    field = GameField(size, size, max_units=count)
+    bases = [Base("Север", max_units=count), Base("Юг", max_units=count)]
+    field.add_base(bases[0], 0, 0)
+    field.add_base(bases[1], size - 1, size - 1)
+    cells = [(x, y) for y in range(size) for x in range(size) if field.is_cell_empty(x, y)]
+    rng.shuffle(cells)
+    while field.unit_count < count and cells:
+        x, y = cells.pop()
+        base = bases[x * 2 // size]
+        unit = rng.choice(UNIT_CLASSES)()
+        if field.add_unit(unit, x, y, owner=base):
+            base.owned_units.append(unit)
+    return field
+
+
+def brute_force(field, unit, line_of_sight):
+    """Эталон: все юниты поля, без индекса и без кэша видимости"""
+    radius = getattr(unit, "attack_range", 1)
+    owner = field.get_unit_owner(unit)
+    targets = []
+    for other in field.units:
+        distance = abs(other.x - unit.x) + abs(other.y - unit.y)
+        if other is unit or distance > radius or field.get_unit_owner(other) is owner:
+            continue
+        if line_of_sight and not field.sight.is_clear(unit.x, unit.y, other.x, other.y):
+            continue
+        targets.append(other)
+    targets.sort(key=lambda target: (abs(target.x - unit.x) + abs(target.y - unit.y), target.id))
+    return targets
+
+
+def shuffle_units(field, rng, share=0.1):
+    """Переместить часть юнитов на соседние свободные клетки"""
+    for unit in rng.sample(field.units, int(len(field.units) * share)):
+        x, y = unit.x + rng.choice((-1, 1)), unit.y + rng.choice((-1, 1))
+        if field._is_valid_position(x, y) and field.is_cell_empty(x, y):
+            field._relocate_unit(unit, x, y)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=200)
+    parser.add_argument("--units", type=int, default=4000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    with quiet():
+        field = build_field(args.size, args.units, args.seed)
+    shooters = [unit for unit in field.units if hasattr(unit, "attack_range")]
+    print(f"Поле {args.size}x{args.size}, юнитов {field.unit_count}, стрелков {len(shooters)}, "
+          f"ходов {args.rounds}")
+
+    rng = random.Random(args.seed)
+    timings = {"перебор": 0.0, "корзины": 0.0, "перебор + LOS": 0.0, "корзины + LOS": 0.0}
+    mismatches = 0
+    for _ in range(args.rounds):
+        for line_of_sight in (False, True):
+            started = time.perf_counter()
+            expected = [brute_force(field, unit, line_of_sight) for unit in shooters]
+            timings["перебор + LOS" if line_of_sight else "перебор"] += time.perf_counter() - started
+
+            started = time.perf_counter()
+            found = [field.targets_in_range(unit, line_of_sight) for unit in shooters]
+            timings["корзины + LOS" if line_of_sight else "корзины"] += time.perf_counter() - started
+            mismatches += sum(1 for a, b in zip(expected, found) if a != b)
+        shuffle_units(field, rng)
+
+    print(f"{'способ':>14} | {'мс за ход':>10}")
+    print("-" * 27)
+    for name, total in timings.items():
+        print(f"{name:>14} | {total / args.rounds * 1000:>10.1f}")
+    sight = field.sight
+    print(f"Кэш видимости: попаданий {sight.hits}, промахов {sight.misses} "
+          f"({sight.hits / max(1, sight.hits + sight.misses):.0%})")
+    print("✅ Результаты совпадают с перебором" if not mismatches
+          else f"❌ Расхождений с перебором: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
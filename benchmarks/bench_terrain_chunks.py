@@ -0,0 +1,86 @@
+"""Бенчмарк ленивого ландшафта по чанкам на мире 100000x100000.
+
+Запуск:
+    python benchmarks/bench_terrain_chunks.py [--size 100000] [--units 200] [--steps 20]
+
+Создает GameField огромного размера (ландшафт - ChunkedTerrain),
+расставляет юнитов группами и двигает их случайными ходами. Печатает
+время, число сгенерированных и выгруженных чанков и пиковую память.
+Затем проверяет, что чанки, выгруженные из LRU-кэша, генерируются
+заново теми же.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _common import quiet
+from GameField import GameField
+from TerrainStore import ChunkedTerrain
+from Units import Swordsman, Knight
+
+
+def walk(size, units, steps, rng):
+    field = GameField(size, size, max_units=units)
+    groups = max(1, units // 20)
+    centers = [(rng.randrange(size), rng.randrange(size)) for _ in range(groups)]
+    placed = 0
+    while placed < units:
+        cx, cy = centers[placed % groups]
+        x = min(size - 1, max(0, cx + rng.randint(-20, 20)))
+        y = min(size - 1, max(0, cy + rng.randint(-20, 20)))
+        if field.add_unit(rng.choice((Swordsman, Knight))(), x, y):
+            placed += 1
+    for _ in range(steps):
+        for unit in field.units:
+            cells = field.reachable_cells(unit).cells()
+            if cells:
+                field.move_unit(unit, *rng.choice(cells))
+    return field
+
+
+def check_regeneration(seed, rng):
+    """Прочитать клетки, вытеснить их чанки и прочитать снова"""
+    terrain = ChunkedTerrain(100_000, 100_000, seed=seed, memory_limit=4 * 64 * 64)
+    cells = [(rng.randrange(100_000), rng.randrange(100_000)) for _ in range(200)]
+    first = [terrain.code_at(x, y) for x, y in cells]
+    second = [terrain.code_at(x, y) for x, y in reversed(cells)][::-1]
+    return first == second, terrain.evicted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--units", type=int, default=200)
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=9)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    random.seed(args.seed)
+    tracemalloc.start()
+    started = time.perf_counter()
+    with quiet():
+        field = walk(args.size, args.units, args.steps, rng)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    terrain = field.terrain
+    print(f"Мир {args.size}x{args.size}: {args.units} юнитов, {args.steps} ходов за {elapsed:.2f} с")
+    print(f"Чанков: сгенерировано {terrain.generated}, в памяти {terrain.loaded_chunks}, "
+          f"выгружено {terrain.evicted}")
+    print(f"Память ландшафта: {terrain.memory_bytes / 1024:.0f} КБ "
+          f"(плотная карта заняла бы {args.size * args.size / 1024 ** 3:.1f} ГБ), "
+          f"пик процесса: {peak / 1024 ** 2:.1f} МБ")
+
+    same, evicted = check_regeneration(args.seed, rng)
+    print(f"Повторная генерация после выгрузки ({evicted} выгрузок): {'совпадает' if same else 'НЕ СОВПАДАЕТ'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Бенчмарк TerrainGenerator на карте 4000x4000.
+
+Запуск:
+    python benchmarks/bench_terrain_generator.py [--size 4000] [--seed 1]
+
+Для каждого стиля (uniform, noise) печатает время генерации, доли типов
+ландшафта и проверяет, что повторная генерация с тем же зерном дает
+побайтно ту же карту. Для сравнения замеряет старую генерацию по клетке
+(random.random() на каждую клетку) на части карты.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import _common  # noqa: F401  (путь к модулям игры)
+from TerrainGenerator import STYLES, TERRAIN_NAMES, TerrainGenerator
+from Lazy import numpy
+
+
+def per_cell(count, rng):
+    """Прежняя генерация: random.random() и сравнение с порогами на каждую клетку"""
+    codes = bytearray(count)
+    for index in range(count):
+        rand = rng.random()
+        codes[index] = 0 if rand < 0.6 else 1 if rand < 0.8 else 2 if rand < 0.95 else 3
+    return codes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=4000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    cells = args.size * args.size
+    print(f"Карта {args.size}x{args.size}, NumPy: {'есть' if numpy() is not None else 'нет'}")
+
+    sample = min(cells, 1_000_000)
+    started = time.perf_counter()
+    per_cell(sample, random.Random(args.seed))
+    estimate = (time.perf_counter() - started) * cells / sample
+    print(f"  по клетке (оценка по {sample} клеткам): {estimate:.2f} с")
+
+    for style in STYLES:
+        started = time.perf_counter()
+        terrain = TerrainGenerator(style=style).generate(args.size, args.size, args.seed)
+        elapsed = time.perf_counter() - started
+        same = TerrainGenerator(style=style).generate(args.size, args.size, args.seed) == terrain
+        shares = ", ".join(f"{name} {terrain.count(code) / cells:.1%}" for code, name in enumerate(TERRAIN_NAMES))
+        print(f"  {style:8}: {elapsed:.2f} с ({shares}); "
+              f"повтор с тем же зерном: {'совпадает' if same else 'НЕ СОВПАДАЕТ'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Бенчмарк памяти: карта ландшафта из объектов против компактного bytearray.
+
+Запуск:
+    python benchmarks/bench_terrain_memory.py [--full]
+
+Старое представление (список списков с отдельным объектом Landscape
+на каждую клетку) для карты 4000x4000 по умолчанию не строится, а
+оценивается по удельному расходу на клетку, измеренному на 1000x1000:
+настоящий замер требует нескольких гигабайт памяти. Флаг --full
+включает честный замер для всех размеров.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from GameField import GameField
+from Landscape import Plain, Forest, Mountain, Swamp
+
+SIZES = [(100, 100), (1000, 1000), (4000, 4000)]
+LEGACY_MEASURE_LIMIT = 1000 * 1000
+
+
+def legacy_terrain(width, height):
+    """Старая генерация: новый объект ландшафта на каждую клетку"""
+    terrain_grid = []
+    for y in range(height):
+        row = []
+        for x in range(width):
+            rand = random.random()
+            if rand < 0.6:
+                row.append(Plain())
+            elif rand < 0.8:
+                row.append(Forest())
+            elif rand < 0.95:
+                row.append(Mountain())
+            else:
+                row.append(Swamp())
+        terrain_grid.append(row)
+    return terrain_grid
+
+
+def compact_terrain(width, height):
+    """Новая генерация: bytearray кодов, общие экземпляры ландшафта"""
+    field = GameField.__new__(GameField)
+    field.width = width
+    field.height = height
+    return field._generate_terrain()
+
+
+def measure(builder, width, height):
+    """Вернуть (байт после построения, секунд на построение)"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = builder(width, height)
+    elapsed = time.perf_counter() - started
+    size, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size, elapsed
+
+
+def fmt_bytes(value):
+    for unit in ("Б", "КБ", "МБ", "ГБ"):
+        if value < 1024 or unit == "ГБ":
+            return f"{value:,.1f} {unit}"
+        value /= 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--full", action="store_true",
+                        help="строить старую карту для всех размеров без оценки")
+    args = parser.parse_args()
+
+    print(f"{'размер':>11} | {'было (объекты)':>22} | {'стало (bytearray)':>18} | {'выигрыш':>8}")
+    print("-" * 70)
+    per_cell = None
+    for width, height in SIZES:
+        cells = width * height
+        if args.full or cells <= LEGACY_MEASURE_LIMIT:
+            legacy_bytes, _ = measure(legacy_terrain, width, height)
+            per_cell = legacy_bytes / cells
+            legacy_label = fmt_bytes(legacy_bytes)
+        else:
+            legacy_bytes = per_cell * cells
+            legacy_label = "~" + fmt_bytes(legacy_bytes) + " (оценка)"
+        compact_bytes, _ = measure(compact_terrain, width, height)
+        ratio = legacy_bytes / compact_bytes
+        print(f"{width:>5}x{height:<5} | {legacy_label:>22} | {fmt_bytes(compact_bytes):>18} | {ratio:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
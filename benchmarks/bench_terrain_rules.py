@@ -0,0 +1,99 @@
+"""Микробенчмарк правил ландшафта: isinstance-цепочки против таблицы правил.
+
+Запуск:
+    python benchmarks/bench_terrain_rules.py [--calls N]
+
+Старые реализации can_pass/get_attack_bonus (локальный импорт и
+isinstance на каждый вызов) воспроизведены здесь для сравнения.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Landscape import TERRAINS, TERRAIN_RULES
+from Units import UnitFactory
+
+
+def legacy_can_pass(terrain, unit):
+    code = terrain.code
+    if code == 1:
+        from Units import Cavalry
+        if isinstance(unit, Cavalry):
+            return unit.move_range >= 2
+        return True
+    if code == 2:
+        from Units import Cavalry
+        return not isinstance(unit, Cavalry)
+    return True
+
+
+def legacy_attack_bonus(terrain, unit):
+    code = terrain.code
+    if code == 1:
+        from Units import Archer
+        if isinstance(unit, Archer):
+            return 1.3
+        return 1.0
+    if code == 2:
+        from Units import Archer
+        if isinstance(unit, Archer):
+            return 1.5
+        return 1.2
+    if code == 3:
+        return 0.8
+    return terrain.attack_modifier
+
+
+def table_can_pass(terrain, unit):
+    return terrain.can_pass(unit)
+
+
+def table_attack_bonus(terrain, unit):
+    return terrain.get_attack_bonus(unit)
+
+
+def table_row_lookup(terrain, unit):
+    return TERRAIN_RULES.row(unit)[terrain.code].passable
+
+
+def run(func, pairs, calls):
+    rounds = max(1, calls // len(pairs))
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for terrain, unit in pairs:
+            func(terrain, unit)
+    elapsed = time.perf_counter() - started
+    return rounds * len(pairs) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    units = [UnitFactory.create_unit(name) for name in UnitFactory.UNIT_TYPES]
+    pairs = [(terrain, unit) for terrain in TERRAINS for unit in units]
+
+    # Обе реализации должны давать одинаковые ответы
+    for terrain, unit in pairs:
+        assert legacy_can_pass(terrain, unit) == table_can_pass(terrain, unit)
+        assert legacy_attack_bonus(terrain, unit) == table_attack_bonus(terrain, unit)
+
+    cases = [
+        ("can_pass (isinstance)", legacy_can_pass),
+        ("can_pass (таблица)", table_can_pass),
+        ("get_attack_bonus (isinstance)", legacy_attack_bonus),
+        ("get_attack_bonus (таблица)", table_attack_bonus),
+        ("TERRAIN_RULES.row()[code]", table_row_lookup),
+    ]
+    print(f"{'операция':<32} | {'вызовов/сек':>14}")
+    print("-" * 49)
+    for label, func in cases:
+        print(f"{label:<32} | {run(func, pairs, args.calls):>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
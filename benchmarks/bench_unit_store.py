@@ -0,0 +1,164 @@
+"""Сравнение памяти и скорости юнитов: объекты с __dict__, __slots__ и UnitStore.
+
+Запуск:
+    python benchmarks/bench_unit_store.py [--units 100000] [--bases 10] [--no-numpy]
+
+Три варианта хранения на одном наборе юнитов:
+    dict  - прежний Unit с __dict__ (копия класса в этом файле);
+    slots - текущий Unit с __slots__ вне хранилища;
+    store - юниты - представления строк UnitStore.
+Если NumPy установлен, store замеряется дважды: с NumPy и без него
+(store-py - проход по массивам array), --no-numpy оставляет только второй.
+Для каждого печатает память на юнит (tracemalloc) и время запросов
+"все живые юниты", "здоровье по базам" и цикла take_damage/heal по всем
+юнитам. Запросы для dict и slots идут по объектам, для store - по столбцам.
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import _common  # noqa: F401  (путь к модулям игры)
+import Lazy
+from Units import Knight, Swordsman, Crossbowman, Healer
+from UnitStore import UnitStore
+from Lazy import numpy
+
+UNIT_CLASSES = (Knight, Swordsman, Crossbowman, Healer)
+
+
+class DictUnit:
+    """Юнит с __dict__ - как Unit до перехода на __slots__"""
+
+    def __init__(self, name, health, armor, attack, move_range=1):
+        self.id = None
+        self.name = name
+        self.max_health = health
+        self.health = health
+        self.armor = armor
+        self.attack = attack
+        self.move_range = move_range
+        self.x = None
+        self.y = None
+
+    def take_damage(self, damage):
+        actual_damage = max(0, damage - self.armor)
+        self.health -= actual_damage
+        return actual_damage
+
+    def heal(self, amount):
+        self.health = min(self.max_health, self.health + amount)
+
+    def is_alive(self):
+        return self.health > 0
+
+
+def build(kind, count, bases, rng):
+    """Создать count юнитов; возвращает (юниты, владельцы по id юнита, хранилище)"""
+    units = []
+    owners = {}
+    store = UnitStore() if kind.startswith("store") else None
+    for index in range(count):
+        prototype = UNIT_CLASSES[index % len(UNIT_CLASSES)]
+        if kind == "dict":
+            sample = prototype()
+            unit = DictUnit(sample.name, sample.health, sample.armor, sample.attack, sample.move_range)
+        else:
+            unit = prototype()
+        unit.id = index
+        unit.x, unit.y = rng.randrange(1000), rng.randrange(1000)
+        # часть юнитов погибла
+        if rng.random() < 0.1:
+            unit.health = 0
+        owner = index % bases
+        if store is not None:
+            store.add(unit, owner)
+        else:
+            owners[unit.id] = owner
+        units.append(unit)
+    return units, owners, store
+
+
+def measure_memory(kind, count, bases):
+    tracemalloc.start()
+    result = build(kind, count, bases, random.Random(1))
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current / count
+
+
+def timed(func, repeats=5):
+    best = float("inf")
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            started = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - started)
+    finally:
+        gc.enable()
+    return best
+
+
+def queries(kind, units, owners, store):
+    if store is not None:
+        alive = store.alive_units
+        by_owner = store.health_by_owner
+    else:
+        def alive():
+            return [unit for unit in units if unit.is_alive()]
+
+        def by_owner():
+            totals = {}
+            for unit in units:
+                if unit.health > 0:
+                    owner = owners[unit.id]
+                    totals[owner] = totals.get(owner, 0) + unit.health
+            return totals
+
+    def damage_and_heal():
+        for unit in units:
+            unit.take_damage(30)
+        for unit in units:
+            unit.heal(30)
+
+    return alive, by_owner, damage_and_heal
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--units", type=int, default=100_000)
+    parser.add_argument("--bases", type=int, default=10)
+    parser.add_argument("--no-numpy", action="store_true")
+    args = parser.parse_args()
+    if args.no_numpy:
+        Lazy._modules["numpy"] = None
+    has_numpy = numpy() is not None
+
+    print(f"{args.units} юнитов, {args.bases} баз, NumPy: {'есть' if has_numpy else 'нет'}")
+    print(f"{'вариант':>8} | {'байт/юнит':>10} | {'живые, мс':>10} | {'HP по базам, мс':>16} | {'урон+лечение, мс':>17}")
+    reference = None
+    kinds = ("dict", "slots", "store", "store-py") if has_numpy else ("dict", "slots", "store-py")
+    for kind in kinds:
+        if kind == "store-py":
+            Lazy._modules["numpy"] = None
+        per_unit = measure_memory(kind, args.units, args.bases)
+        units, owners, store = build(kind, args.units, args.bases, random.Random(1))
+        alive, by_owner, damage_and_heal = queries(kind, units, owners, store)
+        totals = by_owner()
+        if reference is None:
+            reference = (len(alive()), totals)
+        elif (len(alive()), totals) != reference:
+            print(f"❌ {kind}: результаты запросов не совпадают с dict")
+        print(f"{kind:>8} | {per_unit:>10.0f} | {timed(alive) * 1000:>10.2f} | "
+              f"{timed(by_owner) * 1000:>16.2f} | {timed(damage_and_heal, 3) * 1000:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""Набор бенчмарков GameField, Base, UnitManager и генерации карты.
+
+Запуск:
+    python benchmarks/suite.py                         # все случаи, отчет JSON в stdout
+    python benchmarks/suite.py --sizes 10,100 --cases move_unit,display
+    python benchmarks/suite.py --output report.json --save-baseline baseline.json
+    python benchmarks/suite.py --baseline baseline.json --threshold 0.25
+
+Для каждого случая и размера карты отчет содержит ops/sec, задержки
+p50/p99 (мкс) и пиковую память (байт, по tracemalloc). С --baseline
+результаты сравниваются с сохраненным отчетом; если ops/sec любого
+случая упали больше чем на threshold, скрипт завершается с кодом 1.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _common import quiet
+from Base import Base
+from GameEngine import GameEngine
+from GameField import GameField
+from UnitManager import UnitManager
+from Units import Swordsman, Crossbowman
+
+DEFAULT_SIZES = "10,100,500,1000,2000"
+MAX_UNITS = 20000
+MAX_OPS = 2000
+
+
+def _unit_count(size):
+    return max(4, min(size * size // 8, MAX_UNITS))
+
+
+def _plain_field(size, max_units):
+    """Поле без препятствий: размещение и ходы не зависят от случайного ландшафта"""
+    field = GameField(size, size, max_units)
+    field.terrain[:] = bytes(len(field.terrain))
+    return field
+
+
+def _populate(field, count, rng, unit_class=Swordsman):
+    cells = [(x, y) for y in range(field.height) for x in range(field.width)
+             if field.is_cell_empty(x, y)]
+    rng.shuffle(cells)
+    for _ in range(min(count, len(cells))):
+        x, y = cells.pop()
+        field.add_unit(unit_class(), x, y)
+    return cells
+
+
+# === Случаи бенчмарка ===
+# Каждый случай получает размер карты и генератор случайных чисел и
+# возвращает (операция, список аргументов); время измеряется для каждого вызова.
+
+def case_terrain_generation(size, rng):
+    field = GameField.__new__(GameField)
+    field.width = field.height = size
+    repeats = 1 if size >= 500 else 10
+    return field._generate_terrain, [()] * repeats
+
+
+def case_add_unit(size, rng):
+    count = _unit_count(size)
+    field = _plain_field(size, count + 1)
+    cells = [(x, y) for y in range(size) for x in range(size)]
+    rng.shuffle(cells)
+    return field.add_unit, [(Swordsman(), x, y) for x, y in cells[:count]]
+
+
+def case_move_unit(size, rng):
+    field = _plain_field(size, _unit_count(size) + 1)
+    _populate(field, _unit_count(size), rng)
+    moves = []
+    for unit in rng.sample(field.units, min(MAX_OPS, field.unit_count)):
+        x, y = unit.get_position()
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if field.can_place(unit, nx, ny) and field.get_entity_at(nx, ny) is None:
+                moves.append((unit, nx, ny))
+                break
+    return field.move_unit, moves
+
+
+def case_attack_unit(size, rng):
+    field = _plain_field(size, _unit_count(size) + 1)
+    _populate(field, _unit_count(size), rng, unit_class=Crossbowman)
+    attacks = []
+    units = field.units
+    for attacker in rng.sample(units, min(MAX_OPS, len(units))):
+        target = rng.choice(units)
+        if target is not attacker:
+            attacks.append((attacker, target.x, target.y))
+    return field.attack_unit, attacks
+
+
+def case_resolve_attacks(size, rng):
+    """Пакеты атак GameField.resolve_attacks (до MAX_OPS пар в пакете)"""
+    field = _plain_field(size, _unit_count(size) + 1)
+    _populate(field, _unit_count(size), rng, unit_class=Crossbowman)
+    units = field.units
+    batches = [([(rng.choice(units), rng.choice(units)) for _ in range(min(MAX_OPS, len(units) * 4))],)
+               for _ in range(5)]
+    return field.resolve_attacks, batches
+
+
+def case_display(size, rng):
+    field = _plain_field(size, _unit_count(size) + 1)
+    _populate(field, _unit_count(size), rng)
+    repeats = 1 if size >= 500 else 20
+    return field.display, [()] * repeats
+
+
+def case_spawn_search(size, rng):
+    """Поиск клетки для нового юнита у базы, окруженной юнитами"""
+    field = _plain_field(size, size * size)
+    base = Base("База", max_units=size * size)
+    center = size // 2
+    field.add_base(base, center, center)
+    # Занимаем все клетки вокруг базы, кроме одной в дальнем углу окна
+    for dy in range(-2, 3):
+        for dx in range(-2, 3):
+            if (dx, dy) not in ((0, 0), (2, 2)):
+                x, y = center + dx, center + dy
+                if field._is_valid_position(x, y):
+                    field.add_unit(Swordsman(), x, y)
+    unit = Swordsman()
+    return base._find_spawn_position, [(field, unit)] * MAX_OPS
+
+
+def case_show_available_moves(size, rng):
+    """Меню перемещения UnitManager для юнитов с разной дальностью"""
+    engine = GameEngine(_plain_field(size, _unit_count(size) + 1))
+    _populate(engine.game_field, _unit_count(size), rng)
+    manager = UnitManager(engine)
+    units = rng.sample(engine.game_field.units, min(MAX_OPS, engine.game_field.unit_count))
+
+    def show(unit):
+        manager.selected_unit = unit
+        manager.show_available_moves()
+
+    return show, [(unit,) for unit in units]
+
+
+def case_next_turn(size, rng):
+    """Game.next_turn (через GameEngine) с большим числом баз"""
+    field = _plain_field(size, size * size)
+    engine = GameEngine(field)
+    bases = min(size * size // 4, 5000)
+    cells = [(x, y) for y in range(size) for x in range(size)]
+    rng.shuffle(cells)
+    for index in range(bases):
+        x, y = cells[index]
+        field.add_base(Base(f"База {index}"), x, y)
+    repeats = 5 if size >= 500 else 50
+    return engine.next_turn, [()] * repeats
+
+
+CASES = {
+    "terrain_generation": case_terrain_generation,
+    "add_unit": case_add_unit,
+    "move_unit": case_move_unit,
+    "attack_unit": case_attack_unit,
+    "resolve_attacks": case_resolve_attacks,
+    "display": case_display,
+    "spawn_search": case_spawn_search,
+    "show_available_moves": case_show_available_moves,
+    "next_turn": case_next_turn,
+}
+
+
+# === Измерения ===
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _time_case(case, size, seed):
+    rng = random.Random(seed)
+    random.seed(seed)
+    with quiet():
+        operation, calls = case(size, rng)
+        timings = []
+        clock = time.perf_counter
+        gc.disable()
+        try:
+            for args in calls:
+                started = clock()
+                operation(*args)
+                timings.append(clock() - started)
+        finally:
+            gc.enable()
+    return timings
+
+
+def _peak_memory(case, size, seed):
+    """Пиковая память случая (подготовка и до 50 операций)"""
+    rng = random.Random(seed)
+    random.seed(seed)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        with quiet():
+            operation, calls = case(size, rng)
+            for args in calls[:50]:
+                operation(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run_suite(case_names, sizes, seed=0, measure_memory=True, progress=None):
+    results = []
+    for name in case_names:
+        for size in sizes:
+            if progress:
+                progress(f"{name} {size}x{size}")
+            timings = _time_case(CASES[name], size, seed)
+            total = sum(timings)
+            ordered = sorted(timings)
+            results.append({
+                "case": name,
+                "size": size,
+                "ops": len(timings),
+                "ops_per_sec": len(timings) / total if total > 0 else 0.0,
+                "p50_us": _percentile(ordered, 0.50) * 1e6,
+                "p99_us": _percentile(ordered, 0.99) * 1e6,
+                "peak_memory_bytes": _peak_memory(CASES[name], size, seed) if measure_memory else None,
+            })
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "results": results,
+    }
+
+
+def compare(report, baseline, threshold):
+    """Список регрессий: случаи, где ops/sec упали больше чем на threshold"""
+    previous = {(item["case"], item["size"]): item for item in baseline.get("results", [])}
+    regressions = []
+    for item in report["results"]:
+        old = previous.get((item["case"], item["size"]))
+        if not old or not old["ops_per_sec"]:
+            continue
+        change = item["ops_per_sec"] / old["ops_per_sec"] - 1.0
+        item["change_vs_baseline"] = change
+        if change < -threshold:
+            regressions.append(item)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="размеры карт через запятую")
+    parser.add_argument("--cases", default=",".join(CASES), help="случаи через запятую")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="не измерять пиковую память")
+    parser.add_argument("--output", help="записать отчет JSON в файл")
+    parser.add_argument("--save-baseline", help="сохранить отчет как базовый")
+    parser.add_argument("--baseline", help="сравнить с базовым отчетом")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="допустимое падение ops/sec (доля, по умолчанию 0.25)")
+    args = parser.parse_args(argv)
+
+    case_names = [name.strip() for name in args.cases.split(",") if name.strip()]
+    unknown = [name for name in case_names if name not in CASES]
+    if unknown:
+        parser.error(f"неизвестные случаи: {', '.join(unknown)}")
+    sizes = [int(value) for value in args.sizes.split(",")]
+
+    report = run_suite(case_names, sizes, seed=args.seed, measure_memory=not args.no_memory,
+                       progress=lambda label: print(f"… {label}", file=sys.stderr))
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        report["regressions"] = [f"{item['case']}@{item['size']}" for item in regressions]
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    for item in regressions:
+        print(f"❌ Регрессия {item['case']} {item['size']}x{item['size']}: "
+              f"{item['change_vs_baseline']:+.0%} ops/sec", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
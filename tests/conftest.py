@@ -0,0 +1,11 @@
+"""Общие настройки тестов: модули игры лежат в корне репозитория."""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: долгие тесты на больших картах (пропуск: -m 'not slow')")
@@ -0,0 +1,109 @@
+"""Пакет атак resolve_attacks дает тот же результат, что attack_unit по одной."""
+import random
+
+import pytest
+
+import Lazy
+from Base import Base
+from GameField import GameField
+from Units import Swordsman, Spearman, Crossbowman, Knight, Healer
+
+UNIT_CLASSES = (Swordsman, Spearman, Crossbowman, Knight, Healer)
+
+
+class Shielded(Swordsman):
+    """Юнит со своим take_damage: первый удар за пакет поглощает щит"""
+    __slots__ = ("shield",)
+
+    def __init__(self):
+        super().__init__()
+        self.shield = True
+
+    def take_damage(self, damage):
+        if self.shield:
+            self.shield = False
+            return 0
+        return super().take_damage(damage)
+
+
+def build(seed, count=300, extra=()):
+    rng = random.Random(seed)
+    random.seed(seed)
+    field = GameField(40, 40, max_units=count + len(extra))
+    base = Base("База", max_units=count + len(extra))
+    field.add_base(base, 0, 0)
+    cells = [(x, y) for y in range(40) for x in range(40) if field.is_cell_empty(x, y)]
+    rng.shuffle(cells)
+    units = [rng.choice(UNIT_CLASSES)() for _ in range(count)] + [cls() for cls in extra]
+    for unit in units:
+        while cells:
+            x, y = cells.pop()
+            if field.add_unit(unit, x, y, owner=base):
+                base.owned_units.append(unit)
+                break
+    pairs = [(rng.choice(field.units), rng.choice(field.units)) for _ in range(count * 4)]
+    return field, base, pairs
+
+
+def state(field, base):
+    return (sorted((unit.id, unit.health, unit.x, unit.y) for unit in field.units),
+            sorted(unit.id for unit in base.owned_units),
+            sorted(field.occupants))
+
+
+def scalar_results(field, pairs):
+    results = []
+    for attacker, target in pairs:
+        if not field.has_unit(target):
+            results.append(None)
+            continue
+        health = target.health
+        field.attack_unit(attacker, target.x, target.y)
+        results.append(health - target.health)
+    return results
+
+
+@pytest.fixture(params=["numpy", "flat"])
+def numpy_mode(request, monkeypatch):
+    if request.param == "numpy":
+        if Lazy.numpy() is None:
+            pytest.skip("NumPy не установлен")
+    else:
+        monkeypatch.setitem(Lazy._modules, "numpy", None)
+    return request.param
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_batch_matches_scalar(seed, numpy_mode):
+    scalar_field, scalar_base, scalar_pairs = build(seed)
+    batch_field, batch_base, batch_pairs = build(seed)
+
+    expected = scalar_results(scalar_field, scalar_pairs)
+    assert batch_field.resolve_attacks(batch_pairs) == expected
+    assert state(batch_field, batch_base) == state(scalar_field, scalar_base)
+
+
+def test_overridden_take_damage_is_called(numpy_mode):
+    scalar_field, scalar_base, scalar_pairs = build(4, count=60, extra=(Shielded,) * 5)
+    batch_field, batch_base, batch_pairs = build(4, count=60, extra=(Shielded,) * 5)
+
+    expected = scalar_results(scalar_field, scalar_pairs)
+    assert batch_field.resolve_attacks(batch_pairs) == expected
+    assert state(batch_field, batch_base) == state(scalar_field, scalar_base)
+
+
+def test_removed_targets_are_skipped():
+    field, base, pairs = build(5, count=20)
+    attacker, target = field.units[:2]
+    field.remove_unit(target)
+    assert field.resolve_attacks([(attacker, target)]) == [None]
+    assert field.resolve_attacks([]) == []
+
+
+def test_batch_undo_restores_health_and_units():
+    field, base, pairs = build(6, count=100)
+    before = state(field, base)
+    with field.trial():
+        field.resolve_attacks(pairs)
+        assert state(field, base) != before
+    assert state(field, base) == before
@@ -0,0 +1,41 @@
+"""Поля стоимости: поклеточные обновления совпадают с построением заново."""
+import random
+
+from CostFields import CostFields
+from GameField import GameField
+from Landscape import TerrainType
+from NeutralObject import ArmorSmith
+from Units import Ballista, Healer, Horseman, Knight, Swordsman
+
+UNIT_TYPES = (Ballista, Healer, Horseman, Knight, Swordsman)
+
+
+def test_incremental_cost_fields_match_rebuild():
+    rng = random.Random(8)
+    random.seed(8)
+    field = GameField(20, 20, max_units=40)
+    while field.unit_count < 25:
+        field.add_unit(rng.choice(UNIT_TYPES)(), rng.randrange(20), rng.randrange(20))
+    samples = [unit_type() for unit_type in UNIT_TYPES]
+    for unit in samples:
+        field.cost_fields.costs_for(unit)
+    kinds = list(TerrainType)
+
+    for step in range(100):
+        x, y = rng.randrange(20), rng.randrange(20)
+        action = rng.random()
+        if action < 0.4:
+            field.set_terrain(x, y, rng.choice(kinds))
+        elif action < 0.7:
+            unit = rng.choice(field.units)
+            field.move_unit(unit, *rng.choice(field.reachable_cells(unit).cells() or [(unit.x, unit.y)]))
+        elif action < 0.85 and field.is_cell_empty(x, y):
+            field.add_neutral_object(ArmorSmith(), x, y)
+        elif action < 0.9 and field.unit_count > 10:
+            field.remove_unit(rng.choice(field.units))
+        else:
+            field.add_unit(rng.choice(UNIT_TYPES)(), x, y)
+
+        fresh = CostFields(field)
+        for unit in samples:
+            assert field.cost_fields.costs_for(unit) == fresh.costs_for(unit), f"шаг {step}, {unit.name}"
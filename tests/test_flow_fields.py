@@ -0,0 +1,75 @@
+"""Поля потока: частичный пересчет совпадает с построением заново,
+move_group отклоняет карты, для которых поле потока не строится."""
+import random
+
+import pytest
+
+import FlowFields
+from FlowFields import FlowField
+from GameEngine import GameEngine
+from GameField import GameField
+from Landscape import TerrainType
+from NeutralObject import ArmorSmith, TreasureChest
+from Units import Healer, Knight, Swordsman
+
+
+def assert_matches_rebuild(field):
+    """Стоимости пути как у нового поля; шаг из каждой клетки ведет по
+    кратчайшему пути (при равных путях направление может отличаться)"""
+    for flow in field.flow_fields._fields.values():
+        fresh = FlowField(field, flow.target, flow.entry_costs)
+        assert flow.costs == fresh.costs
+        assert flow.distance == fresh.distance
+        target = flow.target[1] * flow.width + flow.target[0]
+        for cell, code in enumerate(flow.steps):
+            if not code:
+                assert cell == target or flow.distance[cell] == FlowFields.UNREACHABLE
+                continue
+            following = cell + flow.offsets[code]
+            assert flow.distance[cell] == flow.distance[following] + (flow.costs[following] or 1)
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_incremental_repair_matches_rebuild(seed):
+    rng = random.Random(seed)
+    random.seed(seed)
+    field = GameField(24, 24, max_units=10)
+    units = [Knight(), Swordsman(), Healer()]
+    for unit in units:
+        field.add_unit(unit, *rng.choice([(x, y) for y in range(24) for x in range(24)
+                                          if field.can_place(unit, x, y)]))
+    for target in ((2, 2), (20, 12), (12, 21)):
+        for unit in units:
+            field.flow_field(*target, unit)
+    assert len(field.flow_fields) >= 6
+
+    kinds = list(TerrainType)
+    objects = []
+    for step in range(60):
+        x, y = rng.randrange(24), rng.randrange(24)
+        action = rng.random()
+        if action < 0.6:
+            field.set_terrain(x, y, rng.choice(kinds))
+        elif action < 0.8 and field.is_cell_empty(x, y):
+            obj = rng.choice((ArmorSmith, TreasureChest))()
+            field.add_neutral_object(obj, x, y)
+            objects.append(obj)
+        elif objects:
+            obj = objects.pop(rng.randrange(len(objects)))
+            field.interact_with_object(units[0], obj.x, obj.y)
+        if step % 10 == 9:
+            assert_matches_rebuild(field)
+    assert field.flow_fields.recomputed > 0
+    assert_matches_rebuild(field)
+
+
+def test_move_group_rejects_oversized_map(monkeypatch):
+    random.seed(2)
+    engine = GameEngine.new_game(30, 30, 10, place_objects=False)
+    unit = engine.game_field.units[0]
+    position = unit.get_position()
+    monkeypatch.setattr(FlowFields, "FLOW_FIELD_MAX_CELLS", 30 * 30 - 1)
+    result = engine.move_group([unit.id], 20, 20)
+    assert (result.ok, result.error_code) == (False, "map_too_large")
+    assert unit.get_position() == position
+    assert not engine.game_field.flow_fields
@@ -0,0 +1,78 @@
+"""Слои конфигурации: порядок defaults -> file -> env -> cli, источник
+значения и отказ от файла с неверным параметром целиком."""
+import json
+import os
+
+import pytest
+
+from GameConfig import ConfigWatcher, GameConfig, parse_overrides
+
+
+def write_config(path, values):
+    path.write_text(json.dumps(values, ensure_ascii=False), encoding="utf-8")
+    # время изменения растет даже при быстрой перезаписи файла
+    stamp = os.stat(path).st_mtime_ns + 1_000_000_000
+    os.utime(path, ns=(stamp, stamp))
+
+
+@pytest.fixture
+def config_file(tmp_path, monkeypatch):
+    for name in os.environ:
+        if name.startswith("GAME_"):
+            monkeypatch.delenv(name)
+    path = tmp_path / "game_config.json"
+    write_config(path, {"difficulty": "hard", "music_volume": 10, "sound_volume": 20,
+                        "map_size": {"width": 12, "height": 8}})
+    return path
+
+
+def test_layers_override_in_order(config_file, monkeypatch):
+    monkeypatch.setenv("GAME_MUSIC_VOLUME", "30")
+    monkeypatch.setenv("GAME_SOUND_VOLUME", "40")
+    monkeypatch.setenv("GAME_UNRELATED_SETTING", "x")
+    config = GameConfig(str(config_file), overrides=parse_overrides(["sound_volume=50"]))
+
+    assert (config.max_players, config.source_of("max_players")) == (2, "defaults")
+    assert (config.difficulty, config.source_of("difficulty")) == ("hard", "file")
+    assert (config.map_size, config.source_of("map_size")) == ((12, 8), "file")
+    assert (config.music_volume, config.source_of("music_volume")) == (30, "env")
+    assert (config.sound_volume, config.source_of("sound_volume")) == (50, "cli")
+
+
+def test_reload_keeps_env_and_cli_values(config_file, monkeypatch):
+    monkeypatch.setenv("GAME_MUSIC_VOLUME", "30")
+    config = GameConfig(str(config_file))
+    watcher = ConfigWatcher(config)
+
+    write_config(config_file, {"difficulty": "easy", "music_volume": 70})
+    # параметры, убранные из файла, возвращаются к значениям по умолчанию
+    assert watcher.poll() == ["difficulty", "map_size", "sound_volume"]
+    assert (config.difficulty, config.music_volume, config.sound_volume) == ("easy", 30, 90)
+    assert config.map_size == (10, 10)
+    assert config.source_of("sound_volume") == "defaults"
+
+
+def test_invalid_file_is_rejected_whole(config_file, capsys):
+    write_config(config_file, {"difficulty": "impossible", "sound_volume": 5})
+    config = GameConfig(str(config_file))
+    # верный параметр из того же файла тоже не применяется
+    assert (config.difficulty, config.sound_volume) == ("normal", 90)
+    assert config.source_of("sound_volume") == "defaults"
+    assert "Ошибка загрузки конфигурации" in capsys.readouterr().out
+
+
+def test_invalid_reload_keeps_current_values(config_file, capsys):
+    config = GameConfig(str(config_file))
+    watcher = ConfigWatcher(config)
+    write_config(config_file, {"difficulty": "easy", "sound_volume": 500})
+    assert watcher.poll() == []
+    assert (config.difficulty, config.sound_volume) == ("hard", 20)
+    assert "Ошибка перезагрузки конфигурации" in capsys.readouterr().out
+
+
+def test_invalid_env_and_cli_values_are_errors(config_file, monkeypatch):
+    with pytest.raises(ValueError, match="sound_volume"):
+        GameConfig(str(config_file), overrides={"sound_volume": "громко"})
+    monkeypatch.setenv("GAME_DIFFICULTY", "impossible")
+    with pytest.raises(ValueError, match="Сложность"):
+        GameConfig(str(config_file))
@@ -0,0 +1,105 @@
+"""Безголовый движок: коды причин отказа и отсутствие вывода в консоль."""
+import random
+
+import pytest
+
+from Events import bus, ActionFailed, AbilityUsed, ConsoleReporter
+from GameEngine import GameEngine
+from GameField import GameField
+from Units import Knight
+
+
+@pytest.fixture
+def engine():
+    random.seed(3)
+    return GameEngine.new_game(10, 10, 20, place_objects=False)
+
+
+@pytest.fixture
+def events():
+    received = []
+    bus.subscribe(received.append, ActionFailed, AbilityUsed)
+    yield received
+    bus.unsubscribe(received.append)
+
+
+def test_rejections_carry_reason_codes(engine, capsys):
+    field = engine.game_field
+    unit, other = field.units[:2]
+    base = field.bases[0]
+
+    base.resources = 10
+    result = engine.create_unit(0, "knight")
+    assert (result.ok, result.error_code) == (False, "not_enough_resources")
+    assert result.error == "Недостаточно ресурсов. Нужно: 200, есть: 10"
+
+    assert engine.create_unit(0, "dragon").error_code == "unknown_unit_type"
+    assert engine.move(unit.id, other.x, other.y).error_code == "cell_occupied"
+    assert engine.move(unit.id, -1, 0).error_code == "invalid_position"
+    assert engine.move(999, 0, 0).error_code == "unit_not_found"
+    assert engine.attack(unit.id, base.x, base.y).error_code == "no_target"
+    assert engine.move_group([unit.id], 99, 99).error_code == "invalid_position"
+    assert engine.execute({"action": "fly"}).error_code == "unknown_action"
+
+    assert capsys.readouterr().out == ""
+
+
+@pytest.mark.parametrize("command", [
+    {"action": "move", "unit_id": 1, "x": "a", "y": 2},
+    {"action": "move", "unit_id": 1, "x": 2.0, "y": 2},
+    {"action": "attack", "unit_id": "1", "x": 2, "y": 2},
+    {"action": "move_group", "unit_ids": 1, "x": 2, "y": 2},
+    {"action": "move_group", "unit_ids": [1, None], "x": 2, "y": 2},
+    {"action": "collect_resources", "base": 0, "amount": True},
+    {"action": "create_unit", "base": 0, "unit_type": ["knight"]},
+])
+def test_wrong_parameter_types_are_rejected(engine, command):
+    before = [(unit.id, unit.x, unit.y) for unit in engine.game_field.units]
+    result = engine.execute(command)
+    assert (result.ok, result.error_code) == (False, "invalid_params")
+    assert [(unit.id, unit.x, unit.y) for unit in engine.game_field.units] == before
+
+
+def test_failure_is_not_reused_by_next_command(engine):
+    field = engine.game_field
+    unit = field.units[0]
+    x, y = next((x, y) for y in range(field.height) for x in range(field.width) if field.is_cell_empty(x, y))
+    assert not engine.move(unit.id, -1, 0)
+    assert engine.interact(unit.id, x, y).error_code == "no_object"
+
+
+def test_failures_and_abilities_are_published(engine, events, capsys):
+    unit = engine.game_field.units[0]
+    result = engine.move(unit.id, -1, 0)
+    ability = engine.ability(unit.id)
+
+    failure, used = events
+    assert isinstance(failure, ActionFailed)
+    assert (failure.reason, failure.message) == (result.error_code, result.error)
+    assert isinstance(used, AbilityUsed) and used.result == ability.data["result"]
+    assert capsys.readouterr().out == ""
+
+
+def test_console_reporter_prints_failures_once(engine, capsys):
+    reporter = ConsoleReporter.ensure()
+    try:
+        assert ConsoleReporter.ensure() is reporter
+        result = engine.move(engine.game_field.units[0].id, -1, 0)
+    finally:
+        reporter.detach()
+    assert capsys.readouterr().out == f"❌ {result.error}\n"
+
+
+def test_chunked_map_refuses_whole_map_consumers(capsys):
+    random.seed(5)
+    field = GameField(5000, 5000, max_units=10)
+    engine = GameEngine(field)
+    unit = Knight()
+    field.add_unit(unit, 2500, 2500)
+
+    result = engine.move_group([unit.id], 2510, 2500)
+    assert not result.ok and result.error_code == "map_too_large"
+    field.display()
+    assert "ОКНО" in capsys.readouterr().out
+    # ни поле потока, ни вывод не генерируют мир целиком
+    assert field.terrain.generated < 10
@@ -0,0 +1,126 @@
+"""Сессии GameServer: seed одной партии не трогает случайность остальных,
+кэш полей потока держится в бюджете памяти, ошибка в запросе не закрывает
+подключение, долгая команда не задерживает другие сессии."""
+import asyncio
+import json
+import random
+import time
+
+import pytest
+
+from FlowFields import FLOW_CELL_BYTES
+from GameServer import GameServer, Session
+
+
+@pytest.fixture
+def server():
+    return GameServer()
+
+
+def layout(session):
+    field = session.engine.game_field
+    return bytes(field.terrain), [(type(obj).__name__, obj.x, obj.y) for obj in field.neutral_objects]
+
+
+def test_seed_is_local_to_session(server):
+    first, second = Session(1, server), Session(2, server)
+    random.seed(42)
+    expected = random.random()
+    random.seed(42)
+    assert first.handle({"action": "new_game", "width": 20, "height": 20, "seed": 7}).ok
+    # общий генератор процесса не переустановлен и не сдвинут
+    assert random.random() == expected
+
+    assert second.handle({"action": "new_game", "width": 20, "height": 20, "seed": 7}).ok
+    assert layout(first) == layout(second)
+    assert second.handle({"action": "new_game", "width": 20, "height": 20, "seed": 8}).ok
+    assert layout(first) != layout(second)
+
+
+def test_flow_fields_stay_within_memory_budget():
+    server = GameServer(memory_budget=400 * 1024)
+    session = Session(1, server)
+    assert not session.handle({"action": "new_game", "width": 200, "height": 200}).ok
+    result = session.handle({"action": "new_game", "width": 100, "height": 100, "seed": 1})
+    assert result.ok and result.data["memory"] <= server.memory_budget
+
+    field = session.engine.game_field
+    unit = field.units[0]
+    for x in range(0, 100, 5):
+        session.handle({"action": "move_group", "unit_ids": [unit.id], "x": x, "y": 99})
+    flows = field.flow_fields
+    assert flows.built > flows.size
+    # в кэше не больше полей, чем заложено в оценку памяти партии
+    assert 0 < len(flows) == flows.size
+    assert (len(flows) + 1) * 100 * 100 * FLOW_CELL_BYTES < server.memory_budget
+
+
+async def exchange(server, requests):
+    """Отправить запросы по одному подключению и вернуть ответы на них"""
+    await server.start(port=0)
+    try:
+        reader, writer = await asyncio.open_connection(*server.address[:2])
+        assert json.loads(await reader.readline())["ok"]
+        responses = []
+        for request in requests:
+            writer.write(json.dumps(request).encode("utf-8") + b"\n")
+            await writer.drain()
+            responses.append(json.loads(await reader.readline()))
+        writer.close()
+        return responses
+    finally:
+        await server.close()
+
+
+def test_bad_request_keeps_connection(server, monkeypatch, capsys):
+    def broken(self, unit_id):
+        raise RuntimeError("сломано")
+
+    monkeypatch.setattr("GameField.GameField.get_unit_by_id", broken)
+    new_game, wrong_type, failing, new_game_wrong, valid = asyncio.run(exchange(server, [
+        {"id": 1, "action": "new_game", "width": 10, "height": 10, "seed": 1},
+        {"id": 2, "action": "move", "unit_id": 1, "x": "a", "y": 2},
+        {"id": 3, "action": "ability", "unit_id": 1},
+        {"id": 4, "action": "new_game", "width": 10, "size": 3},
+        {"id": 5, "action": "state"},
+    ]))
+    assert new_game["ok"]
+    assert (wrong_type["id"], wrong_type["ok"], wrong_type["error_code"]) == (2, False, "invalid_params")
+    assert (failing["id"], failing["ok"], failing["error_code"]) == (3, False, "internal_error")
+    assert "RuntimeError" in capsys.readouterr().err
+    assert new_game_wrong["error_code"] == "invalid_params"
+    assert valid["id"] == 5 and valid["ok"] and valid["data"]["units"]
+
+
+def test_slow_command_does_not_block_other_sessions(server, monkeypatch):
+    def slow(*args):
+        time.sleep(0.5)
+        return cache_size(*args)
+
+    import GameServer
+    cache_size = GameServer.flow_cache_size
+    monkeypatch.setattr(GameServer, "flow_cache_size", slow)
+
+    async def run():
+        await server.start(port=0)
+        try:
+            slow_client, fast_client = [await asyncio.open_connection(*server.address[:2]) for _ in range(2)]
+            for reader, _ in (slow_client, fast_client):
+                await reader.readline()
+            slow_reader, slow_writer = slow_client
+            started = time.perf_counter()
+            slow_writer.write(b'{"action": "new_game", "width": 10, "height": 10}\n')
+            await asyncio.sleep(0.1)
+            fast_reader, fast_writer = fast_client
+            fast_writer.write(b'{"action": "ping"}\n')
+            assert json.loads(await fast_reader.readline())["ok"]
+            answered = time.perf_counter() - started
+            await slow_reader.readline()
+            for _, writer in (slow_client, fast_client):
+                writer.close()
+            return answered
+        finally:
+            await server.close()
+
+    # ping второй сессии отвечен, пока первая еще строит партию
+    assert asyncio.run(run()) < 0.4
@@ -0,0 +1,72 @@
+"""Отмена и повтор действий баз: ресурсы, здоровье и армия возвращаются."""
+import random
+
+import pytest
+
+from GameEngine import GameEngine
+from History import FieldHistory
+
+
+@pytest.fixture
+def engine():
+    random.seed(7)
+    engine = GameEngine.new_game(12, 12, 20, place_objects=False)
+    FieldHistory(engine.game_field).attach()
+    return engine
+
+
+def base_state(base):
+    return base.resources, base.health, base.max_health, [unit.id for unit in base.owned_units]
+
+
+def test_create_unit_undo_refunds_resources(engine):
+    field = engine.game_field
+    history = field.history
+    base = field.bases[0]
+    before = (base_state(base), field.unit_count, field.unit_id_counter)
+
+    assert engine.create_unit(0, "knight").ok
+    created = (base_state(base), field.unit_count, field.unit_id_counter)
+    assert created[0][0] == before[0][0] - base.unit_costs["knight"]
+
+    # создание юнита базой - один шаг истории
+    assert history.undo() and not history.can_undo
+    assert (base_state(base), field.unit_count, field.unit_id_counter) == before
+    assert history.redo()
+    assert (base_state(base), field.unit_count, field.unit_id_counter) == created
+
+
+def test_base_damage_and_roster_update_are_undone(engine):
+    field = engine.game_field
+    history = field.history
+    base = field.bases[0]
+    assert engine.create_unit(0, "swordsman").ok
+    unit = base.owned_units[0]
+    before = base_state(base)
+
+    base.take_damage(120)
+    base.collect_resources(30)
+    field._unit_changing(unit)
+    unit.health = 0
+    field._unit_changed(unit)
+    base.update_units()
+    roster = [unit_id for unit_id in before[3] if unit_id != unit.id]
+    assert base_state(base) == (before[0] + 30, before[1] - 120, before[2], roster)
+
+    # вне действия каждое изменение - отдельный шаг
+    for _ in range(4):
+        assert history.undo()
+    assert base_state(base) == before
+    assert unit.health > 0
+
+
+def test_trial_restores_base(engine):
+    field = engine.game_field
+    base = field.bases[0]
+    before = base_state(base)
+    with field.trial():
+        base.create_unit("healer", field)
+        base.take_damage(50)
+        assert base_state(base) != before
+    assert base_state(base) == before
+    assert not field.history.can_undo
@@ -0,0 +1,91 @@
+"""Журнал ходов: восстановление из снимка и журнала совпадает с живой игрой."""
+import random
+
+import pytest
+
+from Base import Base
+from GameEngine import GameEngine
+from History import FieldHistory
+from Journal import TurnJournal
+from Landscape import TerrainType
+from NeutralObject import ArmorSmith, HealingFountain
+from SaveFormat import SaveFormatError
+from Units import Swordsman, UnitFactory
+from test_save_format import snapshot
+
+
+class Scout(Swordsman):
+    """Тип юнита, которого нет в UnitFactory"""
+
+
+@pytest.fixture
+def engine():
+    random.seed(5)
+    engine = GameEngine.new_game(16, 16, 200)
+    engine.game_field.add_base(Base("Враг"), 12, 12)
+    return engine
+
+
+def empty_cell(field, rng):
+    return rng.choice([(x, y) for y in range(field.height) for x in range(field.width)
+                       if field.is_cell_empty(x, y)])
+
+
+def play_turn(engine, rng):
+    """Ход со всеми видами изменений: появление, ходы, атаки, эффекты, отмена"""
+    field = engine.game_field
+    history = field.history
+    engine.collect_resources(0, 400)
+    for base in (0, 1):
+        engine.create_unit(base, rng.choice(["knight", "swordsman", "crossbowman", "healer"]))
+    for unit in field.units:
+        cells = field.reachable_cells(unit).cells()
+        if cells:
+            engine.move(unit.id, *rng.choice(cells))
+    for _ in range(12):
+        attacker, target = rng.sample(field.units, 2)
+        engine.attack(attacker.id, target.x, target.y)
+    for obj in (ArmorSmith(), HealingFountain()):
+        field.add_neutral_object(obj, *empty_cell(field, rng))
+        engine.interact(rng.choice(field.units).id, obj.x, obj.y)
+    field.set_terrain(*empty_cell(field, rng), TerrainType.FOREST)
+    for _ in range(3):
+        history.undo()
+    history.redo()
+    engine.next_turn()
+
+
+def test_restore_matches_live_game(engine, tmp_path):
+    FieldHistory(engine.game_field).attach()
+    prefix = str(tmp_path / "auto")
+    journal = TurnJournal(engine, prefix, snapshot_every=4)
+    journal.attach()
+    rng = random.Random(2)
+    for _ in range(7):
+        play_turn(engine, rng)
+    journal.close()
+
+    assert engine.game_field.effects, "в партии должны остаться активные эффекты"
+    restored = TurnJournal.restore(prefix)
+    # ход 7 восстанавливается по снимку хода 4 и журналу после него
+    assert restored.turn_count == 7
+    assert snapshot(restored) == snapshot(engine)
+
+
+def test_unregistered_unit_type_is_rejected_before_placing(engine, tmp_path, monkeypatch):
+    field = engine.game_field
+    journal = TurnJournal(engine, str(tmp_path / "auto"))
+    journal.attach()
+    before = snapshot(engine)
+    x, y = empty_cell(field, random.Random(1))
+
+    with pytest.raises(SaveFormatError, match="Scout"):
+        field.add_unit(Scout(), x, y)
+    assert snapshot(engine) == before
+
+    # тип, зарегистрированный после подключения журнала, записывается
+    monkeypatch.setitem(UnitFactory.UNIT_TYPES, "scout", Scout)
+    assert field.add_unit(Scout(), x, y)
+    engine.next_turn()
+    journal.close()
+    assert snapshot(TurnJournal.restore(str(tmp_path / "auto"))) == snapshot(engine)
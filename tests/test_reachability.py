@@ -0,0 +1,46 @@
+"""Карты достижимости: кэш после изменений поля совпадает с поиском заново."""
+import random
+
+from GameField import GameField
+from Landscape import TerrainType
+from NeutralObject import ArmorSmith
+from Units import Healer, Horseman, Knight, Swordsman
+
+
+def test_cached_reach_matches_fresh_search():
+    rng = random.Random(4)
+    random.seed(4)
+    field = GameField(20, 20, max_units=40)
+    while field.unit_count < 30:
+        unit = rng.choice((Knight, Horseman, Swordsman, Healer))()
+        field.add_unit(unit, rng.randrange(20), rng.randrange(20))
+    kinds = list(TerrainType)
+    engine = field.reachability
+
+    for step in range(80):
+        units = field.units
+        for unit in units:
+            field.reachable_cells(unit)
+        # изменения клеток: ход, ландшафт, объект, гибель юнита
+        unit = rng.choice(units)
+        action = rng.random()
+        if action < 0.4:
+            cells = field.reachable_cells(unit).cells()
+            if cells:
+                field.move_unit(unit, *rng.choice(cells))
+        elif action < 0.7:
+            field.set_terrain(rng.randrange(20), rng.randrange(20), rng.choice(kinds))
+        elif action < 0.85:
+            x, y = rng.randrange(20), rng.randrange(20)
+            if field.is_cell_empty(x, y):
+                field.add_neutral_object(ArmorSmith(), x, y)
+        elif len(units) > 10:
+            field.remove_unit(unit)
+
+        for unit in field.units:
+            cached = field.reachable_cells(unit)
+            fresh = engine._search(unit, (unit.x, unit.y), unit.move_range)
+            assert cached.costs == fresh.costs, f"шаг {step}, {unit.name} в ({unit.x}, {unit.y})"
+            for cell in cached.cells():
+                path = cached.path_to(*cell)
+                assert path[0] == (unit.x, unit.y) and path[-1] == cell
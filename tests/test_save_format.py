@@ -0,0 +1,128 @@
+"""Сохранение и загрузка: состояние после загрузки совпадает с исходным."""
+import random
+import time
+
+import pytest
+
+from Base import Base
+from GameEngine import GameEngine
+from GameField import GameField
+from NeutralObject import ArmorSmith, Trap
+from Units import UnitFactory
+import SaveFormat
+
+
+def snapshot(engine):
+    """Все сохраняемое состояние движка в сравнимом виде"""
+    field = engine.game_field
+    owner_name = lambda unit: field.get_unit_owner(unit).name if field.get_unit_owner(unit) else None
+    return {
+        "size": (field.width, field.height, field.max_units),
+        "terrain": bytes(field.terrain),
+        "turn": engine.turn_count,
+        "unit_id_counter": field.unit_id_counter,
+        "units": [(unit.id, type(unit).__name__, unit.x, unit.y, unit.health, unit.max_health, unit.armor,
+                   unit.attack, unit.move_range, getattr(unit, "attack_range", None),
+                   getattr(unit, "bolt_loaded", None), owner_name(unit)) for unit in field.units],
+        "bases": [(base.name, base.x, base.y, base.health, base.max_health, base.max_units, base.resources,
+                   [unit.id for unit in base.owned_units]) for base in field.bases],
+        "objects": [(type(obj).__name__, obj.x, obj.y, getattr(obj, "visible", None))
+                    for obj in field.neutral_objects],
+        "effects": sorted((effect.id, effect.unit.id, effect.stat, effect.amount, effect.expires_turn)
+                          for effect in field.effects),
+        "occupants": sorted((cell, type(entity).__name__) for cell, entity in field.occupants.items()),
+    }
+
+
+def round_trip(engine, path):
+    SaveFormat.save_game(engine, str(path))
+    return SaveFormat.load_game(str(path))
+
+
+@pytest.fixture
+def engine():
+    random.seed(1)
+    engine = GameEngine.new_game(12, 9, 40, place_objects=False)
+    engine.collect_resources(0, 1000)
+    engine.create_unit(0, "knight")
+    engine.create_unit(0, "crossbowman")
+    engine.next_turn()
+    engine.next_turn()
+    field = engine.game_field
+    field.units[0].health -= 7
+    field.add_base(Base("Вторая база ✓"), 10, 8)
+    return engine
+
+
+def test_round_trip_restores_state(engine, tmp_path):
+    field = engine.game_field
+    crossbowman = next(unit for unit in field.units if hasattr(unit, "bolt_loaded"))
+    crossbowman.bolt_loaded = False
+    field.set_terrain(0, 0, next(iter(type(field.get_terrain_at(0, 0).terrain_type))))
+    field.add_neutral_object(Trap(), 11, 0)
+
+    loaded = round_trip(engine, tmp_path / "game.sav")
+
+    assert snapshot(loaded) == snapshot(engine)
+
+
+def test_round_trip_keeps_effects_and_counters(engine, tmp_path):
+    field = engine.game_field
+    unit = field.units[0]
+    cells = [(unit.x + dx, unit.y + dy) for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1))]
+    x, y = next(cell for cell in cells if field.get_entity_at(*cell) is None and field.get_terrain_at(*cell))
+    field.add_neutral_object(ArmorSmith(), x, y)
+    assert engine.interact(unit.id, x, y).ok
+    assert list(field.effects)
+
+    loaded = round_trip(engine, tmp_path / "effects.sav")
+
+    assert snapshot(loaded) == snapshot(engine)
+    assert loaded.game_field.unit_id_counter == field.unit_id_counter
+    assert loaded.turn_count == engine.turn_count == 2
+
+
+def test_loaded_game_continues_with_same_ids(engine, tmp_path):
+    loaded = round_trip(engine, tmp_path / "ids.sav")
+    for game in (engine, loaded):
+        game.collect_resources(0, 500)
+    assert engine.create_unit(0, "healer").data["unit_id"] == loaded.create_unit(0, "healer").data["unit_id"]
+
+
+def test_rejects_foreign_file(tmp_path):
+    path = tmp_path / "broken.sav"
+    path.write_bytes(b"not a save file at all")
+    with pytest.raises(SaveFormat.SaveFormatError):
+        SaveFormat.load_game(str(path))
+
+
+@pytest.mark.slow
+def test_large_map_round_trip_under_a_second(tmp_path):
+    size, count = 1000, 50_000
+    field = GameField(size, size, count + 10, terrain=bytearray(random.Random(0).randrange(4)
+                                                                for _ in range(size * size)))
+    engine = GameEngine(field)
+    bases = []
+    for index in range(50):
+        base = Base(f"База {index}", max_units=count)
+        field._place_entity(base, index * 2, size - 1)
+        bases.append(base)
+    classes = list(UnitFactory.UNIT_TYPES.values())
+    for index in range(count):
+        unit = classes[index % len(classes)]()
+        unit.id = field.unit_id_counter
+        field.unit_id_counter += 1
+        unit.set_position(index % size, index // size)
+        field._restore_unit(unit, bases[index % len(bases)])
+    path = tmp_path / "large.sav"
+
+    started = time.perf_counter()
+    SaveFormat.save_game(engine, str(path))
+    saved = time.perf_counter() - started
+    started = time.perf_counter()
+    loaded = SaveFormat.load_game(str(path))
+    load_time = time.perf_counter() - started
+
+    assert snapshot(loaded) == snapshot(engine)
+    assert saved < 1.0
+    assert load_time < 1.0
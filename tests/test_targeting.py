@@ -0,0 +1,46 @@
+"""Цели в радиусе и линия видимости: кэш совпадает с перебором."""
+import random
+
+from GameField import GameField
+from Landscape import TerrainType
+from Targeting import bresenham_line
+from Units import Ballista, Crossbowman, Knight, Swordsman
+
+
+def brute_force_targets(field, unit):
+    """Враги в радиусе атаки, луч к которым не проходит через ландшафт,
+    закрывающий обзор"""
+    radius = getattr(unit, "attack_range", 1)
+    owner = field.get_unit_owner(unit)
+    targets = []
+    for other in field.units:
+        if other is unit or (owner is not None and field.get_unit_owner(other) is owner):
+            continue
+        if abs(other.x - unit.x) + abs(other.y - unit.y) > radius:
+            continue
+        if any(field.get_terrain_at(x, y).blocks_sight
+               for x, y in bresenham_line(unit.x, unit.y, other.x, other.y)[1:-1]):
+            continue
+        targets.append(other)
+    targets.sort(key=lambda target: (abs(target.x - unit.x) + abs(target.y - unit.y), target.id))
+    return targets
+
+
+def test_line_of_sight_cache_follows_terrain():
+    rng = random.Random(6)
+    random.seed(6)
+    field = GameField(20, 20, max_units=60)
+    while field.unit_count < 50:
+        unit = rng.choice((Ballista, Crossbowman, Knight, Swordsman))()
+        field.add_unit(unit, rng.randrange(20), rng.randrange(20))
+    kinds = list(TerrainType)
+
+    for step in range(60):
+        for unit in field.units:
+            assert field.targets_in_range(unit, line_of_sight=True) == brute_force_targets(field, unit), \
+                f"шаг {step}, {unit.name} в ({unit.x}, {unit.y})"
+        # горы появляются и исчезают в радиусе уже закэшированных множеств
+        field.set_terrain(rng.randrange(20), rng.randrange(20), rng.choice(kinds))
+        unit = rng.choice(field.units)
+        field.move_unit(unit, rng.randrange(20), rng.randrange(20))
+    assert field.sight.hits > 0
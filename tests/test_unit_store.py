@@ -0,0 +1,56 @@
+"""Массовые запросы UnitStore: путь NumPy и проход по массивам совпадают."""
+import random
+
+import pytest
+
+import Lazy
+from Base import Base
+from UnitStore import UnitStore
+from Units import Knight, Swordsman, Crossbowman, Healer
+
+UNIT_CLASSES = (Knight, Swordsman, Crossbowman, Healer)
+
+
+def build(seed, count=2000):
+    """Хранилище с погибшими юнитами, юнитами без базы и свободными строками"""
+    rng = random.Random(seed)
+    bases = [Base(f"База {index}") for index in range(5)]
+    store = UnitStore()
+    units = []
+    for index in range(count):
+        unit = rng.choice(UNIT_CLASSES)()
+        unit.id = index
+        if rng.random() < 0.1:
+            unit.health = 0
+        store.add(unit, rng.choice(bases + [None]))
+        units.append(unit)
+    for unit in rng.sample(units, count // 10):
+        store.remove(unit)
+    for unit in rng.sample([unit for unit in units if unit in store], count // 10):
+        unit.take_damage(rng.randrange(200))
+    return store
+
+
+def queries(store):
+    return store.alive_units(), store.alive_count(), store.health_by_owner()
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_numpy_and_fallback_agree(seed, monkeypatch):
+    if Lazy.numpy() is None:
+        pytest.skip("NumPy не установлен")
+    store = build(seed)
+    vectorized = queries(store)
+    monkeypatch.setitem(Lazy._modules, "numpy", None)
+    fallback = queries(store)
+
+    assert vectorized == fallback
+    alive, count, by_owner = fallback
+    assert count == len(alive) and all(unit.health > 0 for unit in alive)
+    assert sum(by_owner.values()) == sum(unit.health for unit in alive)
+
+
+def test_empty_store(monkeypatch):
+    assert queries(UnitStore()) == ([], 0, {})
+    monkeypatch.setitem(Lazy._modules, "numpy", None)
+    assert queries(UnitStore()) == ([], 0, {})